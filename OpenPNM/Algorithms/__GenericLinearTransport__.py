@@ -11,7 +11,7 @@ import scipy.sparse.linalg as sprslin
 from OpenPNM.Algorithms import GenericAlgorithm
 from OpenPNM.Phases import GenericPhase
 import OpenPNM.Utilities.vertexops as vo
-from OpenPNM.Base import logging
+from OpenPNM.Base import logging, Tools
 logger = logging.getLogger(__name__)
 
 class GenericLinearTransport(GenericAlgorithm):
@@ -34,6 +34,7 @@ class GenericLinearTransport(GenericAlgorithm):
             if sp.size(phase)!=1:   self._phases = phase
             else:   self._phases.append(phase)
 
+    @Tools.traced
     def setup(self,conductance,quantity,super_pore_conductance):
         r'''
         This setup provides the initial data for the solver from the provided properties. 
@@ -48,7 +49,7 @@ class GenericLinearTransport(GenericAlgorithm):
             self._quantity = 'pore.'+self._phase.name+'_'+quantity.split('.')[-1]
             #Check health of conductance vector
             if self._phase.check_data_health(props=self._conductance,quiet=True):
-                self['throat.conductance'] = self._phase[self._conductance]
+                self['throat.conductance'] = sp.array(self._phase[self._conductance],dtype=float)
             else:
                 raise Exception('The provided throat conductance has problems')
         else:
@@ -204,6 +205,7 @@ class GenericLinearTransport(GenericAlgorithm):
                             self['pore.source_tol'][loc] = tol                                
         else:   Exception('No source_name has been sent for set_source_term method in the algorithm '+self.name)
             
+    @Tools.traced
     def run(self,**kwargs):
         r'''
         This calls the setup method in the algorithm and then runs the outer iteration stage. 
@@ -220,6 +222,7 @@ class GenericLinearTransport(GenericAlgorithm):
         '''        
         self.solve(**kwargs)        
 
+    @Tools.traced
     def solve(self,A=None,
                   b=None,
                   iterative_solver = None,
@@ -369,10 +372,11 @@ class GenericLinearTransport(GenericAlgorithm):
         if 'throat.rate' not in self._phase.props():
             self._phase['throat.rate'] = sp.nan
         self._phase['throat.rate'][throats] = rate[throats]
-        logger.debug('Results of '+self.name+' algorithm have been added to '+self._phase.name)
+        logger.debug('Results of %s algorithm have been added to %s',self.name,self._phase.name)
 
 
 
+    @Tools.traced
     def _build_coefficient_matrix(self,modified_diag_pores=None,
                                       diag_added_data=None,
                                       mode='overwrite'):
@@ -474,8 +478,11 @@ class GenericLinearTransport(GenericAlgorithm):
             a = sprs.coo.coo_matrix((data,(row,col)),(self._coeff_dimension,self._coeff_dimension))
             A = a.tocsr()
             A.eliminate_zeros() 
+            if Tools.Tracer.enabled:
+                Tools.Tracer.count('sparse.coefficient')
             return(A)
 
+    @Tools.traced
     def _build_RHS_matrix(self,modified_RHS_pores=None,
                           RHS_added_data=None,
                           mode='overwrite'):
@@ -502,8 +509,8 @@ class GenericLinearTransport(GenericAlgorithm):
             except: pass        
         
         if mode in ['overwrite','modify_RHS']:
-            try:   b = sp.copy(self.b)
-            except: pass    
+            if mode == 'modify_RHS':
+                b = sp.copy(self.b)
             # Adding necessary terms such as source terms to the RHS for non-Dirichlet pores  
             if modified_RHS_pores is not None and RHS_added_data is not None:
                 if sp.size(modified_RHS_pores)==sp.size(RHS_added_data):
@@ -514,6 +521,7 @@ class GenericLinearTransport(GenericAlgorithm):
                       
         return(b)
 
+    @Tools.traced
     def rate(self,pores=None,network=None,conductance=None,X_value=None,mode='group'):
         r'''
         Send a list of pores and receive the net rate
@@ -570,6 +578,7 @@ class GenericLinearTransport(GenericAlgorithm):
             R.append(sp.sum(sp.multiply(g,(X2-X1))))
         return(sp.array(R,ndmin=1))
 
+    @Tools.traced
     def _calc_eff_prop(self,check_health=False):
         r'''
         This returns the main parameters for calculating the effective property in a linear transport equation.
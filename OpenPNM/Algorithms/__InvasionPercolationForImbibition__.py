@@ -45,6 +45,9 @@ class InvasionPercolationForImbibition(InvasionPercolation):
                report=20,
                inlet_flow=1,
                Psecond=False,
+               checkpoint=None,
+               checkpoint_every=None,
+               checkpoint_interval=None,
                **params):
         r"""
 
@@ -76,6 +79,14 @@ class InvasionPercolationForImbibition(InvasionPercolation):
             m3/s for each cluster (affects timestamp of pore filling)
         Psecond : boul (False)
             is this a secondary imbibition (after drainage)?
+        checkpoint : string (None)
+            name of a file to which the state of the algorithm is periodically
+            written, so that an interrupted run can be continued with
+            ``resume``
+        checkpoint_every : int (None)
+            number of invasion steps between checkpoints
+        checkpoint_interval : float (None)
+            number of seconds between checkpoints
 
 
         Input Phases
@@ -147,7 +158,10 @@ class InvasionPercolationForImbibition(InvasionPercolation):
                                                        pore_volume_name=pore_volume_name,
                                                        timing=timing,
                                                        report=report,
-                                                       inlet_flow=inlet_flow)
+                                                       inlet_flow=inlet_flow,
+                                                       checkpoint=checkpoint,
+                                                       checkpoint_every=checkpoint_every,
+                                                       checkpoint_interval=checkpoint_interval)
 
     def _setup_for_IP(self,**params):
         r"""
@@ -334,8 +348,15 @@ class InvasionPercolationForImbibition(InvasionPercolation):
         self._setup_for_IP()
         self._condition_update()
         #self._Tinv = np.zeros(self._net.num_throats())
+        self._do_outer_iterations()
+
+    def _do_outer_iterations(self):
+        r"""
+        Iterates until the end condition is met, then stores the results
+        """
         while self._condition:
             self._do_one_outer_iteration()
+            self._checkpoint_update()
         self['pore.IP_inv_final']=np.ravel(np.array(self._Pinv,dtype=np.int))
         self['pore.IP_inv_original']=np.ravel(np.array(self._Pinv_original,dtype=np.int))
         self['throat.IP_inv']=np.ravel(np.array(self._Tinv,dtype=np.int))
@@ -8,8 +8,12 @@ InvasionPercolation -- Invasion Percolation Algorithm
 import scipy as sp
 import numpy as np
 import heapq
+import os
+import time
+import pickle
 from OpenPNM.Utilities import misc
 from OpenPNM.Algorithms import GenericAlgorithm
+from OpenPNM.Base import Core, Tools
 from OpenPNM.Base import logging
 logger = logging.getLogger(__name__)
 
@@ -49,12 +53,20 @@ class InvasionPercolation(GenericAlgorithm):
 
 
     """
+    # Attributes that are not part of the state written by save_checkpoint
+    _checkpoint_skip = ['_name','_ctrl','_phases','_geometries','_physics',
+                        '_net','_parent','_versions','_interleave_cache',
+                        '_dtype_policy','_storage','models','_phase',
+                        '_phase_def','_checkpoint_time']
+
     def __init__(self,**kwords):
         r'''
         '''
         super(InvasionPercolation,self).__init__(**kwords)
         logger.info("Create IP Algorithm Object")
+        self._checkpoint_file = None
 
+    @Tools.traced
     def run(self,invading_phase,
                defending_phase,
                inlets=[0],
@@ -66,7 +78,10 @@ class InvasionPercolation(GenericAlgorithm):
                 throat_diameter_name='diameter',
                 timing='ON',
                 inlet_flow=1e-12, #default flowrate is 1 nanoliter/sec/cluster
-                report=20):
+                report=20,
+                checkpoint=None,
+                checkpoint_every=None,
+                checkpoint_interval=None):
         r"""
         Runs the IP algorithm
 
@@ -94,6 +109,14 @@ class InvasionPercolation(GenericAlgorithm):
             m3/s for each cluster (affects timestamp of pore filling)
         report : int (20)
             percentage multiple at which a progress report is printed
+        checkpoint : string (None)
+            name of a file to which the state of the algorithm is periodically
+            written, so that an interrupted run can be continued with
+            ``resume``
+        checkpoint_every : int (None)
+            number of invasion steps between checkpoints
+        checkpoint_interval : float (None)
+            number of seconds between checkpoints
 
 
         Returns
@@ -148,9 +171,14 @@ class InvasionPercolation(GenericAlgorithm):
         self._pore_volume_name = pore_volume_name
         self._throat_volume_name = throat_volume_name
         self._throat_diameter_name = throat_diameter_name
+        self._checkpoint_file = checkpoint
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_interval = checkpoint_interval
+        self._checkpoint_time = time.time()
 
         super(InvasionPercolation,self).run()
 
+    @Tools.traced
     def _setup_for_IP(self):
         r"""
         Determines cluster labelling and condition for completion
@@ -286,8 +314,16 @@ class InvasionPercolation(GenericAlgorithm):
         self._setup_for_IP()
         self._condition_update()
         #self['throat.cluster_final'] = np.zeros(self._net.num_throats())
+        self._do_outer_iterations()
+
+    @Tools.traced
+    def _do_outer_iterations(self):
+        r"""
+        Iterates until the end condition is met, then calculates saturations
+        """
         while self._condition:
             self._do_one_outer_iteration()
+            self._checkpoint_update()
 
         #Calculate Saturations
         v_total = sp.sum(self._net['pore.volume'])+sp.sum(self._net['throat.volume'])
@@ -365,7 +401,10 @@ class InvasionPercolation(GenericAlgorithm):
         r"""
         Executes one inner iteration
         """
-        logger.debug("    Inner Iteration")
+        # The debug messages below are only built when they will be shown
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("    Inner Iteration")
         # Fill throat and connecting pore
         # Pop out the largest throat (lowest inv_Pc) in the list, read the throat number
         tinvade = heapq.heappop(self._tpoints[self._current_cluster-1])[1]
@@ -373,19 +412,19 @@ class InvasionPercolation(GenericAlgorithm):
         fullCluster =  self._current_cluster
         if self._tpoints[self._current_cluster-1] == []:
             emptyCluster = self._current_cluster
-        logger.debug( ' ')
-        logger.debug( '--------------------------------------------------')
-        logger.debug( 'STEP')
-        logger.debug(self._tseq)
-        logger.debug( 'trying to access cluster: ')
-        logger.debug(self._current_cluster)
-        logger.debug( 'when these clusters are active active: ')
-        logger.debug(sp.nonzero(self._cluster_data['active'])[0])
-        logger.debug( 'Haines at throat,time: ')
-        logger.debug(tinvade)
-        if self._timing:
-            logger.debug(self._sim_time)
-            pass
+        if debug:
+            logger.debug( ' ')
+            logger.debug( '--------------------------------------------------')
+            logger.debug( 'STEP')
+            logger.debug(self._tseq)
+            logger.debug( 'trying to access cluster: ')
+            logger.debug(self._current_cluster)
+            logger.debug( 'when these clusters are active active: ')
+            logger.debug(sp.nonzero(self._cluster_data['active'])[0])
+            logger.debug( 'Haines at throat,time: ')
+            logger.debug(tinvade)
+            if self._timing:
+                logger.debug(self._sim_time)
 
         # Mark throat as invaded
         self['throat.inv_seq'][tinvade] = self._tseq
@@ -404,8 +443,9 @@ class InvasionPercolation(GenericAlgorithm):
             # Label invaded throat with smaller cluster number
             #find cluster 1
             clusters = self._cluster_data['transform'][self['pore.cluster_final'][Pores]-1]
-            logger.debug('clusters = ')
-            logger.debug(clusters)
+            if debug:
+                logger.debug('clusters = ')
+                logger.debug(clusters)
             self._current_cluster = min(clusters)
             self['throat.cluster_final'][tinvade] = self._current_cluster
             # if pores are from 2 different clusters:
@@ -461,13 +501,14 @@ class InvasionPercolation(GenericAlgorithm):
             self['throat.cluster_final'][tinvade] = self._current_cluster
             # find univaded pore, NewPore
             self._NewPore = Pores[self['pore.cluster_final'][Pores]==0][0]
-            logger.debug( ' ')
-            logger.debug( 'INVADING PORE: ')
-            logger.debug(self._NewPore)
-            logger.debug('the other pore is one of: ')
-            logger.debug(Pores)
-            logger.debug( 'position: ')
-            logger.debug(self._net['pore.coords'][self._NewPore])
+            if debug:
+                logger.debug( ' ')
+                logger.debug( 'INVADING PORE: ')
+                logger.debug(self._NewPore)
+                logger.debug('the other pore is one of: ')
+                logger.debug(Pores)
+                logger.debug( 'position: ')
+                logger.debug(self._net['pore.coords'][self._NewPore])
             # label that pore as invaded
             self['pore.cluster_final'][self._NewPore] = self._current_cluster
             self['pore.cluster_original'][self._NewPore] = self._current_cluster
@@ -484,10 +525,11 @@ class InvasionPercolation(GenericAlgorithm):
             for j in neighbors:
                 # If a throat is not labelled as invaded by the cluster, it must be an interfacial throat
                 if (j not in self._tlists[self._current_cluster-1]):
-                    logger.debug( 'new throat:')
-                    logger.debug(j)
-                    logger.debug('connecting pores:')
-                    logger.debug(self._net.find_connected_pores(j))
+                    if debug:
+                        logger.debug( 'new throat:')
+                        logger.debug(j)
+                        logger.debug('connecting pores:')
+                        logger.debug(self._net.find_connected_pores(j))
                     # Add this throat data (pressure, number) to this cluster's "heap" of throat data.
                     heapq.heappush(self._tpoints[self._current_cluster-1],(self._phase['throat.'+self._capillary_pressure_name][j],j))
                     # Add new throat number to throat list for this cluster
@@ -625,7 +667,141 @@ class InvasionPercolation(GenericAlgorithm):
         self._cluster_data['active'][cl_num-1] = 0
         self._tpoints[cl_num-1] = []
 
+    def _checkpoint_update(self):
+        r"""
+        Writes a checkpoint if the step count or elapsed time calls for one
+        """
+        if self._checkpoint_file is None:
+            return
+        due = False
+        if self._checkpoint_every:
+            due = (self._counter % self._checkpoint_every) == 0
+        if self._checkpoint_interval:
+            due = due or (time.time() - self._checkpoint_time >= self._checkpoint_interval)
+        if due:
+            self.save_checkpoint()
+
+    @Tools.traced
+    def save_checkpoint(self,filename=None):
+        r"""
+        Writes the current state of the algorithm to a binary file
 
+        Parameters
+        ----------
+        filename : string, optional
+            Name of the checkpoint file.  If not given the ``checkpoint`` file
+            specified when ``run`` was called is used.
+
+        Notes
+        -----
+        The pore and throat arrays of the algorithm and any array valued
+        attributes are stored as separate members of an npz archive.  The
+        remaining state (the interface heaps, cluster data, sequence counters
+        and simulation clock) is pickled into a single member.  The file is
+        written under a temporary name and then moved into place, so an
+        interruption during writing leaves the previous checkpoint intact.
+
+        The network and phases are not stored, only the names of the phases.
+        """
+        if filename is None:
+            filename = self._checkpoint_file
+        if filename is None:
+            raise Exception('No checkpoint file was specified')
+        arrays = {}
+        state = {}
+        for key in self.keys():
+            arrays['data:'+key] = np.asarray(self[key])
+        for attr,value in self.__dict__.items():
+            if (attr in self._checkpoint_skip) or isinstance(value,Core):
+                continue
+            if type(value) == np.ndarray:
+                arrays['attr:'+attr] = value
+            else:
+                state[attr] = value
+        state['_phase_names'] = [self._phase.name,self._phase_def.name]
+        state = pickle.dumps(state,protocol=pickle.HIGHEST_PROTOCOL)
+        arrays['state'] = np.frombuffer(state,dtype=np.uint8)
+        with open(filename+'.tmp','wb') as f:
+            np.savez(f,**arrays)
+        os.replace(filename+'.tmp',filename)
+        self._checkpoint_time = time.time()
+        logger.info('Checkpoint written to '+filename+' at step '+str(self._counter))
+
+    @Tools.traced
+    def resume(self,checkpoint,invading_phase=None,defending_phase=None):
+        r"""
+        Continues an interrupted run from a checkpoint file
+
+        Parameters
+        ----------
+        checkpoint : string
+            Name of a file written by ``save_checkpoint``, usually during a
+            ``run`` with the ``checkpoint`` argument
+        invading_phase, defending_phase : OpenPNM Phase Object, optional
+            The phases of the interrupted run.  If not given they are found by
+            name among the phases associated with the network.
+
+        Notes
+        -----
+        The algorithm must be attached to the same network as the
+        interrupted run.  The run continues with the checkpoint settings
+        that were in effect, and gives the same result as an uninterrupted
+        run.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> geo = OpenPNM.Geometry.TestGeometry(network=pn,pores=pn.pores(),throats=pn.throats())
+        >>> phase1 = OpenPNM.Phases.TestPhase(network=pn)
+        >>> phase2 = OpenPNM.Phases.TestPhase(network=pn)
+        >>> phys1 = OpenPNM.Physics.TestPhysics(network=pn, phase=phase1,pores=pn.pores(),throats=pn.throats())
+        >>> IP = OpenPNM.Algorithms.InvasionPercolation(network=pn)
+        >>> IP.run(invading_phase=phase1, defending_phase=phase2, inlets=pn.pores('top'), outlets=pn.pores('bottom'), report=0, checkpoint='IP.chk', checkpoint_every=25) # doctest: +ELLIPSIS
+             IP algorithm at 0 % completion at ... seconds
+             IP algorithm at 100% completion at  ...  seconds
+        >>> IP2 = OpenPNM.Algorithms.InvasionPercolation(network=pn)
+        >>> IP2.resume('IP.chk') # doctest: +ELLIPSIS
+             IP algorithm at 100% completion at  ...  seconds
+        >>> all(IP2['pore.inv_seq'] == IP['pore.inv_seq'])
+        True
+        >>> import os
+        >>> os.remove('IP.chk')
+        """
+        data = {}
+        attrs = {}
+        with np.load(checkpoint) as f:
+            for item in f.files:
+                if item.startswith('data:'):
+                    data[item[5:]] = f[item]
+                elif item.startswith('attr:'):
+                    attrs[item[5:]] = f[item]
+            state = pickle.loads(f['state'].tobytes())
+        if (sp.size(data['pore.all']) != self._net.num_pores()) or \
+           (sp.size(data['throat.all']) != self._net.num_throats()):
+            raise Exception('The checkpoint does not match the network of '+self.name)
+        phases = {}
+        for phase in self._net._phases:
+            phases[phase.name] = phase
+        names = state.pop('_phase_names')
+        if invading_phase is None:
+            invading_phase = phases[names[0]]
+        if defending_phase is None:
+            defending_phase = phases[names[1]]
+        self._phase = invading_phase
+        self._phase_def = defending_phase
+        self.__dict__.update(state)
+        self.__dict__.update(attrs)
+        for key in data.keys():
+            if key not in ['pore.all','throat.all']:
+                self[key] = data[key]
+        logger.info('Resuming from '+checkpoint+' at step '+str(self._counter))
+        misc.tic()
+        self._checkpoint_time = time.time()
+        self._do_outer_iterations()
+
+
+    @Tools.traced
     def return_results(self,occupancy='occupancy',IPseq=None,IPsat=None,IPpres=None):
         r"""
 
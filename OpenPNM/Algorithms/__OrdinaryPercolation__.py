@@ -8,9 +8,8 @@ module __OrdinaryPercolation__: Ordinary Percolation Algorithm
 
 import scipy as sp
 import numpy as np
-import matplotlib.pyplot as plt
 from OpenPNM.Algorithms import GenericAlgorithm
-from OpenPNM.Base import logging
+from OpenPNM.Base import logging, Tools
 logger = logging.getLogger(__name__)
 
 class OrdinaryPercolation(GenericAlgorithm):
@@ -65,6 +64,7 @@ class OrdinaryPercolation(GenericAlgorithm):
         
         logger.debug("Create Drainage Percolation Algorithm Object")
 
+    @Tools.traced
     def run(self,
             inlets,
             npts=25,
@@ -141,6 +141,7 @@ class OrdinaryPercolation(GenericAlgorithm):
             self._inv_points = inv_points
         self._do_outer_iteration_stage()
 
+    @Tools.traced
     def _do_outer_iteration_stage(self):
         #Generate curve from points
         for inv_val in self._inv_points:
@@ -168,6 +169,7 @@ class OrdinaryPercolation(GenericAlgorithm):
             self['pore.inv_sat'][inv_pores] = sat
             self['throat.inv_sat'][inv_throats] = sat
 
+    @Tools.traced
     def _do_one_inner_iteration(self,inv_val):
         r"""
         Determine which throats are invaded at a given applied capillary pressure
@@ -213,6 +215,7 @@ class OrdinaryPercolation(GenericAlgorithm):
         tmask = (pmask[temp[:,0]] + pmask[temp[:,1]])*(Tinvaded)
         self._t_inv[(self._t_inv==sp.inf)*(tmask)] = inv_val
 
+    @Tools.traced
     def evaluate_trapping(self, outlets):
         r"""
         Finds trapped pores and throats after a full ordinary
@@ -330,6 +333,7 @@ class OrdinaryPercolation(GenericAlgorithm):
           r"""
           Plot drainage capillary pressure curve
           """
+          import matplotlib.pyplot as plt
           try:
             PcPoints = sp.unique(self['pore.inv_Pc'])
           except:
@@ -369,6 +373,7 @@ class OrdinaryPercolation(GenericAlgorithm):
           and total saturation of the wetting phase on the abscissa.
           This is the preffered style in the petroleum engineering
           """
+          import matplotlib.pyplot as plt
           try:
             PcPoints = sp.unique(self['pore.inv_Pc'])
           except:
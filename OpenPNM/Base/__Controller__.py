@@ -5,9 +5,14 @@ Controller:  Overall controller class
 '''
 import pickle as _pickle
 import copy as _copy
+import json as _json
+import tracemalloc as _tracemalloc
+import atexit as _atexit
+import shutil as _shutil
+import tempfile as _tempfile
 import time, random, string
 import OpenPNM
-from OpenPNM.Base import logging
+from OpenPNM.Base import logging, Tools
 logger = logging.getLogger()
 
 class Controller(dict):
@@ -19,6 +24,15 @@ class Controller(dict):
     # of every OpenPNM object is the same, AND if you create a ctrl on the
     # command line (ctrl = OpenPNM.Base.Controller()) it will be the same ctrl!
     __instance__ = None
+    # Profiling is stored on the class so it survives ``clear``, and so models
+    # can check it without looking up the Controller instance
+    _profiling = False
+    # The storage dtype policy is also kept on the class so every object can
+    # look it up cheaply, see Core._get_dtype
+    _dtype_policy = {'index':'auto','float':'float64'}
+    # Likewise for the array storage backend, see Core._store
+    _storage = {'backend':'memory','path':None,'min_bytes':2**20}
+    _scratch_dirs = {}
     def __new__(cls, *args,**kwargs):
         if Controller.__instance__ is None:
             Controller.__instance__ = dict.__new__(cls)
@@ -59,6 +73,245 @@ class Controller(dict):
         
     loglevel = property(fget=_getloglevel,fset=_setloglevel)
 
+    def _set_profiling(self,flag):
+        if flag and not Controller._profiling:
+            if not _tracemalloc.is_tracing():
+                _tracemalloc.start()
+        elif Controller._profiling and not flag:
+            if _tracemalloc.is_tracing():
+                _tracemalloc.stop()
+        Controller._profiling = bool(flag)
+
+    def _get_profiling(self):
+        return Controller._profiling
+
+    profiling = property(fget=_get_profiling,fset=_set_profiling)
+
+    def profile_report(self,filename=''):
+        r'''
+        Collects the run-time statistics of every model on every object in the
+        Controller into a single table, sorted by cumulative run time.
+
+        Parameters
+        ----------
+        filename : string, optional
+            If given, the report is also written to this file in JSON format.
+
+        Notes
+        -----
+        Statistics are only collected while ``profiling`` is set to True.
+        When profiling is off the only cost is a single flag check per model
+        call.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> ctrl = OpenPNM.Base.Controller()
+        >>> ctrl.profiling = True
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> geom = OpenPNM.Geometry.TestGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+        >>> report = ctrl.profile_report()
+        >>> report[geom.name+':pore.seed']['calls']
+        1
+        >>> ctrl.profiling = False
+        '''
+        rows = []
+        for obj in list(self.values()):
+            for propname in obj.models.keys():
+                stats = dict(obj.models[propname]._stats)
+                if stats['calls'] == 0:
+                    continue
+                model = obj.models[propname]['model']
+                stats['object'] = obj.name
+                stats['propname'] = propname
+                stats['model'] = model.__module__+'.'+model.__name__
+                rows.append(stats)
+        rows.sort(key=lambda row: row['total_time'],reverse=True)
+        report = Tools.ProfileTable()
+        for row in rows:
+            report[row['object']+':'+row['propname']] = row
+        if filename != '':
+            filename = filename.split('.')[0]+'.json'
+            with open(filename,'w') as f:
+                _json.dump(report,f,indent=2)
+        return report
+
+    def _set_tracing(self,flag):
+        Tools.Tracer.enabled = bool(flag)
+
+    def _get_tracing(self):
+        return Tools.Tracer.enabled
+
+    tracing = property(fget=_get_tracing,fset=_set_tracing)
+
+    def trace_report(self,filename=''):
+        r'''
+        Returns a table of the timing spans and counters recorded while
+        ``tracing`` was set to True, with spans sorted by cumulative time.
+
+        Parameters
+        ----------
+        filename : string, optional
+            If given, the recorded events are also written to this file as a
+            Chrome trace (see ``export_trace``).
+
+        Notes
+        -----
+        Spans are recorded for the main methods of networks, models and
+        algorithms, and counters are kept for array allocations and sparse
+        matrix rebuilds.  When tracing is off the only cost is a single flag
+        check per span.  Recorded data is kept until ``Tools.Tracer.clear``
+        is called.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> ctrl = OpenPNM.Base.Controller()
+        >>> OpenPNM.Base.Tools.Tracer.clear()
+        >>> ctrl.tracing = True
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> geom = OpenPNM.Geometry.TestGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+        >>> ctrl.tracing = False
+        >>> report = ctrl.trace_report()
+        >>> report[geom.name+':pore.seed']['calls']
+        1
+        >>> report['array.store']['value'] > 0
+        True
+        >>> OpenPNM.Base.Tools.Tracer.clear()
+        '''
+        if filename != '':
+            self.export_trace(filename)
+        return Tools.Tracer.summary()
+
+    def export_trace(self,filename=''):
+        r'''
+        Writes the spans and counters recorded while ``tracing`` was set to
+        True to a JSON file in the Chrome trace event format, which can be
+        opened in chrome://tracing or https://ui.perfetto.dev.
+
+        Parameters
+        ----------
+        filename : string, optional
+            The file name, the '.json' extension is added if missing.  If
+            not given a time stamped name is used.
+        '''
+        if filename == '':
+            filename = 'trace_'+time.strftime('%Y%m%d_%H%M%S')
+        if not filename.endswith('.json'):
+            filename = filename+'.json'
+        Tools.Tracer.export(filename)
+        return filename
+
+    def _set_dtype_policy(self,policy):
+        temp = dict(Controller._dtype_policy)
+        temp.update(policy)
+        if temp['index'] not in ['auto','int32','int64']:
+            raise Exception('index dtype must be one of \'auto\', \'int32\' or \'int64\'')
+        if temp['float'] not in ['float32','float64']:
+            raise Exception('float dtype must be one of \'float32\' or \'float64\'')
+        Controller._dtype_policy = temp
+
+    def _get_dtype_policy(self):
+        return dict(Controller._dtype_policy)
+
+    dtype_policy = property(fget=_get_dtype_policy,fset=_set_dtype_policy)
+
+    def _set_storage(self,storage):
+        temp = dict(Controller._storage)
+        temp.update(storage)
+        if temp['backend'] not in ['memory','memmap']:
+            raise Exception('storage backend must be either \'memory\' or \'memmap\'')
+        Controller._storage = temp
+
+    def _get_storage(self):
+        r'''
+        A dictionary controlling where pore and throat arrays are stored, with
+        the following keys:
+
+        * 'backend' : Either 'memory' (default) to keep arrays in RAM, or
+        'memmap' to keep them in memory mapped files in a scratch directory.
+
+        * 'path' : The directory in which the scratch directory is created.
+        The system's temporary directory is used if None (default).
+
+        * 'min_bytes' : Arrays smaller than this are kept in memory even when
+        the backend is 'memmap'.  The default is 1 MB.
+
+        The scratch directory and its files are deleted when Python exits.
+        Individual objects can override these settings through their own
+        ``storage`` attribute.
+        '''
+        return dict(Controller._storage)
+
+    storage = property(fget=_get_storage,fset=_set_storage)
+
+    def _get_scratch_dir(self,path=None):
+        r'''
+        Returns the scratch directory for memory mapped arrays inside the given
+        ``path`` (or the system's temporary directory), creating it on first
+        use and scheduling it for removal when Python exits.
+        '''
+        if path not in Controller._scratch_dirs.keys():
+            scratch = _tempfile.mkdtemp(prefix='OpenPNM_',dir=path)
+            _atexit.register(_shutil.rmtree,scratch,True)
+            Controller._scratch_dirs[path] = scratch
+        return Controller._scratch_dirs[path]
+
+    def memory_report(self):
+        r'''
+        Reports the memory used by the arrays on each object in the Controller
+        and how much is saved relative to storing everything in full precision
+        (float64 and int64, with scalars broadcast to full arrays).
+
+        Notes
+        -----
+        The storage dtypes are set with ``dtype_policy``, a dictionary with the
+        following keys:
+
+        * 'index' : The dtype of integer arrays such as 'throat.conns'.  The
+        default is 'auto', which uses int32 when the values fit and int64
+        otherwise.  Integer arrays narrower than 32 bits are stored as written,
+        and ``extend`` pads integer arrays with -1.  Labels are always bool.
+
+        * 'float' : The dtype of float properties on Geometry and Physics
+        objects, either 'float64' (default) or 'float32'.  Network, Phase and
+        Algorithm objects always keep float64 so solver vectors are unaffected.
+
+        The policy can be overridden on individual objects with their own
+        ``dtype_policy`` attribute.  It is applied when data is written, so it
+        should be set before the objects are created.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> ctrl = OpenPNM.Base.Controller()
+        >>> ctrl.dtype_policy = {'float':'float32'}
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> geom = OpenPNM.Geometry.TestGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+        >>> geom['pore.diameter'].dtype
+        dtype('float32')
+        >>> report = ctrl.memory_report()
+        >>> report[geom.name]['saved'] > 0
+        True
+        >>> ctrl.dtype_policy = {'float':'float64'}
+        '''
+        report = Tools.MemoryTable()
+        for obj in list(self.values()):
+            used = 0
+            full = 0
+            for key in dict.keys(obj):
+                value = dict.__getitem__(obj,key)
+                if (type(value) is Tools.UniformArray) and value._is_uniform():
+                    used += value.itemsize
+                else:
+                    used += value.nbytes
+                if value.dtype.kind in ['f','i','u']:
+                    full += value.size*8
+                else:
+                    full += value.nbytes
+            report[obj.name] = {'used':used,'full':full,'saved':full-used}
+        return report
+
     def show_tree(self):
         r'''
         Prints a heirarchical list of object associations
@@ -235,6 +488,16 @@ class Controller(dict):
         to the objects associated with the original object.  The cloned object is
         not associated with the Network.
 
+        Notes
+        -----
+        The ghost shares the memory of the original object's arrays, which
+        is made read-only on both objects.  Whichever object first writes to
+        a shared array in place gets its own copy of it (see
+        ``Tools.SharedArray``), so writes on either side are never seen by the
+        other.  Arrays of the original held from before the ghost was made
+        are read-only as well, so they must be fetched again before writing.
+        The models of the ghost are shallow copies of the original's models.
+
         Examples
         --------
         >>> import OpenPNM
@@ -247,15 +510,71 @@ class Controller(dict):
         True
         >>> pn2.controller is ctrl # pn2 is not associated with existing Controller
         False
+        >>> pn2['pore.coords'][0] = [0,0,0]  # Writing to pn2 leaves pn unchanged
+        >>> pn['pore.coords'][0]
+        array([ 0.5,  0.5,  0.5])
 
         '''
-        obj_new = _copy.deepcopy(obj)
-        obj_new.__dict__ = obj.__dict__
+        obj_new = obj._shared_copy()
+        obj_new.__dict__ = obj.__dict__.copy()
+        self._copy_attributes(obj,obj_new)
+        self._remap_models({id(obj) : obj_new})
         obj_new.controller = {}
-        del self[obj.name]
-        self[obj.name] = obj
         return obj_new
 
+    def _copy_attributes(self,obj,obj_new):
+        r'''
+        Gives ``obj_new`` its own copies of the bookkeeping attributes of
+        ``obj`` that change when arrays are written: the write counters, the
+        cache of interleaved arrays and the models, which are copied
+        shallowly so the model functions and arguments are shared.
+        '''
+        obj_new._versions = obj._versions.copy()
+        obj_new._interleave_cache = {}
+        if obj.models is not None:
+            obj_new.models = obj.models.copy()
+            for key in obj.models.keys():
+                obj_new.models[key]._memo_key = obj.models[key]._memo_key
+
+    def _copy_on_write(self,obj,memo):
+        r'''
+        Returns a copy of ``obj`` whose arrays are shared with ``obj`` until
+        either of them writes to them (see ``Core._shared_copy``), along with
+        copies of the Network, Geometries, Phases and Physics associated with
+        it.
+        ``memo`` maps the id of each object already copied to its copy, as in
+        ``copy.deepcopy``.  Other attributes are copied shallowly.
+        '''
+        if id(obj) in memo:
+            return memo[id(obj)]
+        obj_new = obj._shared_copy()
+        memo[id(obj)] = obj_new
+        for key,value in obj.__dict__.items():
+            if (key == '_net') and (value is not None):
+                value = self._copy_on_write(value,memo)
+            elif key in ['_phases','_geometries','_physics']:
+                value = [self._copy_on_write(item,memo) for item in value]
+            elif not (isinstance(value,OpenPNM.Base.Core) or (value is self)):
+                value = _copy.copy(value)
+            obj_new.__dict__[key] = value
+        self._copy_attributes(obj,obj_new)
+        return obj_new
+
+    def _remap_models(self,memo):
+        r'''
+        Points the memoization keys of the models on the copies in ``memo``
+        at the copied objects, so that 'on_access' models are not rerun
+        until one of their inputs is written
+        '''
+        for obj_new in memo.values():
+            if obj_new.models is None:
+                continue
+            for model in obj_new.models.values():
+                if model._memo_key is not None:
+                    model._memo_key = tuple([(id(memo[item[0]]),)+item[1:]
+                                             if item[0] in memo else item
+                                             for item in model._memo_key])
+
     def save_object(self,obj,filename=''):
         r'''
         Save a single OpenPNM object to a 'pno' file.  The main purpose of this
@@ -300,9 +619,9 @@ class Controller(dict):
         obj = _pickle.load(open(filename+'.pno','rb'))
         obj.controller = self
 
-    def save(self,filename=''):
+    def save(self,filename='',fileformat='pnm',compress=False):
         r'''
-        Save the entire state of the Controller to a 'pnm' file.
+        Save the entire state of the Controller to a file.
 
         Parameters
         ----------
@@ -310,6 +629,18 @@ class Controller(dict):
             The file name to save as. If none is given the name of the Network
             object is used.
 
+        fileformat : string, optional
+            The format of the file.  Options are:
+
+            * 'pnm' : (default) The Controller is pickled into a single file
+
+            * 'npz' or 'hdf5' : Each array is stored as a separate dataset
+            along with a JSON description of the objects and their models.
+            These files can be loaded partially or lazily, see ``load``.
+
+        compress : boolean, optional
+            Compress the datasets of the 'npz' and 'hdf5' formats.
+
         Examples
         --------
         >>> import OpenPNM
@@ -324,23 +655,48 @@ class Controller(dict):
         >>> ctrl.load('test.pnm')
         >>> pn.name in ctrl.keys()
         True
+        >>> ctrl.save('test',fileformat='npz')
+        >>> ctrl.clear()
+        >>> ctrl.load('test.npz',lazy=True)
+        >>> ctrl[pn.name].Np == pn.Np
+        True
+        >>> import os
+        >>> os.remove('test.npz')
         '''
         if filename == '':
             filename = self.networks()[0].name
         else:
             filename = filename.split('.')[0]
 
-        #Save nested dictionary pickle
-        _pickle.dump(self,open(filename+'.pnm','wb'))
+        if fileformat == 'pnm':
+            #Save nested dictionary pickle
+            _pickle.dump(self,open(filename+'.pnm','wb'))
+        else:
+            import OpenPNM.Utilities.IO as io
+            io.Columnar.save(objs=list(self.values()),
+                             filename=filename,
+                             fileformat=fileformat,
+                             compress=compress)
 
-    def load(self,filename):
+    def load(self,filename,props=None,lazy=False):
         r'''
-        Load an entire Controller from a 'pnm' file.
+        Load an entire Controller from a file written by ``save``.
 
         Parameters
         ----------
         filename : string
-            The file name of the Controller to load.
+            The file name of the Controller to load.  The format is determined
+            by the extension, with 'pnm' assumed if there is none.
+
+        props : list of strings, optional
+            Only applies to 'npz' and 'hdf5' files.  The properties to read,
+            such as 'pore.diameter'.  Labels, 'coords' and 'conns' are always
+            read.  If not given all properties are read.
+
+        lazy : boolean, optional
+            Only applies to 'npz' and 'hdf5' files.  If True, uncompressed
+            arrays are memory mapped so data is only read from disk when it is
+            used.  Writing to these arrays does not change the file.
 
         Notes
         -----
@@ -348,11 +704,21 @@ class Controller(dict):
         over write the calling objects information AND remove any references
         to the calling object from existing objects.
         '''
-        filename = filename.split('.')[0]
         if self != {}:
             print('Warning: Loading data onto non-empty controller object, existing data will be lost')
             self.clear()
-        self = _pickle.load(open(filename+'.pnm','rb'))
+        ext = filename.rsplit('.',1)[-1] if '.' in filename else 'pnm'
+        if ext in ['npz','hdf5','h5']:
+            import OpenPNM.Utilities.IO as io
+            io.Columnar.load(filename,props=props,lazy=lazy,controller=self)
+            return
+        filename = filename.split('.')[0]
+        temp = _pickle.load(open(filename+'.pnm','rb'))
+        #The Controller is a singleton so unpickling usually returns self
+        if temp is not self:
+            super(Controller,self).update(temp)
+        for item in self.values():
+            item._ctrl = self
 
     def export(self,filename='',fileformat='VTK'):
         r'''
@@ -440,30 +806,55 @@ class Controller(dict):
         that can be trimmed to a smaller size.  This small simulation will 
         result in much faster Algorithms calculations.
 
+        Cloning does not copy any contiguous arrays.  Each clone shares the
+        memory of the arrays of its original, which is made read-only on both
+        objects, and reading it never copies it.  Whichever object first
+        writes to a shared array in place gets its own copy of it (see
+        ``Tools.SharedArray``), so writes on either side are never seen by the
+        other, and trimming a clone only allocates the arrays of the trimmed
+        clone.  Arrays of the originals held from before cloning are
+        read-only as well, so they must be fetched again before writing.
+        Models are copied shallowly.
+
         Examples
         --------
-        None yet
+        >>> import OpenPNM
+        >>> import scipy as sp
+        >>> ctrl = OpenPNM.Base.Controller()
+        >>> pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+        >>> geo = OpenPNM.Geometry.GenericGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+        >>> geo['pore.diameter'] = sp.arange(pn.Np)*0.1
+        >>> net = ctrl.clone_simulation(pn,name='clone')
+        >>> geo_clone = net.geometries()[0]
+        >>> geo_clone == geo.name + '_clone'
+        True
+        >>> ctrl[geo_clone]['pore.diameter'][0] = 5.0  # Writing to the clone
+        >>> geo['pore.diameter'][0]  # leaves the original unchanged
+        0.0
+        >>> geo['pore.diameter'][1] = 7.0  # and vice versa
+        >>> ctrl[geo_clone]['pore.diameter'][1]
+        0.10000000000000001
+        >>> net.trim(pores=pn.pores('top'))
+        >>> ctrl[geo_clone].Np
+        100
+        >>> pn.Np
+        125
         '''
         if network._parent != None:
             logger.error('Cannot clone a network that is already a clone')
             return
-        bak = {}
-        bak.update(self)
-        self.clear()
-        net = _copy.deepcopy(network)
-        self.update(net)
         if name == None:
             name = ''.join(random.choice(string.ascii_uppercase + string.ascii_lowercase + string.digits) for _ in range(5))
-        for item in list(self.keys()):
-            temp = self.pop(item)
+        memo = {}
+        net = self._copy_on_write(network,memo)
+        self._remap_models(memo)
+        for temp in memo.values():
             temp._parent = network
-            new_name = temp.name + '_' + name
-            temp.name = new_name
+            temp.name = temp.name + '_' + name
             self[temp.name] = temp
         # Add parent Network numbering to clone
         net['pore.'+network.name] = network.Ps
         net['throat.'+network.name] = network.Ts
-        self.update(bak)
         return net
 
 if __name__ == '__main__':
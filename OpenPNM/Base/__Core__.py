@@ -3,7 +3,7 @@
 Core:  Core Data Class
 ###############################################################################
 '''
-import pprint, string, random
+import pprint, string, random, os, mmap, tempfile, copy, weakref
 import scipy as sp
 import scipy.constants
 from OpenPNM.Base import logging, Tools
@@ -12,10 +12,25 @@ logger = logging.getLogger()
 from OpenPNM.Base import Controller
 ctrl = Controller()
 
+def _root_array(value):
+    r'''
+    Returns the array that owns the memory of ``value``
+    '''
+    while isinstance(value.base,sp.ndarray):
+        value = value.base
+    return value
+
+#The arrays handed out by __getitem__, by the id of the array owning their memory
+_handed_out = weakref.WeakValueDictionary()
+#The SharedArrays that have been written, by the id of the array they store
+_wrappers = weakref.WeakValueDictionary()
+
 class Core(dict):
     r'''
     Contains OpenPNM specificmethods for working with the data in the dictionaries
     '''
+    # Whether the 'float' entry of the dtype policy applies to this class
+    _float_policy = False
 
     def __new__(typ, *args, **kwargs):
         obj = dict.__new__(typ, *args, **kwargs)
@@ -29,6 +44,14 @@ class Core(dict):
         obj._physics = []
         obj._net = None
         obj._parent = None
+        #Initialize write counters used to detect changes to arrays
+        obj._versions = {}
+        #Initialize cache of arrays assembled from sub-objects
+        obj._interleave_cache = {}
+        #Initialize per-object overrides of the Controller's dtype policy
+        obj._dtype_policy = {}
+        #Initialize per-object overrides of the Controller's storage settings
+        obj._storage = {}
         #Initialize ordered dict for storing property models
         obj.models = ModelsDict()
         return obj    
@@ -48,6 +71,29 @@ class Core(dict):
         self.__class__.__name__,
         hex(id(self)))
 
+    def __getitem__(self,key):
+        r'''
+        This is a subclass of the default __getitem__ behavior.  If the
+        requested property is produced by a model with regen_mode 'on_access'
+        the model is run first, but only if its inputs have changed.  The
+        array returned is always the one stored, without copying it, so
+        arrays stored in compact or shared form (see ``Tools.UniformArray``
+        and ``Tools.SharedArray``) stay that way until written in place.
+        '''
+        models = self.models
+        if (models is not None) and (key in models):
+            if models[key].get('regen_mode') == 'on_access':
+                models[key]._refresh(master=self)
+        value = super(Core,self).__getitem__(key)
+        if isinstance(value,sp.ndarray):
+            if isinstance(value,Tools.SharedArray) and (value._owner is None):
+                value._set_owner(self,key)
+            #Remember the arrays handed out, so storing them again is noticed
+            root = _root_array(value)
+            if _handed_out.get(id(root)) is not root:
+                _handed_out[id(root)] = root
+        return value
+
     def __setitem__(self,key,value):
         r'''
         This is a subclass of the default __setitem__ behavior.  The main aim
@@ -69,33 +115,66 @@ class Core(dict):
         if (element != 'pore') and (element != 'throat'):
             print('Array name \''+key+'\' does not begin with \'pore\' or \'throat\'')
             return
-        #Convert value to an ndarray
-        value = sp.array(value,ndmin=1)
+        #Convert value to an ndarray, only copying when necessary
+        stored = dict.get(self,key)
+        if (type(value) is Tools.UniformArray) and value._is_uniform():
+            value = sp.array(value.value,ndmin=1)
+        elif (not isinstance(value,sp.ndarray)) or (sp.ndim(value) == 0):
+            value = sp.array(value,ndmin=1)
+        elif (stored is not None) and ((value is stored) or
+                                       (getattr(value,'_buffer',None) is stored)):
+            value = stored  # Writing a stored array back under its own key
+        elif (not value.flags.writeable) or self._is_stored(key,value):
+            value = sp.array(value)
+        elif isinstance(value,Tools.SharedArray):
+            value = value.view(sp.ndarray)
+        #Apply the storage dtype policy
+        if (value.dtype.kind in 'iu') and (value.dtype.itemsize >= 4):
+            N = 0
+            if sp.size(value):
+                N = max(int(sp.amax(value))+1,-int(sp.amin(value)))
+            dtype = self._get_dtype('index',N=N)
+            if N > sp.iinfo(dtype).max:
+                raise Exception(key+' does not fit in the index dtype '+dtype.name)
+            if value.dtype != dtype:
+                value = value.astype(dtype)
+        elif self._float_policy and (value.dtype.kind == 'f'):
+            dtype = self._get_dtype('float')
+            if value.dtype != dtype:
+                value = value.astype(dtype)
+        #Record the write so memoized models know their inputs changed
+        self._versions[key] = self._versions.get(key,0) + 1
         #Skip checks for 'coords', 'conns'
         if (key == 'pore.coords') or (key == 'throat.conns'):
-            super(Core, self).__setitem__(key,value)
+            self._store(key,value)
             return
         #Skip checks for protected props, and prevent changes if defined
         if key.split('.')[1] in ['all']:
             if key in self.keys():
                 if sp.shape(self[key]) == (0,):
-                    logger.debug(key+' is being defined.')
+                    logger.debug('%s is being defined.',key)
                     super(Core, self).__setitem__(key,value)
                 else:
                     logger.warning(key+' is already defined.')
                     pass
             else:
-                logger.debug(key+' is being defined.')
+                logger.debug('%s is being defined.',key)
                 super(Core, self).__setitem__(key,value)
             return
         #Write value to dictionary
-        if sp.shape(value)[0] == 1:  # If value is scalar
-            logger.debug('Broadcasting scalar value into vector: '+key)
-            value = sp.ones((self._count(element),),dtype=value.dtype)*value
+        if (sp.shape(value) == (1,)) and (self._count(element) > 0) \
+                and (not value.dtype.hasobject):  # If value is scalar
+            logger.debug('Storing scalar value as uniform vector: %s',key)
+            value = Tools.UniformArray(value[0],(self._count(element),))
+            value._set_owner(self,key)
             super(Core, self).__setitem__(key,value)
+        elif sp.shape(value)[0] == 1:
+            logger.debug('Broadcasting value into vector: %s',key)
+            value = sp.ones((self._count(element),),dtype=value.dtype)*value
+            self._store(key,value)
         elif sp.shape(value)[0] == self._count(element):
-            logger.debug('Updating vector: '+key)
-            super(Core, self).__setitem__(key,value)
+            logger.debug('Updating vector: %s',key)
+            self._store(key,value)
         else:
             if self._count(element) == 0:
                 self.update({key:value})
@@ -103,6 +182,188 @@ class Core(dict):
                 logger.warning('Cannot write vector with an array of the wrong length: '+key)
                 pass
             
+    def _is_stored(self,key,value):
+        r'''
+        Checks whether ``value``, or the array that it is a view of, has been
+        handed out by an OpenPNM object and is not the array stored under
+        ``key`` on this object.  Such arrays are copied on assignment so that
+        writing through one key does not change the other.
+        '''
+        root = _root_array(value)
+        if _handed_out.get(id(root)) is not root:
+            return False
+        stored = dict.get(self,key)
+        return not (isinstance(stored,sp.ndarray) and (_root_array(stored) is root))
+
+    def _protect(self,key,copy=False):
+        r'''
+        Stores the array under ``key`` as a read-only ``Tools.SharedArray``,
+        so that the next in-place write to it bumps its version.  If ``copy``
+        is True the values are copied before that write, which is needed if
+        they are shared with another object.  Returns the stored array.
+        '''
+        value = dict.get(self,key)
+        if not isinstance(value,sp.ndarray):
+            return value
+        if isinstance(value,Tools.SharedArray) and (not value.flags.writeable):
+            value._copy = value._copy or copy
+            return value
+        wrapper = _wrappers.get(id(value))
+        if (wrapper is not None) and (wrapper._buffer is value) \
+                and (wrapper._get_owner() is self) and (wrapper._key == key):
+            #Protect the array handed out before, as it may still be held
+            wrapper._protect(copy)
+            value = wrapper
+        else:
+            value = Tools.SharedArray(value,owner=self,key=key,copy=copy)
+        dict.__setitem__(self,key,value)
+        return value
+
+    def _array_written(self,key,array):
+        r'''
+        Called by a ``Tools.SharedArray`` stored under ``key`` when it is
+        first written in place.  The writable array replaces it in the
+        dictionary and the version of ``key`` is bumped.  An interleaved
+        array that is written is dropped from the cache.
+        '''
+        if dict.get(self,key) is array:
+            dict.__setitem__(self,key,array._buffer)
+            self._versions[key] = self._versions.get(key,0) + 1
+            _wrappers[id(array._buffer)] = array
+        cached = self._interleave_cache.get(key)
+        if (cached is not None) and (cached[1] is array):
+            del self._interleave_cache[key]
+
+    def _shared_copy(self):
+        r'''
+        Returns a new object of the same class holding the same arrays as
+        this one, without copying them.  Both objects store each shared array
+        as a read-only ``Tools.SharedArray``, which copies its values the
+        first time either object writes to it, so the write is not seen by
+        the other object.  Arrays that are not contiguous cannot be moved to
+        their copy in place, so they are copied now.  Only the arrays are
+        copied, the attributes of the new object are left at their defaults.
+        '''
+        new = self.__class__.__new__(self.__class__)
+        for key in list(dict.keys(self)):
+            value = dict.__getitem__(self,key)
+            if (type(value) is Tools.UniformArray) and value._is_uniform():
+                value = Tools.UniformArray(value.value,sp.shape(value))
+            elif isinstance(value,sp.ndarray) and (not value.flags.c_contiguous):
+                value = sp.array(value)
+            elif isinstance(value,sp.ndarray):
+                value = self._protect(key,copy=True)
+                value = Tools.SharedArray(value.view(sp.ndarray))
+            else:
+                value = copy.copy(value)
+            dict.__setitem__(new,key,value)
+        return new
+
+    def _set_dtype_policy(self,policy):
+        self._dtype_policy.update(policy)
+
+    def _get_dtype_policy(self):
+        temp = dict(Controller._dtype_policy)
+        temp.update(self._dtype_policy)
+        return temp
+
+    dtype_policy = property(_get_dtype_policy,_set_dtype_policy)
+
+    def _set_storage(self,storage):
+        self._storage.update(storage)
+
+    def _get_storage(self):
+        temp = dict(Controller._storage)
+        temp.update(self._storage)
+        return temp
+
+    storage = property(_get_storage,_set_storage)
+
+    def _store(self,key,value):
+        r'''
+        Writes an array to the dictionary, moving it into a memory mapped file
+        if the 'memmap' storage backend is active (see
+        ``Controller.storage``).  Returns the array as stored.
+        '''
+        storage = self.storage
+        old = dict.get(self,key)
+        if (storage['backend'] == 'memmap') and (value.nbytes >= storage['min_bytes']) \
+                and (not value.dtype.hasobject) and (not isinstance(value,Tools.SharedArray)):
+            if not self._is_scratch(value):
+                mapped = self._allocate(key,sp.shape(value),value.dtype)
+                mapped[...] = value
+                value = mapped
+        super(Core,self).__setitem__(key,value)
+        if Tools.Tracer.enabled and (old is not value):
+            Tools.Tracer.count('array.store')
+            Tools.Tracer.count('array.store_bytes',value.nbytes)
+        #Remove the file of the array being replaced, existing maps stay valid
+        if self._is_scratch(old) and (old is not value):
+            try:
+                os.remove(_root_array(old).filename)
+            except OSError:
+                pass
+        return value
+
+    def _allocate(self,key,shape,dtype):
+        r'''
+        Returns an uninitialized array for storing ``key``.  This is a
+        memory mapped file in the scratch directory when the 'memmap' storage
+        backend is active and the array is large enough, otherwise a normal
+        ndarray.  Data written to the returned array is stored without further
+        copying when it is assigned to ``key``.
+        '''
+        storage = self.storage
+        nbytes = int(sp.prod(shape))*sp.dtype(dtype).itemsize
+        if Tools.Tracer.enabled:
+            Tools.Tracer.count('array.allocate')
+            Tools.Tracer.count('array.allocate_bytes',nbytes)
+        if (storage['backend'] != 'memmap') or (nbytes < storage['min_bytes']) \
+                or (nbytes == 0) or sp.dtype(dtype).hasobject:
+            return sp.empty(shape,dtype=dtype)
+        scratch = ctrl._get_scratch_dir(storage['path'])
+        f,filename = tempfile.mkstemp(suffix='.dat',prefix=str(self.name)+'_'+key+'_',dir=scratch)
+        os.close(f)
+        return sp.memmap(filename,dtype=dtype,mode='w+',shape=shape)
+
+    def _is_scratch(self,value):
+        r'''
+        Checks whether an array is memory mapped from a scratch file, either
+        as the array that owns the mapping or as a view of it, such as the
+        trimmed slice of an array that was allocated too large
+        '''
+        if not isinstance(value,sp.ndarray):
+            return False
+        root = _root_array(value)
+        if (not isinstance(root,sp.memmap)) or (not isinstance(root.base,mmap.mmap)):
+            return False
+        scratch = list(Controller._scratch_dirs.values())
+        return os.path.dirname(root.filename) in scratch
+
+    def _get_dtype(self,kind,N=None):
+        r'''
+        Returns the storage dtype for the given kind of data according to the
+        dtype policy of this object (see ``Controller.memory_report``).
+
+        Parameters
+        ----------
+        kind : string
+            Either 'index' or 'float'
+
+        N : int, optional
+            The largest magnitude the index dtype must hold, used when it is
+            'auto'.  If not given the number of pores is used.
+        '''
+        policy = self._dtype_policy.get(kind,Controller._dtype_policy[kind])
+        if policy == 'auto':
+            if N is None:
+                N = self._count('pore')
+            if N < 2**31:
+                policy = 'int32'
+            else:
+                policy = 'int64'
+        return sp.dtype(policy)
+
     def _set_ctrl(self,controller):
         if self.name in controller.keys():
             raise Exception('An object with that name is already present in simulation')
@@ -765,6 +1026,7 @@ class Core(dict):
             raise Exception('Mask received was neither Np nor Nt long')
         return indices
 
+    @Tools.traced
     def interpolate_data(self,data):
         r"""
         Determines a pore (or throat) property as the average of it's neighboring
@@ -825,6 +1087,7 @@ class Core(dict):
             raise Exception()
         return values
 
+    @Tools.traced
     def _interleave_data(self,prop,sources):
         r'''
         Retrieves requested property from associated objects, to produce a full
@@ -846,6 +1109,14 @@ class Core(dict):
         This makes an effort to maintain the data 'type' when possible; however
         when data is missing this can be tricky.  Float and boolean data is
         fine, but missing ints are converted to float when nans are inserted.
+
+        When a single source covers all locations its own array is returned
+        without copying, so writing to the result writes to the source.
+        Otherwise the assembled array is cached and reused until one of the
+        sources writes ``prop``, in place or not, or the locations of a
+        source change.  The cached array and the source arrays are read-only
+        until next written (see ``Tools.SharedArray``).  Writing to the
+        returned array drops it from the cache, so it belongs to the caller.
         
         Examples
         --------
@@ -877,6 +1148,24 @@ class Core(dict):
         bool
         '''
         element = prop.split('.')[0]
+        #Check if sources were given as list of objects OR names
+        objs = []
+        for item in sources:
+            try: item.name
+            except: item = self._find_object(obj_name=item)
+            objs.append(item)
+        #A single source covering all locations can be returned without copying
+        if (len(objs) == 1) and ((prop in objs[0].keys()) or (prop in objs[0].models)) \
+                and (objs[0]._count(element) == self._count(element)):
+            return objs[0][prop]
+        #Bring any lazily computed source arrays up to date before stamping
+        for item in objs:
+            if (prop in item.models) and (item.models[prop].get('regen_mode') == 'on_access'):
+                item.models[prop]._refresh(master=item)
+        stamp = self._interleave_stamp(prop,objs)
+        cached = self._interleave_cache.get(prop)
+        if (cached is not None) and (cached[0] == stamp):
+            return cached[1]
         temp = sp.ndarray((self._count(element)))
         nan_locs = sp.ndarray((self._count(element)),dtype='bool')
         nan_locs.fill(False)
@@ -886,12 +1175,9 @@ class Core(dict):
         dtypenames = []
         prop_found = False  #Flag to indicate if prop was found on a sub-object
         values_dim=0
-        for item in sources:
-            #Check if sources were given as list of objects OR names
-            try: item.name
-            except: item = self._find_object(obj_name=item)
+        for item in objs:
             locations = self._get_indices(element=element,labels=item.name,mode='union')
-            if prop not in item.keys():
+            if (prop not in item.keys()) and (prop not in item.models):
                 values = sp.ones_like(locations)*sp.nan
                 dtypenames.append('nan')
                 dtypes.append(sp.dtype(bool))
@@ -931,15 +1217,41 @@ class Core(dict):
                 temp[~bool_locs]=False
                 logger.info(prop+' has been converted to bool, some data may be lost')
             else:
-                temp = sp.array(temp,dtype='float')
+                floats = [t for t in dtypes if t.kind == 'f']
+                if floats == []:
+                    floats = [sp.dtype(float)]
+                temp = sp.array(temp,dtype=max(floats))
                 logger.info(prop+' has been converted to float.')
         elif sp.all([t in ['object','nan'] for t in dtypenames]):  # If all entries are 'bool' (or 'nan')
             pass
         else:
             temp = sp.array(temp,dtype=max(dtypes))
             logger.info('Data type of '+prop+' differs between sub-objects...converting to larger data type')
+        #Make sure in-place writes to the sources or their locations are seen
+        for item in objs:
+            item._protect(prop)
+            self._protect(element+'.'+item.name)
+        temp = Tools.SharedArray(temp,owner=self,key=prop,copy=False)
+        self._interleave_cache[prop] = (stamp,temp)
         return temp
 
+    def _interleave_stamp(self,prop,objs):
+        r'''
+        Returns a tuple describing the state of everything that contributes to
+        the interleaved array of ``prop``.  The tuple changes whenever any of
+        the sources writes ``prop`` or when the locations of a source change,
+        so it can be compared against a stored stamp to validate a cache entry.
+        '''
+        element = prop.split('.')[0]
+        stamp = [self._count(element),self._versions.get(element+'.all',0)]
+        for item in objs:
+            stamp.append((id(item),
+                          prop in item.keys(),
+                          item._versions.get(prop,0),
+                          item._versions.get(element+'.all',0),
+                          self._versions.get(element+'.'+item.name,0)))
+        return tuple(stamp)
+
     def num_pores(self,labels='all',mode='union'):
         r'''
         Returns the number of pores of the specified labels
@@ -1116,6 +1428,7 @@ class Core(dict):
             temp['throat'] = self.num_throats()
         return temp
 
+    @Tools.traced
     def _map(self,element,locations,target,return_mapping):
         r'''
         '''
@@ -1311,6 +1624,7 @@ class Core(dict):
             return query
             
 
+    @Tools.traced
     def check_data_health(self,props=[],element='',quiet=False):
         r'''
         Check the health of pore and throat data arrays.
@@ -4,9 +4,11 @@ ModelsDict:  Abstract Class for Containing Models
 ###############################################################################
 '''
 import inspect
+import time
+import tracemalloc
 import scipy as sp
 from collections import OrderedDict
-from OpenPNM.Base import logging, Controller
+from OpenPNM.Base import logging, Controller, Tools
 logger = logging.getLogger()
 
 class GenericModel(dict):
@@ -18,6 +20,9 @@ class GenericModel(dict):
     """
     def __init__(self,**kwargs):
         self.update(**kwargs)
+        self._memo_key = None
+        self._refreshing = False
+        self._stats = {'calls':0,'total_time':0.0,'last_time':0.0,'nbytes':0,'peak_memory':0}
 
     def __call__(self):
         return self['model'](**self)
@@ -46,11 +51,18 @@ class GenericModel(dict):
         print(header)
         return ' '
         
-    def regenerate(self):
+    def regenerate(self,master=None):
         r'''
         Regenerate the model
+
+        Parameters
+        ----------
+        master : OpenPNM object, optional
+            The object on which this model is stored.  If not given it is
+            found by searching the Controller.
         '''
-        master = self._find_master()
+        if master is None:
+            master = self._find_master()
         #Determine object type, and assign associated objects
         self_type = [item.__name__ for item in master.__class__.__mro__]
         kwargs = {}
@@ -67,8 +79,161 @@ class GenericModel(dict):
         else:
             kwargs['network'] = master
         kwargs.update(self)
-        return self['model'](**kwargs)
-        
+        if Controller._profiling:
+            run = self._run_profiled
+        else:
+            run = self._evaluate
+        if Tools.Tracer.enabled:
+            with Tools.Tracer.span(master.name+':'+self['propname'],cat='model'):
+                value = run(kwargs,master)
+        else:
+            value = run(kwargs,master)
+        if self.get('regen_mode') == 'on_access':
+            self._memo_key = self._input_versions(master,protect=True)
+        return value
+
+    def _evaluate(self,kwargs,master):
+        r'''
+        Runs the model, either in a single call or one chunk at a time if a
+        'chunk_size' was given and the model is marked as chunkable
+        '''
+        if self.get('chunk_size') is None:
+            return self['model'](**kwargs)
+        if not getattr(self['model'],'chunkable',False):
+            logger.warning('The model for '+self['propname']+' is not marked as chunkable, evaluating in one call')
+            return self['model'](**kwargs)
+        try:
+            return self._evaluate_chunked(kwargs,master)
+        except Tools.ChunkError as e:
+            logger.warning('The model for '+self['propname']+' could not be evaluated in chunks ('+str(e)+'), evaluating in one call')
+            return self['model'](**kwargs)
+
+    def _evaluate_chunked(self,kwargs,master):
+        propname = self['propname']
+        element = propname.split('.')[0]
+        N = master._count(element)
+        size = int(self['chunk_size'])
+        value = None
+        for start in range(0,N,size):
+            stop = min(start+size,N)
+            temp = kwargs.copy()
+            for item in ['network','geometry','phase','physics']:
+                obj = kwargs.get(item)
+                if (obj is not None) and (obj._count(element) == N):
+                    temp[item] = Tools.ChunkView(obj,element,start,stop)
+            result = sp.array(self['model'](**temp),ndmin=1)
+            if sp.shape(result)[0] != stop-start:
+                raise Tools.ChunkError('it returned '+str(sp.shape(result)[0])+' values for a chunk of '+str(stop-start))
+            if value is None:
+                dtype = result.dtype
+                if master._float_policy and (dtype.kind == 'f'):
+                    dtype = master._get_dtype('float')
+                value = master._allocate(propname,(N,)+sp.shape(result)[1:],dtype)
+            value[start:stop] = result
+        if value is None:
+            value = self['model'](**kwargs)
+        return value
+
+    def _run_profiled(self,kwargs,master):
+        r'''
+        Runs the model while recording its wall time, the size of its output
+        and the peak memory allocated while it ran
+        '''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if hasattr(tracemalloc,'reset_peak'):
+            mem_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.clear_traces()  # Also resets the peak counter
+            mem_start = 0
+        t_start = time.perf_counter()
+        value = self._evaluate(kwargs,master)
+        t_run = time.perf_counter() - t_start
+        peak = tracemalloc.get_traced_memory()[1] - mem_start
+        stats = self._stats
+        stats['calls'] += 1
+        stats['total_time'] += t_run
+        stats['last_time'] = t_run
+        stats['nbytes'] = int(getattr(value,'nbytes',0))
+        stats['peak_memory'] = max(stats['peak_memory'],int(peak))
+        return value
+
+    def _inputs(self):
+        r'''
+        Returns the names of the pore and throat arrays that this model reads,
+        as inferred from its arguments
+        '''
+        inputs = []
+        for item in self.keys():
+            value = self[item]
+            if (item != 'propname') and (type(value) == str):
+                if value.split('.')[0] in ['pore','throat']:
+                    inputs.append(value)
+        return inputs
+
+    def _associated(self,master):
+        r'''
+        Returns a list of the objects from which this model might read data
+        '''
+        objs = [master]
+        if master._net is not None:
+            objs.append(master._net)
+            objs.extend(master._net._geometries)
+        objs.extend(master._phases)
+        objs.extend(master._physics)
+        for phase in master._phases:
+            objs.extend(phase._physics)
+        temp = []
+        for obj in objs:
+            if not any([obj is item for item in temp]):
+                temp.append(obj)
+        return temp
+
+    def _input_versions(self,master,protect=False):
+        r'''
+        Returns a tuple containing the current version of each input array on
+        each associated object, which is used as the memoization key.  The
+        arrays themselves are not read.
+
+        If ``protect`` is True the input arrays are made read-only until they
+        are next written (see ``Core._protect``), so that in-place writes such
+        as ``geom['pore.diameter'][:] = 2.0`` also bump their version.
+        '''
+        key = []
+        objs = self._associated(master)
+        for prop in self._inputs():
+            for obj in objs:
+                if protect:
+                    obj._protect(prop)
+                key.append((id(obj),prop,obj._versions.get(prop,0)))
+        return tuple(key)
+
+    def _refresh(self,master):
+        r'''
+        Regenerates an 'on_access' model, but only if any of its input arrays
+        have been written or changed in place since the model was last run.
+        Upstream 'on_access' models are refreshed first so their versions are
+        current.
+        '''
+        if self._refreshing:  # Break cycles between interdependent models
+            return
+        self._refreshing = True
+        try:
+            objs = self._associated(master)
+            for prop in self._inputs():
+                for obj in objs:
+                    if prop in obj.models:
+                        if obj.models[prop].get('regen_mode') == 'on_access':
+                            obj.models[prop]._refresh(master=obj)
+            propname = self['propname']
+            if (propname not in master.keys()) or \
+               (self._input_versions(master) != self._memo_key):
+                logger.debug('Computing on_access property: %s',propname)
+                master[propname] = self.regenerate(master=master)
+        finally:
+            self._refreshing = False
+
     def _find_master(self):
         ctrl = Controller()
         master = []
@@ -143,7 +308,35 @@ class ModelsDict(OrderedDict):
         
     def keys(self):
         return list(super(ModelsDict,self).keys())
+
+    def profile(self):
+        r'''
+        Returns a table of the run-time statistics collected for each model
+        while profiling was enabled on the Controller.
+
+        Notes
+        -----
+        For each model the table contains the number of calls, the cumulative
+        and last wall time in seconds, the size of the output array in bytes,
+        and the largest amount of temporary memory allocated during a call.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> ctrl = OpenPNM.Base.Controller()
+        >>> ctrl.profiling = True
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> geom = OpenPNM.Geometry.TestGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+        >>> geom.models.profile()['pore.seed']['calls']
+        1
+        >>> ctrl.profiling = False
+        '''
+        table = Tools.ProfileTable()
+        for item in self.keys():
+            table[item] = dict(self[item]._stats)
+        return table
             
+    @Tools.traced
     def regenerate(self, props='', mode='inclusive'):
         r'''
         This updates properties using any models on the object that were
@@ -179,9 +372,8 @@ class ModelsDict(OrderedDict):
         master = self._find_master()
         if props == '':  # If empty, assume all models are to be regenerated
             props = list(self.keys())
-            for item in props:  # Remove models if they are meant to be regenerated 'on_demand' only
-                if self[item]['regen_mode'] == 'on_demand':
-                    props.remove(item)
+            # Remove models that are only run when requested or read
+            props = [item for item in props if self[item]['regen_mode'] not in ['on_demand','on_access']]
         elif type(props) == str:
             props = [props]
         if mode == 'exclude':
@@ -190,13 +382,13 @@ class ModelsDict(OrderedDict):
                 temp.remove(item)
             props = temp
         for item in self.keys():
-            if self[item]['regen_mode'] == 'constant':
+            if (self[item]['regen_mode'] == 'constant') and (item in props):
                 props.remove(item)
         logger.info('Models are being recalculated in the following order: ')
         count = 0
         for item in props:
             if item in list(self.keys()):
-                master[item] = self[item].regenerate()
+                master[item] = self[item].regenerate(master=master)
                 logger.info(str(count)+' : '+item)
                 count += 1
             else:
@@ -226,6 +418,16 @@ class ModelsDict(OrderedDict):
 
             * 'on_demand' : The model is stored on the object but not run, AND will only run if specifically requested in ``regenerate``
 
+            * 'on_access' : The model is stored on the object but not run until the property is read.  The result is memoized and only recalculated when one of the model's input arrays has been written, or changed in place, since the last calculation.  Input arrays are identified from the 'pore.*' and 'throat.*' arguments of the model.  They are read-only until next written (see ``Tools.SharedArray``), so they cannot be used as the ``out`` argument of a ufunc before then.
+
+        chunk_size : int, optional
+            If given, the model is evaluated on chunks of this many pores or
+            throats at a time and the results are written into the output
+            array, which limits the memory used by temporary arrays.  Only
+            models marked with ``Tools.chunkable``, which compute each value
+            independently from arrays of the same element, accept this (see
+            ``Tools.ChunkView``).
+
         Notes
         -----
         This method is inherited by all net/geom/phys/phase objects.  It takes
@@ -269,12 +471,14 @@ class ModelsDict(OrderedDict):
             f.update(zip(keys,vals))
         # Update dictionary with supplied arguments, overwriting defaults
         f.update(**kwargs)
+        if (f.get('chunk_size') is not None) and not getattr(model,'chunkable',False):
+            raise Exception('The model for '+propname+' is not marked as chunkable, so it cannot be given a chunk_size')
         # Add model to ModelsDict
         self[propname] = f
         # Now generate data as necessary
         if regen_mode in ['normal','constant']:
-            master[propname] = self[propname].regenerate()
-        if regen_mode in ['deferred','on_demand']:
+            master[propname] = self[propname].regenerate(master=master)
+        if regen_mode in ['deferred','on_demand','on_access']:
             pass
 
     def reorder(self,new_order):
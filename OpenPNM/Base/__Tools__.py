@@ -4,6 +4,13 @@ Tools:  Useful classes for use throughout the project
 ###############################################################################
 '''
 import scipy as _sp
+import json as _json
+import time as _time
+import threading as _threading
+import functools as _functools
+import mmap as _mmap
+import warnings as _warnings
+import weakref as _weakref
 from collections import OrderedDict as _odict
 
 class PrintableList(list):
@@ -29,6 +36,225 @@ class PrintableDict(_odict):
         print(header)
         return ''
         
+class ProfileTable(_odict):
+    def __str__(self):
+        header = '-'*90
+        print(header)
+        print("{a:<40s} {b:>6s} {c:>10s} {d:>10s} {e:>10s} {f:>10s}".format(a='Model', b='Calls', c='Total (s)', d='Last (s)', e='Output (B)', f='Peak (B)'))
+        print(header)
+        for item in self.keys():
+            row = self[item]
+            name = item
+            if len(name) > 40:
+                name = name[0:37]+'...'
+            print("{a:<40s} {b:>6d} {c:>10.4f} {d:>10.4f} {e:>10d} {f:>10d}".format(a=name, b=row['calls'], c=row['total_time'], d=row['last_time'], e=row['nbytes'], f=row['peak_memory']))
+        print(header)
+        return ''
+
+class MemoryTable(_odict):
+    def __str__(self):
+        header = '-'*60
+        print(header)
+        print("{a:<25s} {b:>10s} {c:>10s} {d:>10s}".format(a='Object', b='Used (B)', c='Full (B)', d='Saved (B)'))
+        print(header)
+        for item in self.keys():
+            row = self[item]
+            print("{a:<25s} {b:>10d} {c:>10d} {d:>10d}".format(a=item, b=row['used'], c=row['full'], d=row['saved']))
+        print(header)
+        return ''
+
+class TraceTable(_odict):
+    def __str__(self):
+        header = '-'*90
+        print(header)
+        print("{a:<50s} {b:>8s} {c:>10s} {d:>10s}".format(a='Span / Counter', b='Calls', c='Total (s)', d='Max (s)'))
+        print(header)
+        for item in self.keys():
+            row = self[item]
+            name = item
+            if len(name) > 50:
+                name = name[0:47]+'...'
+            if 'total_time' in row:
+                print("{a:<50s} {b:>8d} {c:>10.4f} {d:>10.4f}".format(a=name, b=row['calls'], c=row['total_time'], d=row['max_time']))
+            else:
+                print("{a:<50s} {b:>8d} {c:>10s} {d:>10s}".format(a=name, b=row['calls'], c=str(row['value']), d=''))
+        print(header)
+        return ''
+
+class Tracer(object):
+    r'''
+    Collects nestable timing spans and event counters from the hot paths of
+    OpenPNM.  All state is stored on the class, and nothing is recorded
+    unless ``Tracer.enabled`` is True (see ``Controller.tracing``), in which
+    case each span costs two calls to ``time.perf_counter``.
+
+    Spans are opened with ``span``, which works both as a context manager and
+    as a decorator, or with the ``traced`` decorator which names the span
+    after the decorated function.  Spans may be nested freely.  Every span is
+    added to a summary of calls and times, and the first ``max_events`` are
+    also kept individually so they can be exported as a Chrome trace.
+
+    Examples
+    --------
+    >>> import OpenPNM
+    >>> Tracer = OpenPNM.Base.Tools.Tracer
+    >>> Tracer.clear()
+    >>> Tracer.enabled = True
+    >>> with Tracer.span('outer'):
+    ...     with Tracer.span('inner'):
+    ...         Tracer.count('things',2)
+    >>> Tracer.enabled = False
+    >>> summary = Tracer.summary()
+    >>> summary['inner']['calls']
+    1
+    >>> summary['things']['value']
+    2
+    >>> [event['name'] for event in Tracer.chrome_trace()['traceEvents'] if event['ph'] == 'X']
+    ['inner', 'outer']
+    >>> Tracer.clear()
+    '''
+    enabled = False
+    max_events = 10**6
+    events = []
+    stats = {}
+    counters = _odict()
+    _counts = {}
+    _t0 = _time.perf_counter()
+
+    @staticmethod
+    def span(name,cat='openpnm'):
+        r'''
+        Returns a timing span called ``name`` that can be used in a ``with``
+        statement or as a function decorator.
+        '''
+        return _Span(name,cat)
+
+    @staticmethod
+    def count(name,value=1):
+        r'''
+        Adds ``value`` to the counter called ``name``.
+        '''
+        if not Tracer.enabled:
+            return
+        total = Tracer.counters.get(name,0) + value
+        Tracer.counters[name] = total
+        Tracer._counts[name] = Tracer._counts.get(name,0) + 1
+        if len(Tracer.events) < Tracer.max_events:
+            Tracer.events.append(('C',name,'counter',_time.perf_counter(),total,
+                                  _threading.get_ident()))
+
+    @staticmethod
+    def clear():
+        r'''
+        Removes all recorded spans and resets the counters.
+        '''
+        del Tracer.events[:]
+        Tracer.stats.clear()
+        Tracer.counters.clear()
+        Tracer._counts.clear()
+        Tracer._t0 = _time.perf_counter()
+
+    @staticmethod
+    def _record(name,cat,start,stop):
+        duration = stop - start
+        row = Tracer.stats.get(name)
+        if row is None:
+            Tracer.stats[name] = [1,duration,duration]
+        else:
+            row[0] += 1
+            row[1] += duration
+            if duration > row[2]:
+                row[2] = duration
+        if len(Tracer.events) < Tracer.max_events:
+            Tracer.events.append(('X',name,cat,start,duration,
+                                  _threading.get_ident()))
+
+    @staticmethod
+    def summary():
+        r'''
+        Returns a table of the recorded spans, sorted by cumulative time,
+        followed by the counters.
+        '''
+        table = TraceTable()
+        rows = sorted(Tracer.stats.items(),key=lambda item: item[1][1],reverse=True)
+        for name,row in rows:
+            table[name] = {'calls':row[0],'total_time':row[1],'max_time':row[2]}
+        for name in Tracer.counters.keys():
+            table[name] = {'calls':Tracer._counts[name],'value':Tracer.counters[name]}
+        return table
+
+    @staticmethod
+    def chrome_trace():
+        r'''
+        Returns the recorded events in the Chrome trace event format, which
+        can be viewed in chrome://tracing or https://ui.perfetto.dev.  Times
+        are in microseconds from the last call to ``clear``.
+        '''
+        events = []
+        t0 = Tracer._t0
+        for ph,name,cat,start,value,tid in Tracer.events:
+            event = {'name':name,'cat':cat,'ph':ph,'pid':0,'tid':tid,
+                     'ts':(start-t0)*1e6}
+            if ph == 'X':
+                event['dur'] = value*1e6
+            else:
+                event['args'] = {name:value}
+            events.append(event)
+        return {'traceEvents':events,'displayTimeUnit':'ms'}
+
+    @staticmethod
+    def export(filename):
+        r'''
+        Writes the recorded events to ``filename`` as a Chrome trace.
+        '''
+        with open(filename,'w') as f:
+            _json.dump(Tracer.chrome_trace(),f)
+
+class _Span(object):
+    __slots__ = ('name','cat','_start')
+
+    def __init__(self,name,cat):
+        self.name = name
+        self.cat = cat
+        self._start = None
+
+    def __enter__(self):
+        if Tracer.enabled:
+            self._start = _time.perf_counter()
+        return self
+
+    def __exit__(self,*args):
+        if self._start is not None:
+            Tracer._record(self.name,self.cat,self._start,_time.perf_counter())
+            self._start = None
+        return False
+
+    def __call__(self,func):
+        return _wrap(func,self.name,self.cat)
+
+def _wrap(func,name,cat):
+    tracer = Tracer
+    record = Tracer._record
+    clock = _time.perf_counter
+    @_functools.wraps(func)
+    def wrapper(*args,**kwargs):
+        if not tracer.enabled:
+            return func(*args,**kwargs)
+        start = clock()
+        try:
+            return func(*args,**kwargs)
+        finally:
+            record(name,cat,start,clock())
+    return wrapper
+
+def traced(func):
+    r'''
+    Decorator that records each call of ``func`` as a span named after its
+    qualified name, such as 'GenericNetwork.trim'.
+    '''
+    return _wrap(func,func.__qualname__,func.__module__.split('.')[1]
+                 if func.__module__.startswith('OpenPNM.') else func.__module__)
+
 class AttributVeiew(object):
     def __init__(self, d):
         temp = {}
@@ -44,3 +270,541 @@ class ClonedCore(dict):
     def __init__(self,obj):
         self.update(obj)
         self.name = obj.name
+
+def _data_address(value):
+    return value.__array_interface__['data'][0]
+
+def _contiguous_strides(shape,itemsize):
+    strides = []
+    for n in reversed(shape):
+        strides.insert(0,itemsize)
+        itemsize = itemsize*n
+    return tuple(strides)
+
+class SharedArray(_sp.ndarray):
+    r'''
+    A read-only array stored on a Core object, which makes itself writable
+    the first time it is written in place.  Core objects store an array in
+    this form when its values are shared with another object (see
+    ``Controller.clone_simulation``), and when in-place writes to it must be
+    noticed, such as the inputs of 'on_access' models.  The first write
+    copies the values if they are shared, so the other object never sees it,
+    and bumps the version of the array on the object that stores it.
+
+    Reading the array never copies it.  Item assignment, the in-place
+    operators and the methods ``fill``, ``sort``, ``put``, ``itemset``,
+    ``partition`` and ``setfield`` all make the array writable in place, so
+    references held to it stay valid.  Slices of the array are also
+    SharedArrays and can be written in the same way.  Results of arithmetic
+    and of fancy indexing are normal ndarrays.
+
+    Parameters
+    ----------
+    value : ndarray
+        The values of the array, which are not copied.  ``value`` is made
+        read-only as well.
+
+    owner : OpenPNM object, optional
+        The object storing the array, which is notified of the first write
+
+    key : string, optional
+        The name under which ``owner`` stores the array
+
+    copy : boolean
+        If True (default) the values are copied before the first write,
+        otherwise ``value`` is simply made writable again.
+
+    Notes
+    -----
+    Numpy checks that the ``out`` argument of a ufunc, or the destination of
+    ``copyto``, is writable before the array is notified, so these raise a
+    ValueError until the array has been written by one of the means above.
+    '''
+    def __new__(cls,value,owner=None,key=None,copy=True):
+        value = _sp.asarray(value)
+        value.flags.writeable = False
+        obj = value.view(cls)
+        obj._buffer = value
+        obj._copy = copy
+        obj._set_owner(owner,key)
+        return obj
+
+    def __array_finalize__(self,obj):
+        self._buffer = None
+        self._copy = False
+        self._source = None
+        self._children = None
+        self._owner = None
+        self._key = None
+
+    def __array_wrap__(self,out_arr,context=None):
+        out_arr = out_arr.view(_sp.ndarray)
+        if out_arr.ndim == 0:
+            return out_arr[()]
+        return out_arr
+
+    def __repr__(self):
+        #Print like the plain array it stands in for
+        return repr(self.view(_sp.ndarray))
+
+    def __reduce__(self):
+        return self.view(_sp.ndarray).__reduce__()
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self,memo):
+        return self.copy()
+
+    def copy(self,order='C'):
+        return self.view(_sp.ndarray).copy(order)
+
+    def __getitem__(self,index):
+        value = _sp.ndarray.__getitem__(self,index)
+        if isinstance(value,SharedArray):
+            if self.flags.writeable or value.flags.writeable:
+                return value.view(_sp.ndarray)
+            #Keep track of the slice so it can follow this array when written
+            value._source = (self,index)
+            if self._children is None:
+                self._children = {}
+            children = self._children
+            key = id(value)
+            children[key] = _weakref.ref(value,lambda ref: children.pop(key,None))
+        return value
+
+    def __setitem__(self,index,value):
+        _sp.ndarray.__setitem__(self._make_writable(),index,value)
+
+    def _set_owner(self,owner,key):
+        if owner is not None:
+            owner = _weakref.ref(owner)
+        self._owner = owner
+        self._key = key
+
+    def _get_owner(self):
+        if self._owner is None:
+            return None
+        return self._owner()
+
+    def _make_writable(self):
+        r'''
+        Makes the array writable, copying its values first if they are
+        shared, and returns the array that writes should be made to.  This is
+        the array itself, except for a strided slice whose parent had to be
+        copied: such a slice cannot be pointed at the copy, so the matching
+        slice of the copy is returned instead.
+        '''
+        if self.flags.writeable:
+            return self
+        if self._source is not None:
+            parent,index = self._source
+            parent._make_writable()
+            if self.flags.writeable:
+                return self
+            return _sp.ndarray.__getitem__(parent.view(_sp.ndarray),index)
+        owner = self._get_owner()
+        target = self
+        if self._copy:
+            if owner is not None:
+                fresh = owner._allocate(self._key,self.shape,self.dtype)
+            else:
+                fresh = _sp.empty(self.shape,dtype=self.dtype)
+            fresh[...] = self.view(_sp.ndarray)
+            self._buffer = fresh
+            if not self._repoint(fresh):
+                target = fresh
+            if Tracer.enabled:
+                Tracer.count('array.unshare')
+        elif self._buffer.base is self:
+            self.flags.writeable = True
+            self._buffer.flags.writeable = True
+        else:
+            self._buffer.flags.writeable = True
+            self.flags.writeable = True
+        self._update_children()
+        if owner is not None:
+            owner._array_written(self._key,self)
+        return target
+
+    def _protect(self,copy=False):
+        r'''
+        Makes an array that has been written read-only again, along with its
+        memory and the slices taken from it, until its next write
+        '''
+        self._copy = copy
+        for array in [self._buffer,self]:
+            array.flags.writeable = False
+        children = [self]
+        while children:
+            array = children.pop()
+            for ref in list((array._children or {}).values()):
+                child = ref()
+                if child is not None:
+                    child.flags.writeable = False
+                    children.append(child)
+
+    def _update_children(self):
+        r'''
+        Points the slices taken from this array at its current memory
+        '''
+        if not self._children:
+            return
+        parent = self.view(_sp.ndarray)
+        for ref in list(self._children.values()):
+            child = ref()
+            if (child is None) or child.flags.writeable:
+                continue
+            if child._repoint(_sp.ndarray.__getitem__(parent,child._source[1])):
+                child._update_children()
+
+    def _repoint(self,fresh):
+        r'''
+        Points this array at the memory of ``fresh``, which has the same
+        shape, and makes it writable.  Returns False if this is not possible
+        because the array is not contiguous.
+        '''
+        if self.strides != fresh.strides:
+            try:
+                self.strides = fresh.strides
+            except ValueError:
+                return False
+        if _data_address(fresh) != _data_address(self):
+            if not (self.flags.c_contiguous and fresh.flags.c_contiguous):
+                return False
+            retired = self.base
+            with _warnings.catch_warnings():
+                # Assigning the data attribute is deprecated but still the
+                # only way to move an array without invalidating references
+                _warnings.simplefilter('ignore',DeprecationWarning)
+                self.data = fresh.data
+            self._retired = retired  # Views of the old memory stay valid
+        self.flags.writeable = True
+        return True
+
+def _writer(name):
+    method = getattr(_sp.ndarray,name)
+    def write(self,*args,**kwargs):
+        target = self._make_writable()
+        result = method(target,*args,**kwargs)
+        if name.startswith('__i'):
+            return target
+        return result
+    write.__name__ = name
+    return write
+
+for _name in ['__iadd__','__isub__','__imul__','__itruediv__','__ifloordiv__',
+              '__imod__','__ipow__','__ilshift__','__irshift__','__iand__',
+              '__ior__','__ixor__','fill','sort','put','itemset','partition',
+              'setfield']:
+    setattr(SharedArray,_name,_writer(_name))
+
+class UniformArray(SharedArray):
+    r'''
+    A read-only array in which every element has the same value.  All its
+    strides are zero, and the memory for the full array is only reserved so
+    that the array can be expanded in place when it is first written.  For
+    arrays larger than a few pages only address space is reserved, which the
+    operating system allocates on that write, so the array occupies O(1)
+    memory regardless of its length until then.
+
+    Core objects store scalar assignments in this form.  They are kept in
+    this form when they are read, and when the object is trimmed or
+    extended or saved in the columnar format.  The first in-place write
+    expands the array into a full array in place (see ``SharedArray``).
+
+    Parameters
+    ----------
+    value : scalar
+        The value of every element
+
+    shape : tuple
+        The shape of the array
+
+    Examples
+    --------
+    >>> import OpenPNM
+    >>> pn = OpenPNM.Network.TestNet()
+    >>> pn['pore.test'] = 1.0
+    >>> stored = dict.__getitem__(pn,'pore.test')
+    >>> isinstance(stored,OpenPNM.Base.Tools.UniformArray)
+    True
+    >>> (pn['pore.test'] * 2).sum() == 2*pn.Np  # Reading does not expand it
+    True
+    >>> stored.strides
+    (0,)
+    >>> pn['pore.test'][[0,1]] = 2.0
+    >>> pn['pore.test'][0:3]
+    array([ 2.,  2.,  1.])
+    '''
+    def __new__(cls,value,shape):
+        value = _sp.array(value)
+        nbytes = int(_sp.prod(shape))*value.itemsize
+        if (nbytes == 0) or value.dtype.hasobject:
+            obj = _sp.broadcast_to(value,shape).view(cls)
+            obj._copy = True
+            return obj
+        if nbytes < 16*_mmap.ALLOCATIONGRANULARITY:
+            memory = _sp.empty(shape,dtype=value.dtype)
+        else:
+            memory = _mmap.mmap(-1,nbytes)
+        _sp.ndarray((1,),dtype=value.dtype,buffer=memory)[0] = value
+        obj = _sp.ndarray.__new__(cls,shape,dtype=value.dtype,buffer=memory,
+                                  strides=(0,)*len(shape))
+        obj.flags.writeable = False
+        obj._memory = memory
+        obj._copy = True
+        return obj
+
+    def __reduce__(self):
+        if self._is_uniform():
+            return (UniformArray,(self.value,self.shape))
+        return super(UniformArray,self).__reduce__()
+
+    def __deepcopy__(self,memo):
+        if self._is_uniform():
+            return UniformArray(self.value,self.shape)
+        return self.copy()
+
+    def _is_uniform(self):
+        return (not self.flags.writeable) and (self.strides == (0,)*self.ndim)
+
+    def _get_value(self):
+        return self.view(_sp.ndarray).flat[0]
+
+    value = property(_get_value)
+
+    def _make_writable(self):
+        if (self._source is not None) or (not self._is_uniform()) \
+                or (getattr(self,'_memory',None) is None):
+            return super(UniformArray,self)._make_writable()
+        #Expand into the memory reserved for the full array
+        value = self.value
+        self.strides = _contiguous_strides(self.shape,self.itemsize)
+        self.flags.writeable = True
+        _sp.ndarray.__setitem__(self,Ellipsis,value)
+        self._buffer = self.view(_sp.ndarray)
+        if Tracer.enabled:
+            Tracer.count('array.materialize')
+        self._update_children()
+        owner = self._get_owner()
+        if owner is not None:
+            owner._array_written(self._key,self)
+        return self
+
+class SubsetMixin(object):
+    r'''
+    Presents the data of a source object at a subset of its locations, for
+    the ``SubNetwork`` and ``SubPhase`` views.
+
+    Arrays stored on the view itself are used as normal.  Any other array is
+    fetched from the source the first time it is read, and the values at the
+    subset's locations are stored on the view (uniform arrays stay uniform).
+    The view then holds a snapshot of those values, which can be written in
+    place without modifying the source.
+
+    Notes
+    -----
+    The locations of the subset are fixed when the view is created, so the
+    source network must not be trimmed or extended while the view exists.
+
+    The versions of the source and view arrays are recorded when an array is
+    fetched.  If the source array changes afterwards it is fetched again on
+    the next read, unless the view's copy has been written in place, in which
+    case an Exception is raised since neither set of values can be kept
+    safely.  Arrays assigned to the view with ``view[key] = value`` belong to
+    the view and no longer follow the source.
+    '''
+    _source = None
+
+    def _set_source(self,source,pores,throats):
+        self._source = source
+        self._subset_map = {'pore' : pores, 'throat' : throats}
+        self._subset_state = source._net._topology_state()
+        self._gathered = {}
+
+    def __getitem__(self,key):
+        if self._source is None:
+            return super(SubsetMixin,self).__getitem__(key)
+        if key in self._gathered:
+            self._check_gathered(key)
+        if not dict.__contains__(self,key):
+            try:
+                self._gather(key)
+            except KeyError:
+                pass
+        return super(SubsetMixin,self).__getitem__(key)
+
+    def __setitem__(self,key,value):
+        if self._source is not None:
+            self._gathered.pop(key,None)
+        super(SubsetMixin,self).__setitem__(key,value)
+
+    def __contains__(self,key):
+        return key in self.keys()
+
+    def keys(self):
+        r'''
+        Returns the keys stored on the view followed by those of the source
+        '''
+        keys = list(dict.keys(self))
+        if self._source is not None:
+            own = set(keys)
+            keys.extend([item for item in self._source.keys() if item not in own])
+        return keys
+
+    def _check_gathered(self,key):
+        r'''
+        Drops the view's copy of ``key`` if the source array has changed since
+        it was fetched, so that it is fetched again
+        '''
+        source,view = self._gathered[key]
+        if self._source_state(key) == source:
+            return
+        if self._versions.get(key,0) != view:
+            raise Exception(key+' has changed on both '+self.name+' and its source, create a new view')
+        del self._gathered[key]
+        dict.__delitem__(self,key)
+
+    def _gather(self,key):
+        element = key.split('.')[0]
+        if element not in ['pore','throat']:
+            raise KeyError(key)
+        if self._source._net._topology_state() != self._subset_state:
+            raise Exception('The topology of the source of '+self.name+' has changed, create a new view')
+        locations = self._subset_map[element]
+        stored = dict.get(self._source,key)
+        models = self._source.models
+        if (models is not None) and (key in models):
+            stored = None
+        if (type(stored) is UniformArray) and stored._is_uniform():
+            value = UniformArray(stored.value,(_sp.shape(locations)[0],)+_sp.shape(stored)[1:])
+            dict.__setitem__(self,key,value)
+            value._set_owner(self,key)
+        else:
+            self._store(key,self._source[key][locations])
+            value = self._protect(key)
+        #Protect the source arrays too, so in-place writes on either side are seen
+        for item in self._source_objects(key):
+            item._protect(key)
+        self._gathered[key] = (self._source_state(key),self._versions.get(key,0))
+        return value
+
+    def _source_objects(self,key):
+        r'''
+        Returns the objects holding the source array of ``key``, which are the
+        Geometries or Physics it is interleaved from if the source does not
+        store it itself
+        '''
+        source = self._source
+        models = source.models
+        if dict.__contains__(source,key) or ((models is not None) and (key in models)):
+            return [source]
+        if source is source._net:
+            return source._geometries
+        return source._physics
+
+    def _source_state(self,key):
+        r'''
+        Returns a value that changes whenever the source array of ``key`` is
+        written, bringing lazily computed models up to date first
+        '''
+        source = self._source
+        models = source.models
+        if (models is not None) and (key in models) \
+                and (models[key].get('regen_mode') == 'on_access'):
+            models[key]._refresh(master=source)
+        objs = self._source_objects(key)
+        if objs == [source]:
+            return source._versions.get(key,0)
+        return source._interleave_stamp(key,objs)
+
+def chunkable(func):
+    r'''
+    Decorator that marks a pore-scale model as safe to evaluate in chunks
+    (see ``ChunkView``), meaning each value it returns depends only on the
+    data of the same pore or throat.  Models that draw random numbers or
+    normalize by a global statistic such as the maximum are not chunkable.
+    '''
+    func.chunkable = True
+    return func
+
+class ChunkError(Exception):
+    pass
+
+class ChunkView(object):
+    r'''
+    Presents a contiguous range of the pores or throats of an OpenPNM object
+    to a model, so that the model can be evaluated one chunk at a time.
+
+    Arrays of the chunked element are sliced to the range, while arrays of
+    the other element are returned in full so they can still be indexed, for
+    instance with 'throat.conns'.  Counts and the indices returned by ``pores``
+    or ``throats`` are relative to the chunk.  Other methods of the object
+    cannot be used on a chunk and raise a ``ChunkError``, in which case the
+    model should be evaluated in one call instead.
+
+    Parameters
+    ----------
+    obj : OpenPNM object
+        The object to present
+
+    element : string
+        Either 'pore' or 'throat'
+
+    start, stop : int
+        The range of the chunk
+    '''
+    def __init__(self,obj,element,start,stop):
+        self._obj = obj
+        self._element = element
+        self._start = start
+        self._stop = stop
+
+    def __getattr__(self,name):
+        if name == 'name':
+            return getattr(self._obj,name)
+        raise ChunkError(name+' is not available when evaluating in chunks')
+
+    def __getitem__(self,key):
+        value = self._obj[key]
+        if key.split('.')[0] == self._element:
+            return value[self._start:self._stop]
+        return value
+
+    def __contains__(self,key):
+        return key in self._obj
+
+    def keys(self):
+        return self._obj.keys()
+
+    def _count(self,element=None):
+        if element == self._element:
+            return self._stop - self._start
+        return self._obj._count(element)
+
+    def _locations(self,element,*args,**kwargs):
+        if element == 'pore':
+            locs = self._obj.pores(*args,**kwargs)
+        else:
+            locs = self._obj.throats(*args,**kwargs)
+        if element == self._element:
+            locs = locs[(locs >= self._start)*(locs < self._stop)] - self._start
+        return locs
+
+    def pores(self,*args,**kwargs):
+        return self._locations('pore',*args,**kwargs)
+
+    def throats(self,*args,**kwargs):
+        return self._locations('throat',*args,**kwargs)
+
+    def num_pores(self,*args,**kwargs):
+        return _sp.size(self.pores(*args,**kwargs))
+
+    def num_throats(self,*args,**kwargs):
+        return _sp.size(self.throats(*args,**kwargs))
+
+    Ps = property(lambda self: self.pores())
+    Ts = property(lambda self: self.throats())
+    Np = property(lambda self: self.num_pores())
+    Nt = property(lambda self: self.num_throats())
@@ -26,7 +26,7 @@ logging.basicConfig(level=logging.WARNING,
                     format='%(asctime)s | %(levelname)-8s | %(name)s.%(funcName)s | %(message)s',
                     )
 
+from . import __Tools__ as Tools
 from .__Controller__ import Controller
 from .__ModelsDict__ import ModelsDict
-from . import __Tools__ as Tools
 from .__Core__ import Core
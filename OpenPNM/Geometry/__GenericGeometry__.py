@@ -37,6 +37,8 @@ class GenericGeometry(Core):
     >>> Ts = pn.throats()  # Get all throats
     >>> geom = OpenPNM.Geometry.GenericGeometry(network=pn,pores=Ps,throats=Ts)
     """
+    # Float properties follow the 'float' entry of the dtype policy
+    _float_policy = True
 
     def __init__(self,network=None,pores=[],throats=[],seed=None,**kwargs):
         r"""
@@ -5,7 +5,9 @@ pore_area -- Models for cross-sectional area of a pore body
 
 """
 import scipy as _sp
+from OpenPNM.Base import Tools as _Tools
 
+@_Tools.chunkable
 def spherical(geometry,
               pore_diameter='pore.diameter',
               **kwargs):
@@ -16,6 +18,7 @@ def spherical(geometry,
     value = _sp.constants.pi/4*(diams)**2
     return value
 
+@_Tools.chunkable
 def cubic(geometry,
           pore_diameter='pore.diameter',
           **kwargs):
@@ -8,6 +8,7 @@ import scipy as _sp
 import numpy as np
 from scipy.spatial import Delaunay
 import OpenPNM.Utilities.misc as misc
+from OpenPNM.Base import Tools as _Tools
 
 def _get_hull_volume(points):
     r"""
@@ -73,6 +74,7 @@ def _get_hull_volume(points):
 
     return hull_volume, hull_COM
 
+@_Tools.chunkable
 def sphere(geometry,
            pore_diameter='pore.diameter',
            **kwargs):
@@ -83,6 +85,7 @@ def sphere(geometry,
     value=_sp.pi/6*diams**3
     return value
 
+@_Tools.chunkable
 def cube(geometry,
          pore_diameter='pore.diameter',
          **kwargs):
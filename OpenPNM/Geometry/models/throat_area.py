@@ -7,7 +7,9 @@ Submodule -- throat_area
 import scipy as _sp
 import OpenPNM.Utilities.transformations as tr
 import OpenPNM.Utilities.vertexops as vo
+from OpenPNM.Base import Tools as _Tools
 
+@_Tools.chunkable
 def cylinder(geometry,
              throat_diameter='throat.diameter',
              **kwargs):
@@ -18,6 +20,7 @@ def cylinder(geometry,
     value = _sp.constants.pi/4*(diams)**2
     return value
 
+@_Tools.chunkable
 def cuboid(geometry,
            throat_diameter='throat.diameter',
            **kwargs):
@@ -5,7 +5,9 @@ Submodule -- throat_length
 
 """
 import scipy as _sp
+from OpenPNM.Base import Tools as _Tools
 
+@_Tools.chunkable
 def straight(network,
              geometry,
              pore_diameter='pore.diameter',
@@ -61,6 +63,7 @@ def voronoi(network,
         value[i] = _sp.linalg.norm(v1[i])+_sp.linalg.norm(v2[i])
     return value
 
+@_Tools.chunkable
 def c2c(network,
              geometry,
              **kwargs):
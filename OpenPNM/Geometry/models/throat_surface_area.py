@@ -5,7 +5,9 @@ Submodule -- throat_surface_area
 
 """
 import scipy as _sp
+from OpenPNM.Base import Tools as _Tools
 
+@_Tools.chunkable
 def cylinder(geometry,
              throat_diameter='throat.diameter',
              throat_length='throat.length',
@@ -18,6 +20,7 @@ def cylinder(geometry,
     value = _sp.constants.pi*D*L
     return value
 
+@_Tools.chunkable
 def cuboid(geometry,
            throat_diameter='throat.diameter',
            throat_length='throat.length',
@@ -30,6 +33,7 @@ def cuboid(geometry,
     value = 4*D*L
     return value
 
+@_Tools.chunkable
 def extrusion(geometry,
               throat_perimeter='throat.perimeter',
               throat_length='throat.length',
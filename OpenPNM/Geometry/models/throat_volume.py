@@ -5,7 +5,9 @@ Submodule -- throat_volume
 
 """
 import scipy as _sp
+from OpenPNM.Base import Tools as _Tools
 
+@_Tools.chunkable
 def cylinder(geometry,
              throat_length='throat.length',
              throat_diameter='throat.diameter',
@@ -19,6 +21,7 @@ def cylinder(geometry,
     value = _sp.pi/4*leng*diam**2
     return value
 
+@_Tools.chunkable
 def cuboid(geometry,
            throat_length='throat.length',
            throat_diameter='throat.diameter',
@@ -32,6 +35,7 @@ def cuboid(geometry,
     value = leng*diam**2
     return value
 
+@_Tools.chunkable
 def extrusion(geometry,
               throat_length='throat.length',
               throat_area='throat.area',
@@ -45,6 +45,14 @@ class Cubic(GenericNetwork):
         cuboid shape like spheres or cylinders, but still with a cubic lattice
         topology.
 
+    Notes
+    -----
+    The coordinates and connections are computed directly in their final
+    arrays, so the memory needed is that of the network itself.  For very
+    large lattices these arrays can be kept in memory mapped files by setting
+    the 'memmap' storage backend on the Controller before the network is
+    created (see ``Controller.storage``).
+
     Examples
     --------
     >>> import OpenPNM
@@ -88,34 +96,21 @@ class Cubic(GenericNetwork):
         self._shape = sp.shape(arr)  # Store original network shape
         self._spacing = spacing  # Store network spacing instead of calculating it
 
-        points = np.array([i for i,v in np.ndenumerate(arr)], dtype=float)
-        points += 0.5
-        points *= spacing
-
-        I = np.arange(arr.size).reshape(arr.shape)
-
-        face_joints = [
-            (I[:,:,:-1], I[:,:,1:]),
-            (I[:,:-1], I[:,1:]),
-            (I[:-1], I[1:]),
-            ]
-
-        corner_joints = [
-            (I[:-1,:-1,:-1], I[1:,1:,1:]),
-            (I[:-1,:-1,1:], I[1:,1:,:-1]),
-            (I[:-1,1:,:-1], I[1:,:-1,1:]),
-            (I[1:,:-1,:-1], I[:-1,1:,1:]),
-            ]
-
-        edge_joints = [
-            (I[:,:-1,:-1], I[:,1:,1:]),
-            (I[:,:-1,1:], I[:,1:,:-1]),
-            (I[:-1,:,:-1], I[1:,:,1:]),
-            (I[1:,:,:-1], I[:-1,:,1:]),
-            (I[1:,1:,:], I[:-1,:-1,:]),
-            (I[1:,:-1,:], I[:-1,1:,:]),
-            ]
-        
+        Np = arr.size
+        # Pore coordinates are written axis by axis into the final array
+        coords = self._allocate('pore.coords',(Np,3),float)
+        lattice = coords.reshape(arr.shape+(3,))
+        spacing = np.ones(3)*spacing
+        for axis in range(3):
+            shape = [1,1,1]
+            shape[axis] = arr.shape[axis]
+            lattice[...,axis] = ((np.arange(arr.shape[axis])+0.5)*spacing[axis]).reshape(shape)
+
+        # Each joint is the (i,j,k) offset from the tail to the head pore
+        face_joints = [(0,0,1),(0,1,0),(1,0,0)]
+        corner_joints = [(1,1,1),(1,1,-1),(1,-1,1),(-1,1,1)]
+        edge_joints = [(0,1,1),(0,1,-1),(1,0,1),(-1,0,1),(-1,-1,0),(-1,1,0)]
+
         if connectivity == 6:
             joints = face_joints
         elif connectivity == 8:
@@ -133,14 +128,31 @@ class Cubic(GenericNetwork):
         else:
             raise Exception('Invalid connectivity receieved. Must be 6, 8, 12, 14, 18, 20 or 26')
 
-        I = np.arange(arr.size).reshape(arr.shape)
-        tails, heads = [], []
-        for T,H in joints:
-            tails.extend(T.flat)
-            heads.extend(H.flat)
-        pairs = np.vstack([tails, heads]).T
-
-        self['pore.coords']  = points
+        # Tail pores of a joint are the block of the lattice that has a
+        # neighbor at the offset, their indices are built from the strides
+        strides = (arr.shape[1]*arr.shape[2],arr.shape[2],1)
+        blocks = []
+        for joint in joints:
+            ranges = []
+            for n,d in zip(arr.shape,joint):
+                ranges.append(np.arange(max(0,-d),n-max(0,d)))
+            blocks.append((joint,ranges))
+        Nt = sum([int(np.prod([r.size for r in ranges])) for joint,ranges in blocks])
+        pairs = self._allocate('throat.conns',(Nt,2),self._get_dtype('index',N=Np))
+        start = 0
+        for joint,ranges in blocks:
+            shape = tuple(r.size for r in ranges)
+            stop = start + int(np.prod(shape))
+            if stop > start:
+                tails = pairs[start:stop,0].reshape(shape)
+                heads = pairs[start:stop,1].reshape(shape)
+                i,j,k = [r*n for r,n in zip(ranges,strides)]
+                np.add(i[:,None,None],j[None,:,None],out=tails)
+                tails += k[None,None,:]
+                np.add(tails,np.dot(joint,strides),out=heads)
+            start = stop
+
+        self['pore.coords']  = coords
         self['throat.conns'] = pairs
         self['pore.all']     = np.ones(len(self['pore.coords']), dtype=bool)
         self['throat.all']   = np.ones(len(self['throat.conns']), dtype=bool)
@@ -161,9 +173,10 @@ class Cubic(GenericNetwork):
 
     def add_boundaries(self):
         r'''
-        This method uses ``clone_pores`` to clone the surface pores (labeled
-        'left','right', etc), then shifts them to the periphery of the domain,
-        and gives them the label 'right_face', 'left_face', etc.
+        This method uses ``clone_pore_groups`` to clone the surface pores
+        (labeled 'left','right', etc) of all six faces in one pass, then shifts
+        them to the periphery of the domain, and gives them the label
+        'right_boundary', 'left_boundary', etc.
         '''
         x,y,z = self['pore.coords'].T
 
@@ -180,11 +193,11 @@ class Cubic(GenericNetwork):
         scale['left']   = scale['right'] = [1,0,1]
         scale['bottom'] = scale['top']   = [1,1,0]
 
-        for label in ['front','back','left','right','bottom','top']:
-            ps = self.pores(label)
-            self.clone_pores(pores=ps,apply_label=[label+'_boundary','boundary'])
+        faces = ['front','back','left','right','bottom','top']
+        groups = [(self.pores(label),[label+'_boundary','boundary']) for label in faces]
+        clones = self.clone_pore_groups(groups)
+        for label,ind in zip(faces,clones):
             #Translate cloned pores
-            ind = self.pores(label+'_boundary')
             coords = self['pore.coords'][ind]
             coords = coords*scale[label] + offset[label]
             self['pore.coords'][ind] = coords
@@ -8,9 +8,10 @@ GenericNetwork: Abstract class to construct pore networks
 import numpy as np
 import scipy as sp
 import scipy.sparse as sprs
+import scipy.spatial as sptl
 import OpenPNM.Utilities.misc as misc
 from OpenPNM.Base import Core
-from OpenPNM.Base import logging
+from OpenPNM.Base import logging, Tools
 logger = logging.getLogger(__name__)
 
 class GenericNetwork(Core):
@@ -34,6 +35,9 @@ class GenericNetwork(Core):
         #Initialize adjacency and incidence matrix dictionaries
         self._incidence_matrix = {}
         self._adjacency_matrix = {}
+        self._topology_stamp = {'adjacency':None,'incidence':None}
+        self._topology_stats = {'adjacency_builds':0,'incidence_builds':0,
+                                'incremental_updates':0}
 
     def __setitem__(self,prop,value):
         for geom in self._geometries:
@@ -46,8 +50,8 @@ class GenericNetwork(Core):
         if key.split('.')[-1] == self.name:
             element = key.split('.')[0]
             return self[element+'.all']
-        if key not in self.keys():
-            logger.debug(key+' not on Network, constructing data from Geometries')
+        if (key not in self.keys()) and (key not in self.models):
+            logger.debug('%s not on Network, constructing data from Geometries',key)
             return self._interleave_data(key,self.geometries())
         else:
             return super(GenericNetwork,self).__getitem__(key)
@@ -61,6 +65,7 @@ class GenericNetwork(Core):
     #--------------------------------------------------------------------------
     '''Graph Theory and Network Query Methods'''
     #--------------------------------------------------------------------------
+    @Tools.traced
     def create_adjacency_matrix(self,data=None,sprsfmt='coo',dropzeros=True,sym=True):
         r"""
         Generates a weighted adjacency matrix in the desired sparse format
@@ -138,9 +143,12 @@ class GenericNetwork(Core):
             temp = temp.tocsr()
         if sprsfmt == 'lil':
             temp = temp.tolil()
+        if Tools.Tracer.enabled:
+            Tools.Tracer.count('sparse.adjacency')
         logger.debug('create_adjacency_matrix: End of method')
         return temp
 
+    @Tools.traced
     def create_incidence_matrix(self,data=None,sprsfmt='coo',dropzeros=True):
         r"""
         Creates an incidence matrix filled with supplied throat values
@@ -210,6 +218,8 @@ class GenericNetwork(Core):
             temp = temp.tocsr()
         if sprsfmt == 'lil':
             temp = temp.tolil()
+        if Tools.Tracer.enabled:
+            Tools.Tracer.count('sparse.incidence')
         logger.debug('create_incidence_matrix: End of method')
         return temp
 
@@ -236,11 +246,11 @@ class GenericNetwork(Core):
         --------
         >>> import OpenPNM
         >>> pn = OpenPNM.Network.TestNet()
-        >>> pn.find_connected_pores(throats=[0,1])
-        array([[0, 1],
-               [0, 5]])
-        >>> pn.find_connected_pores(throats=[0,1],flatten=True)
-        array([0, 1, 5])
+        >>> print(pn.find_connected_pores(throats=[0,1]))
+        [[0 1]
+         [0 5]]
+        >>> print(pn.find_connected_pores(throats=[0,1],flatten=True))
+        [0 1 5]
         """
         Ps = self['throat.conns'][throats]
         #Ps = [sp.asarray(x) for x in Ps if x]
@@ -288,6 +298,7 @@ class GenericNetwork(Core):
         Ts.reverse()
         return Ts
 
+    @Tools.traced
     def find_neighbor_pores(self,pores,mode='union',flatten=True,excl_self=True):
         r"""
         Returns a list of pores neighboring the given pore(s)
@@ -337,19 +348,12 @@ class GenericNetwork(Core):
         >>> pn.find_neighbor_pores(pores=[0,2],mode='not_intersection') #Exclude common neighbors
         array([ 3,  5,  7, 25, 27])
         """
-        pores = sp.array(pores,ndmin=1)
-        try:
-            neighborPs = self._adjacency_matrix['lil'].rows[[pores]]
-        except:
-            temp = self.create_adjacency_matrix(sprsfmt='lil')
-            self._adjacency_matrix['lil'] = temp
-            neighborPs = self._adjacency_matrix['lil'].rows[[pores]]
-        if [sp.asarray(x) for x in neighborPs if x] == []:
+        pores = self._parse_pores(pores)
+        am = self._get_topology('adjacency')
+        neighborPs,counts = self._csr_rows(am,pores)
+        if sp.size(neighborPs) == 0:
             return sp.array([],ndmin=1)
         if flatten:
-            #All the empty lists must be removed to maintain data type after hstack (numpy bug?)
-            neighborPs = [sp.asarray(x) for x in neighborPs if x]
-            neighborPs = sp.hstack(neighborPs)
             neighborPs = sp.concatenate((neighborPs,pores))
             #Remove references to input pores and duplicates
             if mode == 'not_intersection':
@@ -361,10 +365,10 @@ class GenericNetwork(Core):
             if excl_self:
                 neighborPs = neighborPs[~sp.in1d(neighborPs,pores)]
         else:
-            for i in range(0,sp.size(pores)):
-                neighborPs[i] = sp.array(neighborPs[i],dtype=int)
+            neighborPs = self._split(neighborPs,counts)
         return sp.array(neighborPs,ndmin=1)
 
+    @Tools.traced
     def find_neighbor_throats(self,pores,mode='union',flatten=True):
         r"""
         Returns a list of throats neighboring the given pore(s)
@@ -401,20 +405,14 @@ class GenericNetwork(Core):
         >>> pn.find_neighbor_throats(pores=[0,1],flatten=False)
         array([array([0, 1, 2]), array([0, 3, 4, 5])], dtype=object)
         """
-        #Test for existence of incidence matrix
-        try:
-            neighborTs = self._incidence_matrix['lil'].rows[[pores]]
-        except:
-            temp = self.create_incidence_matrix(sprsfmt='lil')
-            self._incidence_matrix['lil'] = temp
-            neighborTs = self._incidence_matrix['lil'].rows[[pores]]
-        if [sp.asarray(x) for x in neighborTs if x] == []:
+        pores = self._parse_pores(pores)
+        im = self._get_topology('incidence')
+        neighborTs,counts = self._csr_rows(im,pores)
+        if sp.size(neighborTs) == 0:
             return sp.array([],ndmin=1)
         if flatten:
-            #All the empty lists must be removed to maintain data type after hstack (numpy bug?)
-            neighborTs = [sp.asarray(x) for x in neighborTs if x]
-            neighborTs = sp.hstack(neighborTs)
             #Remove references to input pores and duplicates
+            neighborTs = neighborTs.astype(int)
             if mode == 'not_intersection':
                 neighborTs = sp.unique(sp.where(sp.bincount(neighborTs)==1)[0])
             elif mode == 'union':
@@ -422,10 +420,33 @@ class GenericNetwork(Core):
             elif mode == 'intersection':
                 neighborTs = sp.unique(sp.where(sp.bincount(neighborTs)>1)[0])
         else:
-            for i in range(0,sp.size(pores)):
-                neighborTs[i] = sp.array(neighborTs[i])
+            neighborTs = self._split(neighborTs,counts)
         return sp.array(neighborTs,ndmin=1)
 
+    def _parse_pores(self,pores):
+        pores = sp.array(pores,ndmin=1)
+        if pores.dtype == bool:
+            pores = sp.where(pores)[0]
+        return pores.astype(int)
+
+    def _csr_rows(self,matrix,rows):
+        r'''
+        Returns the column indices of the given rows of a CSR matrix as a
+        single array, along with the number of entries in each row
+        '''
+        starts = matrix.indptr[rows]
+        counts = matrix.indptr[rows+1] - starts
+        offsets = sp.repeat(starts - sp.cumsum(counts) + counts,counts)
+        offsets += sp.arange(sp.sum(counts))
+        return matrix.indices[offsets].astype(int),counts
+
+    def _split(self,values,counts):
+        temp = sp.ndarray((sp.size(counts),),dtype=object)
+        for i,item in enumerate(sp.split(values,sp.cumsum(counts)[:-1])):
+            temp[i] = item
+        return temp
+
+    @Tools.traced
     def num_neighbors(self,pores,flatten=False):
         r"""
         Returns an ndarray containing the number of neigbhor pores for each
@@ -462,10 +483,10 @@ class GenericNetwork(Core):
             neighborPs = self.find_neighbor_pores(pores,flatten=True,mode='union',excl_self=True)
             num = sp.shape(neighborPs)[0]
         else:
-            neighborPs = self.find_neighbor_pores(pores,flatten=False)
-            num = sp.zeros(sp.shape(neighborPs),dtype=int)
-            for i in range(0,sp.shape(num)[0]):
-                num[i] = sp.size(neighborPs[i])
+            am = self._get_topology('adjacency')
+            pores = self._parse_pores(pores)
+            num = am.indptr[pores+1] - am.indptr[pores]
+            num = num.astype(int)
         return num
 
     def find_interface_throats(self,labels=[]):
@@ -510,12 +531,14 @@ class GenericNetwork(Core):
                 logger.error('Some labels overlap, iterface cannot be found')
                 pass
             else:
-                T1 = self.find_neighbor_throats(P1)
-                T2 = self.find_neighbor_throats(P2)
-                Tmask = sp.in1d(T1,T2)
-                Tind = T1[Tmask]
+                P1 = self.tomask(pores=P1)
+                P2 = self.tomask(pores=P2)
+                conns = self['throat.conns']
+                Tmask = P1[conns[:,0]]*P2[conns[:,1]] + P2[conns[:,0]]*P1[conns[:,1]]
+                Tind = sp.where(Tmask)[0]
         return Tind
 
+    @Tools.traced
     def find_clusters(self,mask=[]):
         r'''
         Identify connected clusters of pores in the network.
@@ -548,9 +571,216 @@ class GenericNetwork(Core):
         clusters = sprs.csgraph.connected_components(temp)[1]
         return clusters
 
+    @Tools.traced
+    def partition(self,n_parts,method='rcb',label='partition'):
+        r'''
+        Splits the network into sub-domains of nearly equal size with small
+        interfaces between them, for use by parallel solvers.
+
+        Parameters
+        ----------
+        n_parts : int
+            The number of sub-domains to create
+
+        method : string
+            The partitioning method to use.  Options are:
+
+            - 'rcb' : (Default) Recursive coordinate bisection, which repeatedly splits the pores at the median of their longest dimension
+            - 'metis' : The multilevel graph partitioner METIS, which gives smaller interfaces on irregular networks.  Requires the pymetis package.
+
+        label : string
+            The prefix of the labels that are applied (default = 'partition')
+
+        Returns
+        -------
+        An Np long array of the sub-domain number of each pore.
+
+        Notes
+        -----
+        Each pore receives the label 'pore.<label>_<i>' of its sub-domain,
+        and throats the label 'throat.<label>_<i>' if both their pores are
+        in sub-domain i, or 'throat.<label>_interface' otherwise.  Labels
+        from a previous partitioning with the same prefix are removed.  The
+        pores, ghost pores and throats of each sub-domain are returned by
+        ``partition_domains``.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.Cubic(shape=[8,8,8])
+        >>> parts = pn.partition(n_parts=4)
+        >>> [pn.num_pores('partition_'+str(i)) for i in range(4)]
+        [128, 128, 128, 128]
+        >>> pn.num_throats('partition_interface')
+        128
+        '''
+        n_parts = int(n_parts)
+        if n_parts < 1:
+            raise Exception('At least one partition is required')
+        if method == 'rcb':
+            parts = self._bisect_coordinates(n_parts)
+        elif method == 'metis':
+            try:
+                import pymetis
+            except ImportError:
+                raise Exception('The metis method requires the pymetis package')
+            am = self._get_topology('adjacency')
+            if n_parts > 1:
+                parts = pymetis.part_graph(n_parts,xadj=am.indptr,adjncy=am.indices)[1]
+            else:
+                parts = sp.zeros((self.Np,),dtype=int)
+            parts = sp.array(parts,dtype=int)
+        else:
+            raise Exception('Unrecognized partitioning method: '+method)
+
+        # Replace the labels of any previous partitioning
+        for key in list(self.keys()):
+            suffix = self._partition_suffix(key,label)
+            if (suffix is not None) and (suffix.isdigit() or suffix == 'interface'):
+                del self[key]
+        conns = self['throat.conns']
+        Tparts = parts[conns]
+        internal = Tparts[:,0] == Tparts[:,1]
+        for i in range(0,n_parts):
+            self['pore.'+label+'_'+str(i)] = parts == i
+            self['throat.'+label+'_'+str(i)] = internal*(Tparts[:,0] == i)
+        self['throat.'+label+'_interface'] = ~internal
+        return parts
+
+    def _partition_suffix(self,key,label):
+        r'''
+        Returns the part of ``key`` that follows '<label>_', or None if the
+        key does not start with that prefix
+        '''
+        prop = key.split('.',1)[1]
+        if prop.startswith(label+'_'):
+            return prop[len(label)+1:]
+        return None
+
+    def _bisect_coordinates(self,n_parts):
+        r'''
+        Assigns the pores to ``n_parts`` groups by recursive coordinate
+        bisection, with group sizes proportional to the number of parts on
+        each side of every cut
+        '''
+        coords = self['pore.coords']
+        parts = sp.zeros((self.Np,),dtype=int)
+        stack = [(self.Ps,n_parts,0)]
+        while stack:
+            Ps,n,first = stack.pop()
+            if (n == 1) or (sp.shape(Ps)[0] == 0):
+                parts[Ps] = first
+                continue
+            C = coords[Ps]
+            axis = sp.argmax(sp.amax(C,axis=0) - sp.amin(C,axis=0))
+            n1 = n//2
+            k = int(round(sp.shape(Ps)[0]*n1/n))
+            if 0 < k < sp.shape(Ps)[0]:
+                order = sp.argpartition(C[:,axis],k)
+            else:
+                order = sp.arange(0,sp.shape(Ps)[0])
+            stack.append((Ps[order[:k]],n1,first))
+            stack.append((Ps[order[k:]],n-n1,first+n1))
+        return parts
+
+    @Tools.traced
+    def partition_domains(self,label='partition',views=False):
+        r'''
+        Returns the sub-domains created by ``partition`` in a form suited to
+        parallel solvers.
+
+        Parameters
+        ----------
+        label : string
+            The label prefix used by ``partition`` (default = 'partition')
+
+        views : boolean
+            If True, each sub-domain also contains a ``SubNetwork`` view of its
+            owned and ghost pores under 'network' (default = False)
+
+        Returns
+        -------
+        A list with a dictionary for each sub-domain, containing:
+
+            - 'pores' : The pores owned by the sub-domain
+            - 'ghost_pores' : Pores of other sub-domains that are connected to the owned pores
+            - 'ghost_owners' : The sub-domain that owns each ghost pore
+            - 'throats' : All throats with at least one owned pore
+            - 'interface_throats' : The throats joining owned pores to ghost pores
+            - 'conns' : The connections of 'throats' in local numbering, where the owned pores come first, followed by the ghost pores
+            - 'network' : Only if ``views`` is True, a ``SubNetwork`` of the owned and ghost pores, with the ghost pores labelled 'ghost'
+
+        Notes
+        -----
+        All arrays are found together by sorting the throats by sub-domain,
+        rather than by searching the network once per sub-domain.
+
+        The views are numbered in the order of the parent network rather than
+        in the local numbering of 'conns', and also contain the throats
+        between pairs of ghost pores.  They are registered with the
+        Controller like any other network, so they should be purged when no
+        longer needed.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.Cubic(shape=[8,8,8])
+        >>> parts = pn.partition(n_parts=2)
+        >>> domains = pn.partition_domains()
+        >>> [sp.shape(domains[0][item])[0] for item in ['pores','ghost_pores','interface_throats']]
+        [256, 64, 64]
+        '''
+        labels = [item for item in self.labels(element='pore')
+                  if str(self._partition_suffix(item,label)).isdigit()]
+        n_parts = len(labels)
+        if n_parts == 0:
+            raise Exception('The network has not been partitioned with label '+label)
+        parts = sp.zeros((self.Np,),dtype=int)
+        for i in range(0,n_parts):
+            parts[self['pore.'+label+'_'+str(i)]] = i
+        conns = self['throat.conns']
+        Tparts = parts[conns]
+        cross = sp.where(Tparts[:,0] != Tparts[:,1])[0]
+        # Each throat belongs to the sub-domain of each of its pores
+        Ts = sp.concatenate((self.Ts,cross))
+        Tkeys = sp.concatenate((Tparts[:,0],Tparts[cross,1]))
+        Ts = Ts[sp.argsort(Tkeys,kind='mergesort')]
+        Tcounts = sp.bincount(Tkeys,minlength=n_parts)
+        # Each interface throat adds the pore on its far side as a ghost
+        ghosts = sp.concatenate((conns[cross,1],conns[cross,0]))
+        Gkeys = sp.concatenate((Tparts[cross,0],Tparts[cross,1]))
+        temp = sp.unique(Gkeys*self.Np + ghosts)
+        Gkeys,ghosts = temp//self.Np,temp%self.Np
+        Gcounts = sp.bincount(Gkeys,minlength=n_parts)
+        Pcounts = sp.bincount(parts,minlength=n_parts)
+        Ps = sp.argsort(parts,kind='mergesort')
+        Ps = self._split(Ps,Pcounts)
+        Ts = self._split(Ts,Tcounts)
+        ghosts = self._split(ghosts,Gcounts)
+        domains = []
+        local = sp.zeros((self.Np,),dtype=self._get_dtype('index'))
+        for i in range(0,n_parts):
+            domain = {}
+            domain['pores'] = Ps[i]
+            domain['ghost_pores'] = ghosts[i]
+            domain['ghost_owners'] = parts[ghosts[i]]
+            domain['throats'] = Ts[i]
+            domain['interface_throats'] = Ts[i][Tparts[Ts[i],0] != Tparts[Ts[i],1]]
+            Pall = sp.concatenate((Ps[i],ghosts[i]))
+            local[Pall] = sp.arange(0,sp.shape(Pall)[0])
+            domain['conns'] = local[conns[Ts[i]]]
+            if views:
+                from OpenPNM.Network import SubNetwork
+                view = SubNetwork(network=self,pores=Pall)
+                view['pore.ghost'] = sp.in1d(view['pore.'+self.name],ghosts[i])
+                domain['network'] = view
+            domains.append(domain)
+        return domains
+
     #--------------------------------------------------------------------------
     '''Network Manipulation Methods'''
     #--------------------------------------------------------------------------
+    @Tools.traced
     def clone_pores(self,pores,apply_label=['clone'],mode='parents'):
         r'''
         Clones the specified pores and adds them to the network
@@ -567,47 +797,96 @@ class GenericNetwork(Core):
             - 'parents': (Default) Each clone is connected only to its parent
             - 'siblings': Clones are only connected to each other in the same manner as parents were connected
             - 'isolated': No connections between parents or siblings
+
+        See Also
+        --------
+        clone_pore_groups
         '''
-        if (self._geometries != []):
-            raise Exception('Network has active Geometries, cannot proceed')
-        if (self._phases != []):
-            raise Exception('Network has active Phases, cannot proceed')
+        if type(apply_label) is str:
+            apply_label = [apply_label]
+        self.clone_pore_groups([(pores,apply_label)],mode=mode)
+
+    @Tools.traced
+    def clone_pore_groups(self,groups,mode='parents'):
+        r'''
+        Clones several groups of pores, each with its own labels, and adds
+        them all to the network in a single call to ``extend``.  This is much
+        faster than calling ``clone_pores`` once per group since every array
+        on the network and its Phases is only resized once.
+
+        Parameters
+        ----------
+        groups : list of tuples
+            Each tuple contains the pores to clone and the label (or list of
+            labels) to apply to their clones.  The clones are added in the
+            order of the groups.
+        mode : string
+            Controls the connections between parents and clones, as described
+            in ``clone_pores``
+
+        Returns
+        -------
+        A list with the indices of the clones of each group
 
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> clones = pn.clone_pore_groups([(pn.pores('top'),'top_clone'),
+        ...                                (pn.pores('bottom'),'bottom_clone')])
+        >>> pn.Np
+        175
+        >>> pn.num_pores('bottom_clone')
+        25
+        >>> clones[1][0]
+        150
+        '''
         logger.debug('Cloning pores')
-        apply_label = list(apply_label)
-        #Clone pores
         Np = self.num_pores()
         Nt = self.num_throats()
-        parents = sp.array(pores,ndmin=1)
-        pcurrent = self['pore.coords']
-        pclone = pcurrent[pores,:]
-        pnew = sp.concatenate((pcurrent,pclone),axis=0)
-        Npnew = sp.shape(pnew)[0]
-        clones = sp.arange(Np,Npnew)
-        #Add clone labels to network
-        for item in apply_label:
-            if ('pore.'+item) not in self.keys():
-                self['pore.'+item] = False
-            if ('throat.'+item) not in self.keys():
-                self['throat.'+item] = False
-        #Add connections between parents and clones
-        if mode == 'parents':
-            tclone = sp.vstack((parents,clones)).T
-            self.extend(pore_coords=pclone,throat_conns=tclone)
-        if mode == 'siblings':
-            ts = self.find_neighbor_throats(pores=pores,mode='intersection')
-            tclone = self['throat.conns'][ts] + self.num_pores()
-            self.extend(pore_coords=pclone,throat_conns=tclone)
-        if mode == 'isolated':
-            self.extend(pore_coords=pclone)
-        #Apply provided labels to cloned pores
-        for item in apply_label:
-            self['pore.'+item][self.pores('all')>=Np] = True
-            self['throat.'+item][self.throats('all')>=Nt] = True
-
-        # Any existing adjacency and incidence matrices will be invalid
-        self._update_network()
-
+        parents = []
+        clones = []
+        tclones = []
+        start = Np
+        for pores,labels in groups:
+            pores = sp.array(pores,ndmin=1)
+            if pores.dtype == bool:
+                pores = sp.where(pores)[0]
+            pores = pores.astype(int)
+            parents.append(pores)
+            clones.append(sp.arange(start,start+sp.size(pores)))
+            #Add connections between parents and clones
+            if mode == 'parents':
+                tclone = sp.vstack((pores,clones[-1])).T
+            elif mode == 'siblings':
+                ts = self.find_neighbor_throats(pores=pores,mode='intersection')
+                Pmap = sp.zeros((Np,),dtype=int)
+                Pmap[pores] = clones[-1]
+                tclone = Pmap[self['throat.conns'][ts]]
+            else:
+                tclone = sp.zeros((0,2),dtype=int)
+            tclones.append(sp.reshape(tclone,(-1,2)))
+            start += sp.size(pores)
+        pclone = self['pore.coords'][sp.concatenate(parents)]
+        conns = sp.concatenate(tclones)
+        self.extend(pore_coords=pclone,throat_conns=conns)
+        #Apply the labels of each group to its clones and their throats
+        tstart = Nt
+        for (pores,labels),Ps,tclone in zip(groups,clones,tclones):
+            if type(labels) is str:
+                labels = [labels]
+            Ts = sp.arange(tstart,tstart+sp.shape(tclone)[0])
+            tstart += sp.shape(tclone)[0]
+            for item in labels:
+                if ('pore.'+item) not in self.keys():
+                    self['pore.'+item] = False
+                if ('throat.'+item) not in self.keys():
+                    self['throat.'+item] = False
+                self['pore.'+item][Ps] = True
+                self['throat.'+item][Ts] = True
+        return clones
+
+    @Tools.traced
     def extend(self,pore_coords=[],throat_conns=[],labels=[]):
         r'''
         Add individual pores (or throats) to the network from a list of coords
@@ -624,53 +903,37 @@ class GenericNetwork(Core):
 
         Notes
         -----
-        This needs to be enhanced so that it increases the size of all pore
-        and throat props and labels on ALL associated objects.  At the moment
-        if throws an error is there are ANY associated objects.
+        Every pore and throat array on the network and on its Phases is
+        resized once, into a new array of the final size.  New locations of
+        float arrays are filled with nans, of integer arrays with -1, and of
+        labels with False.  The
+        new pores and throats belong to every Phase but to no Geometry or
+        Physics, so those objects are unchanged.
 
         '''
-        if (self._geometries != []):
-            raise Exception('Network has active Geometries, cannot proceed')
-        if (self._phases != []):
-            raise Exception('Network has active Phases, cannot proceed')
-
         logger.debug('Extending network')
+        valid = self._valid_topology()
+        pore_coords = sp.reshape(pore_coords,(-1,3))
+        throat_conns = sp.reshape(throat_conns,(-1,2))
         Np_old = self.num_pores()
         Nt_old = self.num_throats()
-        Np = Np_old + int(sp.size(pore_coords)/3)
-        Nt = Nt_old + int(sp.size(throat_conns)/2)
-        #Adjust 'all' labels
-        del self['pore.all'], self['throat.all']
-        self['pore.all'] = sp.ones((Np,),dtype=bool)
-        self['throat.all'] = sp.ones((Nt,),dtype=bool)
+        Np = Np_old + sp.shape(pore_coords)[0]
+        Nt = Nt_old + sp.shape(throat_conns)[0]
         #Add coords and conns
-        if pore_coords != []:
-            coords = sp.vstack((self['pore.coords'],pore_coords))
-            self['pore.coords'] = coords
-        if throat_conns != []:
-            conns = sp.vstack((self['throat.conns'],throat_conns))
-            self['throat.conns'] = conns
-        for item in self.keys():
-            if item.split('.')[1] not in ['coords','conns','all']:
-                if item.split('.')[0] == 'pore':
-                    N = Np
-                else:
-                    N = Nt
-                if self[item].dtype == bool:
-                    temp = self[item]
-                    self[item] = sp.zeros((N,),dtype=bool)
-                    self[item][temp] = True
-                elif self[item].dtype == object:
-                    temp = self[item]
-                    self[item] = sp.ndarray((N,),dtype=object)
-                    self[item][sp.arange(0,sp.shape(temp)[0])] = temp
-                else:
-                    temp = self[item]
-                    try:
-                        self[item] = sp.ones((N,sp.shape(temp)[1]),dtype=float)*sp.nan
-                    except:
-                        self[item] = sp.ones((N,),dtype=float)*sp.nan
-                    self[item][sp.arange(0,sp.shape(temp)[0])] = temp
+        coords = self._allocate('pore.coords',(Np,3),self['pore.coords'].dtype)
+        coords[:Np_old] = self['pore.coords']
+        coords[Np_old:] = pore_coords
+        conns = self._allocate('throat.conns',(Nt,2),self._get_dtype('index',N=Np))
+        conns[:Nt_old] = self['throat.conns']
+        conns[Nt_old:] = throat_conns
+        self['pore.coords'] = coords
+        self['throat.conns'] = conns
+        #Resize all other arrays on the network and its phases
+        for item in [self]+self._phases:
+            self._extend_arrays(item,Np,Nt)
+        for phase in self._phases:
+            self['pore.'+phase.name][Np_old:] = True
+            self['throat.'+phase.name][Nt_old:] = True
         #Apply labels, if supplied
         if labels != []:
             #Convert labels to list if necessary
@@ -679,20 +942,71 @@ class GenericNetwork(Core):
             for label in labels:
                 #Remove pore or throat from label, if present
                 label = label.split('.')[-1]
-                if pore_coords != []:
-                    Ps = sp.r_[Np_old:Np]
+                if Np > Np_old:
                     if 'pore.'+label not in self.labels():
                         self['pore.'+label] = False
-                    self['pore.'+label][Ps] = True
-                if throat_conns != []:
-                    Ts = sp.r_[Nt_old:Nt]
+                    self['pore.'+label][Np_old:Np] = True
+                if Nt > Nt_old:
                     if 'throat.'+label not in self.labels():
                         self['throat.'+label] = False
-                    self['throat.'+label][Ts] = True
+                    self['throat.'+label][Nt_old:Nt] = True
 
-        self._update_network()
+        self._extend_topology(valid,Np_old,Nt_old)
 
-    def trim(self, pores=[], throats=[]):
+    def _extend_arrays(self,obj,Np,Nt):
+        r'''
+        Copies each array on ``obj`` into a new array for Np pores and Nt
+        throats, filling the new locations with nans (False for labels).
+        Uniform arrays are extended from their value without expanding them,
+        and stay uniform if the new locations get the same value.
+        '''
+        N = {'pore' : Np, 'throat' : Nt}
+        obj.update({'pore.all' : sp.ones((Np,),dtype=bool)})
+        obj.update({'throat.all' : sp.ones((Nt,),dtype=bool)})
+        for item in list(obj.keys()):
+            element,prop = item.split('.',1)
+            if prop in ['coords','conns','all']:
+                continue
+            temp = dict.__getitem__(obj,item)
+            dtype,fill = self._extended_dtype(temp)
+            shape = (N[element],)+sp.shape(temp)[1:]
+            n = sp.shape(temp)[0]
+            if (type(temp) is Tools.UniformArray) and temp._is_uniform():
+                #Extend the value itself, the uniform array is not expanded
+                temp = temp.value
+                if (temp == fill) or ((temp != temp) and (fill != fill)):
+                    value = Tools.UniformArray(temp,shape)
+                    dict.__setitem__(obj,item,value)
+                    value._set_owner(obj,item)
+                    obj._versions[item] = obj._versions.get(item,0) + 1
+                    continue
+            value = obj._allocate(item,shape,dtype)
+            value[:n] = temp
+            value[n:] = fill
+            obj[item] = value
+
+    def _extended_dtype(self,temp):
+        r'''
+        Returns the dtype and fill value used when ``temp`` is extended to new
+        locations
+        '''
+        if temp.dtype == bool:
+            return bool,False
+        elif temp.dtype == object:
+            return object,None
+        elif temp.dtype.kind == 'f':
+            #Keep the precision of float data
+            return temp.dtype,sp.nan
+        elif temp.dtype.kind == 'i':
+            #Ints already follow the index policy and are padded with -1
+            return temp.dtype,-1
+        elif temp.dtype.kind == 'u':
+            #Unsigned ints cannot hold the sentinel
+            return self._get_dtype('index',N=int(sp.iinfo(temp.dtype).max)+1),-1
+        return float,sp.nan
+
+    @Tools.traced
+    def trim(self, pores=[], throats=[], check_health=True):
         '''
         Remove pores (or throats) from the network.
 
@@ -702,12 +1016,21 @@ class GenericNetwork(Core):
             A boolean mask of length Np (or Nt) or a list of indices of the
             pores (or throats) to be removed.
 
+        check_health : boolean, optional
+            If True (default) ``check_network_health`` is run afterwards and a
+            warning is issued if isolated pores remain.  Scripts that trim in
+            a loop can set this to False and check once at the end.
+
         Notes
         -----
         Trimming only adjusts Phase, Geometry, and Physics objects. Trimming a
         Network that has already been used to run simulations will break those
         simulation objects.
 
+        A single mask of the pores and throats to keep is built, and every
+        array on the network and its associated objects is copied through it
+        once.
+
         Examples
         --------
         >>> import OpenPNM
@@ -727,78 +1050,157 @@ class GenericNetwork(Core):
             if net._parent is self:
                 raise Exception('This Network has been cloned, cannot trim')
 
+        conns = self['throat.conns']
         if pores != []:
             pores = sp.array(pores,ndmin=1)
             Pkeep = sp.ones((self.num_pores(),),dtype=bool)
             Pkeep[pores] = False
-            Tkeep = sp.ones((self.num_throats(),),dtype=bool)
-            Ts = self.find_neighbor_throats(pores)
-            if len(Ts)>0:
-                Tkeep[Ts] = False
+            Tkeep = Pkeep[conns[:,0]]*Pkeep[conns[:,1]]
         elif throats != []:
             throats = sp.array(throats,ndmin=1)
             Tkeep = sp.ones((self.num_throats(),),dtype=bool)
             Tkeep[throats] = False
-            Pkeep = self['pore.all'].copy()
+            Pkeep = sp.ones((self.num_pores(),),dtype=bool)
         else:
             logger.warning('No pores or throats recieved')
             return
+        valid = self._valid_topology()
 
-        # Trim all associated objects
+        # Trim all associated objects, using the part of the masks that
+        # falls on their locations
         for item in self._geometries+self._physics+self._phases:
-            Pnet = self['pore.'+item.name]*Pkeep
-            Tnet = self['throat.'+item.name]*Tkeep
-            temp = self.map_pores(pores=sp.where(Pnet)[0],target=item,return_mapping=True)
-            Ps = temp['target']
-            temp = self.map_throats(throats=sp.where(Tnet)[0],target=item,return_mapping=True)
-            Ts = temp['target']
-            # Then resize 'all
-            item.update({'pore.all' : sp.ones((sp.sum(Pnet),),dtype=bool)})
-            item.update({'throat.all' : sp.ones((sp.sum(Tnet),),dtype=bool)})
-            # Overwrite remaining data and info
-            for key in list(item.keys()):
-                if key.split('.')[1] not in ['all']:
-                    temp = item.pop(key)
-                    if key.split('.')[0] == 'throat':
-                        logger.debug('Trimming {a} from {b}'.format(a=key,b=item.name))
-                        item[key] = temp[Ts]
-                    if key.split('.')[0] == 'pore':
-                        logger.debug('Trimming {a} from {b}'.format(a=key,b=item.name))
-                        item[key] = temp[Ps]
+            Pitem = Pkeep[self['pore.'+item.name]]
+            Titem = Tkeep[self['throat.'+item.name]]
+            self._take_arrays(item,Pitem,Titem)
 
         #Remap throat connections
-        Pmap = sp.ones((self.Np,),dtype=int)*-1
+        Pmap = -sp.ones((self.Np,),dtype=self._get_dtype('index'))
         Pmap[Pkeep] = sp.arange(0,sp.sum(Pkeep))
-        tpore1 = self['throat.conns'][:,0]
-        tpore2 = self['throat.conns'][:,1]
-        Tnew1 = Pmap[tpore1[Tkeep]]
-        Tnew2 = Pmap[tpore2[Tkeep]]
-        #Write 'all' label specifically
-        self.update({'throat.all' : sp.ones((sp.sum(Tkeep),),dtype=bool)})
-        self.update({'pore.all' : sp.ones((sp.sum(Pkeep),),dtype=bool)})
+        Tnew = Pmap[conns[Tkeep]]
+        self._take_arrays(self,Pkeep,Tkeep)
         # Write throat connections specifically
-        self.update({'throat.conns' : sp.vstack((Tnew1,Tnew2)).T})
-        # Overwrite remaining data and info
-        for item in list(self.keys()):
-            if item.split('.')[-1] not in ['conns','all']:
-                temp = self.pop(item)
-                if item.split('.')[0] == 'throat':
-                    logger.debug('Trimming {a} from {b}'.format(a=item,b=self.name))
-                    self[item] = temp[Tkeep]
-                if item.split('.')[0] == 'pore':
-                    logger.debug('Trimming {a} from {b}'.format(a=item,b=self.name))
-                    self[item] = temp[Pkeep]
-
-        #Reset network graphs
-        self._update_network(mode='regenerate')
+        self.update({'throat.conns' : Tnew})
+        self._versions['throat.conns'] = self._versions.get('throat.conns',0) + 1
+
+        #Update network graphs
+        self._trim_topology(valid,Pkeep,Tkeep,conns)
 
         #Check Network health
-        health = self.check_network_health()
-        if health['trim_pores'] != []:
-            logger.warning('Isolated pores exist!  Run check_network_health to ID which pores to remove.')
-            pass
+        if check_health:
+            health = self.check_network_health()
+            if health['trim_pores'] != []:
+                logger.warning('Isolated pores exist!  Run check_network_health to ID which pores to remove.')
+                pass
+
+    @Tools.traced
+    def reorder(self,method='rcm'):
+        r'''
+        Renumbers the pores so that neighboring pores have nearby indices,
+        and the throats so that they follow the order of their pores.
+
+        Parameters
+        ----------
+        method : string
+            The ordering to use.  Options are:
+
+            - 'rcm' : (Default) Reverse Cuthill-McKee ordering of the adjacency matrix, which minimizes its bandwidth
+            - 'morton' : Sorts the pores along a Morton (Z-order) curve through their coordinates
+            - 'hilbert' : Sorts the pores along a Hilbert curve through their coordinates
+
+        Returns
+        -------
+        A dictionary containing the 'pore' and 'throat' permutations.  Item
+        ``i`` of each is the old index of the pore (or throat) that now has
+        index ``i``, so ``old_array[perm]`` converts data indexed in the old
+        numbering.
+
+        Notes
+        -----
+        The permutation is applied to every array on the network and on its
+        Geometry, Phase, Physics and Algorithm objects.  Networks whose pore
+        numbering came from a random process (Delaunay, imported or trimmed
+        networks) benefit most, since gathers such as
+        ``pdia[conns[:,0]]`` then access memory nearly in order and the
+        linear systems of the transport algorithms have less fill-in.
+        Methods that rely on the generation order, such as ``Cubic.asarray``,
+        no longer apply after reordering.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+        >>> coords = pn['pore.coords'].copy()
+        >>> perm = pn.reorder(method='hilbert')
+        >>> bool(sp.all(pn['pore.coords'] == coords[perm['pore']]))
+        True
+        '''
+        for net in self.controller.networks():
+            if net._parent is self:
+                raise Exception('This Network has been cloned, cannot reorder')
+        if method == 'rcm':
+            am = self._get_topology('adjacency')
+            Pperm = sprs.csgraph.reverse_cuthill_mckee(am,symmetric_mode=True)
+        elif method == 'morton':
+            Pperm = sp.argsort(misc.morton_keys(self['pore.coords']),kind='mergesort')
+        elif method == 'hilbert':
+            Pperm = sp.argsort(misc.hilbert_keys(self['pore.coords']),kind='mergesort')
+        else:
+            raise Exception('Unrecognized reordering method: '+method)
+        Pperm = sp.array(Pperm,dtype=self._get_dtype('index'))
+        Pmap = sp.empty_like(Pperm)
+        Pmap[Pperm] = sp.arange(0,sp.shape(Pperm)[0],dtype=Pperm.dtype)
+        # Sort the throats by their lower then upper pore in the new numbering
+        conns = Pmap[self['throat.conns']]
+        Tperm = sp.lexsort((sp.amax(conns,axis=1),sp.amin(conns,axis=1)))
+
+        # Reorder the locations of each associated object, which follow the
+        # order of their locations on the network
+        for item in self._geometries+self._physics:
+            Pitem = self['pore.'+item.name]
+            Titem = self['throat.'+item.name]
+            Ploc = sp.cumsum(Pitem) - 1
+            Tloc = sp.cumsum(Titem) - 1
+            self._take_arrays(item,Ploc[Pperm[Pitem[Pperm]]],Tloc[Tperm[Titem[Tperm]]])
+        algs = [alg for alg in self.controller.algorithms() if alg._net is self]
+        for item in self._phases+algs:
+            self._take_arrays(item,Pperm,Tperm)
+
+        self._take_arrays(self,Pperm,Tperm)
+        self.update({'throat.conns' : conns[Tperm]})
+        self._versions['throat.conns'] = self._versions.get('throat.conns',0) + 1
+        return {'pore' : Pperm, 'throat' : Tperm}
+
+    def _take_arrays(self,obj,Pkeep,Tkeep):
+        r'''
+        Keeps the locations of every array on ``obj`` given by the masks or
+        index arrays, in that order, except 'throat.conns' which must be
+        renumbered by the caller
+        '''
+        keep = {'pore' : Pkeep, 'throat' : Tkeep}
+        N = {}
+        for element in keep:
+            if keep[element].dtype == bool:
+                N[element] = sp.sum(keep[element])
+            else:
+                N[element] = sp.shape(keep[element])[0]
+        obj.update({'pore.all' : sp.ones((N['pore'],),dtype=bool)})
+        obj.update({'throat.all' : sp.ones((N['throat'],),dtype=bool)})
+        for key in list(obj.keys()):
+            element,prop = key.split('.',1)
+            if prop in ['all','conns']:
+                continue
+            logger.debug('Trimming %s from %s',key,obj.name)
+            temp = dict.__getitem__(obj,key)
+            if (type(temp) is Tools.UniformArray) and temp._is_uniform():
+                temp = Tools.UniformArray(temp.value,(N[element],)+sp.shape(temp)[1:])
+                dict.__setitem__(obj,key,temp)
+            else:
+                obj._store(key,temp[keep[element]])
+            obj._versions[key] = obj._versions.get(key,0) + 1
 
-    def _stitch(self,network_2,pores_1,pores_2,method='delaunay',len_max=sp.inf):
+    @Tools.traced
+    def stitch(self,network_2,pores_1,pores_2,method='delaunay',len_max=sp.inf,
+               label='stitched'):
         r'''
         Stitches a second a network to the current network.
 
@@ -808,10 +1210,10 @@ class GenericNetwork(Core):
             The network to stitch on to the current network
 
         pores_1 : array_like
-            The pores on the recipient network
+            The pores on the recipient network, as indices or a boolean mask
 
-        label_2 : array_like
-            The pores label on the doner network
+        pores_2 : array_like
+            The pores on the donor network, as indices or a boolean mask
 
         len_max : float
             Set a length limit on length of new throats
@@ -823,82 +1225,100 @@ class GenericNetwork(Core):
 
             - 'delaunay' : Use a Delaunay tessellation
             - 'nearest' : Connects each pore on the receptor network to its nearest pore on the donor network
+            - 'radius' : Connects every pair of pores that are within ``len_max`` of each other
 
+        label : string (default = 'stitched')
+            The label applied to the new throats joining the two networks
+
+        Notes
+        -----
+        All pores and throats of ``network_2`` are added to the current
+        network, along with all of their properties and labels except those
+        of the objects associated with ``network_2``.  The new connections
+        are found with a KD-tree, so only pairs within ``len_max`` are ever
+        considered, and every array is resized once.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+        >>> pn2 = OpenPNM.Network.Cubic(shape=[5,5,5])
+        >>> pn2['pore.coords'] += [0,0,5]
+        >>> pn.stitch(pn2,pores_1=pn.pores('top'),pores_2=pn2.pores('bottom'),
+        ...           method='nearest',len_max=1)
+        >>> pn.Np
+        250
+        >>> pn.num_throats('stitched')
+        25
         '''
-        # Get the initial number of pores and throats
-        N_init = {}
-        N_init['pore']  = self.Np
-        N_init['throat'] = self.Nt
+        pores_1 = self._parse_pores(pores_1)
+        pores_2 = network_2._parse_pores(pores_2)
+        Np = self.num_pores()
+        C1 = self['pore.coords'][pores_1]
+        C2 = network_2['pore.coords'][pores_2]
         if method == 'delaunay':
-            P1 = pores_1
-            P2 = pores_2 + Np  # Increment pores on network_2
-            P = sp.hstack((P1,P2))
-            C1 = self['pore.coords'][pores_1]
-            C2 = network_2['pore.coords'][pores_2]
-            C = sp.vstack((C1,C2))
-            T = sp.spatial.Delaunay(C)
+            # Connect the pairs of pores on opposite networks that share an
+            # edge of the tessellation.  Pores on lattices are degenerate
+            # for qhull, so the input is joggled to keep it from stalling.
+            T = sptl.Delaunay(sp.vstack((C1,C2)),qhull_options='QJ')
             a = T.simplices
-            b = []
-            for i in range(0,4):  # Turn simplices into pairs of connections
-                for j in range(0,4):
-                    if i != j:
-                        b.append(sp.vstack((a[:,i],a[:,j])).T)
-            c = sp.vstack((b))  # Convert list b to numpy array
-            #Remove thraot connections to self
-            K1 = sp.in1d(P[c][:,0],P1)*sp.in1d(P[c][:,1],P2)
-            K2 = sp.in1d(P[c][:,0],P2)*sp.in1d(P[c][:,1],P1)
-            K = sp.where(K1 + K2)[0]
-            #Remove duplicate throat connections
-            i = P[c][K][:,0]
-            j = P[c][K][:,1]
-            v = sp.ones_like(i)
-            N = self.Np + network_2.Np
-            adjmat = sprs.coo.coo_matrix((v,(i,j)),shape=(N,N))
-            #Convert to csr and back to coo to remove duplicates
-            adjmat = adjmat.tocsr()
-            adjmat = adjmat.tocoo()
-            #Remove lower triangular to remove bidirectional
-            adjmat = sprs.triu(adjmat,k=1,format="coo")
-            #Convert adjmat into 'throat.conns'
-            conns = sp.vstack((adjmat.row, adjmat.col)).T
-        if method == 'nearest':
-            P1 = pores_1
-            P2 = pores_2 + N_init['pore']  # Increment pores on network_2
-            P = sp.hstack((P1,P2))
-            C1 = self['pore.coords'][pores_1]
-            C2 = network_2['pore.coords'][pores_2]
-            D = sp.spatial.distance.cdist(C1,C2)
-            N = sp.shape(D)[0]
-            Dmin = sp.ndarray([N,],dtype=int)
-            for row in range(0,N):
-                Dmin[row] = sp.where(D[row]==sp.amin(D[row,:]))[0]
-            conns = sp.vstack((P1,P2[Dmin])).T
-
-        #Enter network_2's pores into the Network
-        self.extend(pore_coords=network_2['pore.coords'])
-
-        #Enter network_2's throats into the Network
-        self.extend(throat_conns=network_2['throat.conns']+N_init['pore'])
-
-        #Trim throats that are longer then given len_max
-        C1 = self['pore.coords'][conns[:,0]]
-        C2 = self['pore.coords'][conns[:,1]]
-        L = sp.sum((C1 - C2)**2,axis=1)**0.5
-        conns = conns[L<=len_max]
-
-        #Add donor labels to recipient network
-        for label in network_2.labels():
-            element = label.split('.')[0]
-            locations = sp.where(self._get_indices(element)>=N_init[element])[0]
-            try:
-                self[label]
-            except:
-                self[label] = False
-            self[label][locations] = network_2[label]
+            n = sp.shape(a)[1]
+            b = sp.vstack([a[:,[i,j]] for i in range(0,n) for j in range(i+1,n)])
+            b = sp.sort(b,axis=1)
+            N1 = sp.shape(pores_1)[0]
+            N = N1 + sp.shape(pores_2)[0]
+            b = b[(b[:,0] < N1)*(b[:,1] >= N1)]
+            # Remove the duplicate edges shared by neighboring simplices
+            keys = sp.unique(b[:,0]*N + b[:,1])
+            i = keys//N
+            j = keys%N - N1
+        elif method == 'nearest':
+            # The upper bound of the query is exclusive
+            tree = sptl.cKDTree(C2)
+            d,j = tree.query(C1,distance_upper_bound=sp.nextafter(len_max,sp.inf))
+            i = sp.where(sp.isfinite(d))[0]
+            j = j[i]
+        elif method == 'radius':
+            if not sp.isfinite(len_max):
+                raise Exception('The radius method requires a finite len_max')
+            tree_1 = sptl.cKDTree(C1)
+            tree_2 = sptl.cKDTree(C2)
+            pairs = tree_1.sparse_distance_matrix(tree_2,len_max,output_type='ndarray')
+            i,j = pairs['i'],pairs['j']
+        else:
+            raise Exception('Unrecognized stitching method: '+method)
+        conns = sp.vstack((pores_1[i],pores_2[j]+Np)).T
 
-        #Lastly, add the new stitch throats to the Network
-        self.extend(throat_conns=conns,labels='stitched')
+        # Trim throats that are longer then given len_max
+        L = sp.sqrt(sp.sum((C1[i] - C2[j])**2,axis=1))
+        conns = conns[L <= len_max]
 
+        # Add all pores, throats and stitches in one extension
+        Nt = self.num_throats()
+        throat_conns = sp.vstack((network_2['throat.conns']+Np,conns))
+        self.extend(pore_coords=network_2['pore.coords'],throat_conns=throat_conns)
+        locations = {'pore' : slice(Np,Np+network_2.Np),
+                     'throat' : slice(Nt,Nt+network_2.Nt)}
+        size = {'pore' : self.Np, 'throat' : self.Nt}
+        skip = ['coords','conns','all'] + \
+               [item.name for item in network_2._geometries+network_2._phases+network_2._physics]
+        for key in list(network_2.keys()):
+            element,prop = key.split('.',1)
+            if prop in skip:
+                continue
+            temp = network_2[key]
+            if key not in self.keys():
+                dtype,fill = self._extended_dtype(temp)
+                value = self._allocate(key,(size[element],)+sp.shape(temp)[1:],dtype)
+                value[...] = fill
+                self[key] = value
+            self[key][locations[element]] = temp
+        if sp.shape(conns)[0] > 0:
+            if 'throat.'+label not in self.labels():
+                self['throat.'+label] = False
+            self['throat.'+label][Nt+network_2.Nt:] = True
+
+    @Tools.traced
     def check_network_health(self):
         r'''
         This method check the network topological health by checking for:
@@ -907,11 +1327,22 @@ class GenericNetwork(Core):
             (2) Islands or isolated clusters of pores
             (3) Duplicate throats
             (4) Bidirectional throats (ie. symmetrical adjacency matrix)
+            (5) Coincident pores
 
         Returns
         -------
         A dictionary containing the offending pores or throat numbers under
-        each named key.
+        each named key:
+
+            - 'isolated_pores' : pores with no throats
+            - 'disconnected_clusters' : a list of the pores in each cluster,
+              largest first
+            - 'duplicate_throats' : a list of the throats in each group
+              that connects the same two pores in the same direction
+            - 'bidirectional_throats' : throats that connect two pores in
+              the opposite direction to another throat
+            - 'duplicate_pores' : pores located at the same coordinates as a
+              lower numbered pore
 
         It also returns a list of which pores and throats should be trimmed
         from the network to restore health.  This list is a suggestion only,
@@ -919,9 +1350,19 @@ class GenericNetwork(Core):
 
         Notes
         -----
-        - Does not yet check for duplicate pores
         - Does not yet suggest which throats to remove
         - This is just a 'check' method and does not 'fix' the problems it finds
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> pn.extend(throat_conns=[[0,1],[1,0]])
+        >>> health = pn.check_network_health()
+        >>> health['duplicate_throats']
+        [[0, 300]]
+        >>> health['bidirectional_throats']
+        array([301])
         '''
 
         health = {}
@@ -930,55 +1371,59 @@ class GenericNetwork(Core):
         health['trim_pores'] = []
         health['duplicate_throats'] = []
         health['bidirectional_throats'] = []
+        health['duplicate_pores'] = []
+        Np = self.num_pores()
+        conns = sp.array(self['throat.conns'],dtype=sp.int64)
 
         #Check for individual isolated pores
-        Ps = self.num_neighbors(self.pores())
-        if sp.sum(Ps==0) > 0:
-            logger.warning(str(sp.sum(Ps==0))+' pores have no neighbors')
-            health['isolated_pores'] = sp.where(Ps==0)[0]
+        degree = sp.bincount(conns.flatten(),minlength=Np)
+        if sp.sum(degree==0) > 0:
+            logger.warning(str(sp.sum(degree==0))+' pores have no neighbors')
+            health['isolated_pores'] = sp.where(degree==0)[0]
 
         #Check for separated clusters of pores
-        temp = []
-        Cs = self.find_clusters(self.tomask(throats=self.throats('all')))
-        if sp.shape(sp.unique(Cs))[0] > 1:
+        am = self._get_topology('adjacency')
+        Cs = sprs.csgraph.connected_components(am)[1]
+        sizes = sp.bincount(Cs)
+        if sp.shape(sizes)[0] > 1:
             logger.warning('Isolated clusters exist in the network')
-            for i in sp.unique(Cs):
-                temp.append(sp.where(Cs==i)[0])
-            b = sp.array([len(item) for item in temp])
-            c = sp.argsort(b)[::-1]
-            for i in range(0,len(c)):
-                health['disconnected_clusters'].append(temp[c[i]])
-                if i > 0:
-                    health['trim_pores'].extend(temp[c[i]])
-
-        #Check for duplicate throats
-        i = self['throat.conns'][:,0]
-        j = self['throat.conns'][:,1]
-        v = sp.array(self['throat.all'],dtype=int)
-        Np = self.num_pores()
-        adjmat = sprs.coo_matrix((v,(i,j)),[Np,Np])
-        temp = adjmat.tocsr()  # Convert to CSR to combine duplicates
-        temp = adjmat.tocoo()  # And back to COO
-        mergedTs = sp.where(temp.data>1)
-        Ps12 = sp.vstack((temp.row[mergedTs], temp.col[mergedTs])).T
+            # Group the pores of every cluster with one sort
+            order = sp.argsort(Cs,kind='mergesort')
+            temp = sp.split(order,sp.cumsum(sizes)[:-1])
+            c = sp.argsort(sizes)[::-1]
+            health['disconnected_clusters'] = [temp[i] for i in c]
+            if sp.shape(c)[0] > 1:
+                health['trim_pores'] = sp.concatenate([temp[i] for i in c[1:]]).tolist()
+
+        #Check for duplicate throats, which share the same ordered pair
+        keys = conns[:,0]*Np + conns[:,1]
+        order = sp.argsort(keys,kind='mergesort')
+        keys = keys[order]
+        starts = sp.where(sp.r_[True,keys[1:] != keys[:-1]])[0]
+        counts = sp.diff(sp.r_[starts,sp.shape(keys)[0]])
         dupTs = []
-        for i in range(0,sp.shape(Ps12)[0]):
-            dupTs.append(self.find_connecting_throat(Ps12[i,0],Ps12[i,1]).tolist)
+        for i in sp.where(counts > 1)[0]:
+            dupTs.append(order[starts[i]:starts[i]+counts[i]].tolist())
         health['duplicate_throats'] = dupTs
 
-        #Check for bidirectional throats
-        num_full = adjmat.sum()
-        temp = sprs.triu(adjmat,k=1)
-        num_upper = temp.sum()
-        if num_full > num_upper:
-            health['bidirectional_throats'] = str(num_full-num_upper)+' detected!'
+        #Check for bidirectional throats, whose reversed pair also exists
+        reverse = conns[:,0] > conns[:,1]
+        if sp.any(reverse):
+            pairs = sp.sort(conns,axis=1)
+            keys = pairs[:,0]*Np + pairs[:,1]
+            inv = sp.unique(keys,return_inverse=True)[1]
+            forward = sp.bincount(inv,weights=~reverse) > 0
+            bidTs = sp.where(reverse*forward[inv])[0]
+            if sp.shape(bidTs)[0] > 0:
+                logger.warning(str(sp.shape(bidTs)[0])+' bidirectional throats detected')
+                health['bidirectional_throats'] = bidTs
 
         #Check for coincident pores
-#        temp = misc.dist(self['pore.coords'],self['pore.coords'])
-#        temp = sp.triu(temp,k=1)  # Remove lower triangular of matrix
-#        temp = sp.where(temp==0)  # Find 0 values in distance matrix
-#        dupPs = sp.where(temp[1]>temp[0])[0]  # Find 0 values above diagonal
-#        health['duplicate_pores'] = dupPs
+        if Np > 1:
+            kd = sptl.cKDTree(self['pore.coords'],balanced_tree=False)
+            pairs = kd.query_pairs(r=0,output_type='ndarray')
+            if sp.shape(pairs)[0] > 0:
+                health['duplicate_pores'] = sp.unique(pairs[:,1])
 
         return health
 
@@ -1001,6 +1446,7 @@ class GenericNetwork(Core):
         health['undefined_throats'] = sp.where(Ttemp==0)[0].tolist()
         return health
 
+    @Tools.traced
     def _update_network(self,mode='clear'):
         r'''
         Regenerates the adjacency and incidence matrices
@@ -1011,31 +1457,184 @@ class GenericNetwork(Core):
             Controls the extent of the update.  Options are:
 
             - 'clear' : Removes exsiting adjacency and incidence matrices
-            - 'regenerate' : Removes the existing matrices and regenerates new ones.
+            - 'regenerate' : Removes the existing matrices and regenerates the CSR ones.
 
         Notes
         -----
-        The 'regenerate' mode is more time consuming, so repeated calls to
-        this function (ie. during network merges, and adding boundaries)
-        should use the 'clear' mode.  The other methods that require these
-        matrices will generate them as needed, so this pushes the 'generation'
-        time to 'on demand'.
+        The matrices are cached in CSR format, and are rebuilt on demand by
+        the methods that need them whenever the topology has changed.
+        ``extend`` and ``trim`` update the cached matrices in place instead
+        of clearing them, so this only needs to be called after the
+        'throat.conns' array has been edited in place.
         '''
         logger.debug('Resetting adjacency and incidence matrices')
-        self._adjacency_matrix['coo'] = {}
-        self._adjacency_matrix['csr'] = {}
-        self._adjacency_matrix['lil'] = {}
-        self._incidence_matrix['coo'] = {}
-        self._incidence_matrix['csr'] = {}
-        self._incidence_matrix['lil'] = {}
-
+        for kind in ['adjacency','incidence']:
+            self._topology_cache(kind).clear()
+            self._topology_stamp[kind] = None
         if mode == 'regenerate':
-            self._adjacency_matrix['coo'] = self.create_adjacency_matrix(sprsfmt='coo')
-            self._adjacency_matrix['csr'] = self.create_adjacency_matrix(sprsfmt='csr')
-            self._adjacency_matrix['lil'] = self.create_adjacency_matrix(sprsfmt='lil')
-            self._incidence_matrix['coo'] = self.create_incidence_matrix(sprsfmt='coo')
-            self._incidence_matrix['csr'] = self.create_incidence_matrix(sprsfmt='csr')
-            self._incidence_matrix['lil'] = self.create_incidence_matrix(sprsfmt='lil')
+            self._get_topology('adjacency')
+            self._get_topology('incidence')
+
+    def _topology_cache(self,kind):
+        if kind == 'adjacency':
+            return self._adjacency_matrix
+        return self._incidence_matrix
+
+    def _topology_state(self):
+        return (self._versions.get('throat.conns',0),
+                sp.shape(self['pore.all'])[0],sp.shape(self['throat.all'])[0])
+
+    def _get_topology(self,kind,sprsfmt='csr'):
+        r'''
+        Returns the cached adjacency or incidence matrix in the requested
+        format, building it first if it is missing or the topology of the
+        network has changed since it was built.
+
+        Parameters
+        ----------
+        kind : string
+            Either 'adjacency' or 'incidence'
+
+        sprsfmt : string
+            The sparse format, either 'csr' (default), 'coo' or 'lil'.  Other
+            formats are converted from the CSR matrix.
+        '''
+        cache = self._topology_cache(kind)
+        state = self._topology_state()
+        if self._topology_stamp[kind] != state:
+            cache.clear()
+            self._topology_stamp[kind] = state
+        if not sprs.issparse(cache.get('csr')):
+            logger.debug('Building %s matrix',kind)
+            if kind == 'adjacency':
+                cache['csr'] = self.create_adjacency_matrix(sprsfmt='csr')
+            else:
+                cache['csr'] = self.create_incidence_matrix(sprsfmt='csr')
+            self._topology_stats[kind+'_builds'] += 1
+        if not sprs.issparse(cache.get(sprsfmt)):
+            cache[sprsfmt] = cache['csr'].asformat(sprsfmt)
+        return cache[sprsfmt]
+
+    @property
+    def topology_stats(self):
+        r'''
+        The number of times the adjacency and incidence matrices have been
+        built from scratch, and the number of times they were updated in
+        place by ``extend`` or ``trim``.  Useful for finding code that
+        causes unnecessary rebuilds.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> Ps = pn.find_neighbor_pores(pores=[0])
+        >>> pn.extend(pore_coords=[[0,0,0]],throat_conns=[[0,125]])
+        >>> pn.find_neighbor_pores(pores=[0])
+        array([  1,   5,  25, 125])
+        >>> pn.topology_stats['adjacency_builds']
+        1
+        '''
+        return dict(self._topology_stats)
+
+    def _valid_topology(self):
+        r'''
+        Returns the kinds of cached matrices that are up to date
+        '''
+        state = self._topology_state()
+        return [kind for kind in ['adjacency','incidence']
+                if (self._topology_stamp[kind] == state)
+                and sprs.issparse(self._topology_cache(kind).get('csr'))]
+
+    def _pad_csr(self,matrix,shape):
+        indptr = sp.append(matrix.indptr,
+                           sp.repeat(matrix.indptr[-1],shape[0]-matrix.shape[0]))
+        return sprs.csr_matrix((matrix.data,matrix.indices,indptr),shape=shape)
+
+    def _compact_csr(self,matrix,rows,cmap,Ncols):
+        r'''
+        Keeps the given rows of a CSR matrix and renumbers its columns with
+        ``cmap``, dropping the entries of columns mapped to -1
+        '''
+        if sp.size(rows) < matrix.shape[0]:
+            matrix = matrix[rows]
+        counts = sp.diff(matrix.indptr)
+        row = sp.repeat(sp.arange(matrix.shape[0]),counts)
+        col = cmap[matrix.indices]
+        keep = col >= 0
+        indptr = sp.zeros((matrix.shape[0]+1,),dtype=matrix.indptr.dtype)
+        indptr[1:] = sp.cumsum(sp.bincount(row[keep],minlength=matrix.shape[0]))
+        return sprs.csr_matrix((matrix.data[keep],col[keep],indptr),
+                               shape=(matrix.shape[0],Ncols))
+
+    def _extend_topology(self,valid,Np_old,Nt_old):
+        r'''
+        Adds the pores and throats appended by ``extend`` to the cached
+        matrices listed in ``valid``, and clears any others
+        '''
+        Np = self.num_pores()
+        Nt = self.num_throats()
+        conns = self['throat.conns'][Nt_old:]
+        row = sp.append(conns[:,0],conns[:,1])
+        ones = sp.ones((sp.size(row),))
+        updated = {}
+        if 'adjacency' in valid:
+            am = self._pad_csr(self._adjacency_matrix['csr'],(Np,Np))
+            if sp.size(row) > 0:
+                col = sp.append(conns[:,1],conns[:,0])
+                am = am + sprs.coo_matrix((ones,(row,col)),(Np,Np)).tocsr()
+            updated['adjacency'] = am
+        if 'incidence' in valid:
+            im = self._pad_csr(self._incidence_matrix['csr'],(Np,Nt))
+            if sp.size(row) > 0:
+                col = sp.tile(sp.arange(Nt_old,Nt),2)
+                im = im + sprs.coo_matrix((ones,(row,col)),(Np,Nt)).tocsr()
+            updated['incidence'] = im
+        self._store_topology(updated)
+
+    def _trim_topology(self,valid,Pkeep,Tkeep,conns):
+        r'''
+        Removes the pores and throats deleted by ``trim`` from the cached
+        matrices listed in ``valid``, and clears any others.  ``conns`` are
+        the throat connections from before the trim.
+        '''
+        Np = sp.sum(Pkeep)
+        Nt = sp.sum(Tkeep)
+        Ps = sp.where(Pkeep)[0]
+        updated = {}
+        if 'adjacency' in valid:
+            am = self._adjacency_matrix['csr']
+            drop = conns[~Tkeep]
+            if sp.size(drop) > 0:
+                row = sp.append(drop[:,0],drop[:,1])
+                col = sp.append(drop[:,1],drop[:,0])
+                ones = sp.ones((sp.size(row),))
+                am = am - sprs.coo_matrix((ones,(row,col)),am.shape).tocsr()
+                am.eliminate_zeros()
+            Pmap = -sp.ones((sp.size(Pkeep),),dtype=int)
+            Pmap[Pkeep] = sp.arange(0,Np)
+            updated['adjacency'] = self._compact_csr(am,Ps,Pmap,Np)
+        if 'incidence' in valid:
+            Tmap = -sp.ones((sp.size(Tkeep),),dtype=int)
+            Tmap[Tkeep] = sp.arange(0,Nt)
+            im = self._incidence_matrix['csr']
+            updated['incidence'] = self._compact_csr(im,Ps,Tmap,Nt)
+        self._store_topology(updated)
+
+    def _store_topology(self,updated):
+        state = self._topology_state()
+        for kind in ['adjacency','incidence']:
+            cache = self._topology_cache(kind)
+            cache.clear()
+            if kind in updated:
+                #Neighbor lookups return the column indices in sorted order
+                updated[kind].sort_indices()
+                cache['csr'] = updated[kind]
+                self._topology_stamp[kind] = state
+                self._topology_stats['incremental_updates'] += 1
+                if Tools.Tracer.enabled:
+                    Tools.Tracer.count('sparse.incremental')
+            else:
+                self._topology_stamp[kind] = None
 
     #--------------------------------------------------------------------------
     '''Domain Geometry Methods'''
@@ -1050,11 +1649,8 @@ class GenericNetwork(Core):
         This method checks to see whether any pores are isolated from the network and
         returns a boolean mask
         '''
-        isolated = [False]*(self.num_pores())
-        for pore in self.pores():
-            if pore not in self["throat.conns"]:
-                isolated[pore]=True
-        return isolated
+        degree = sp.bincount(sp.ravel(self['throat.conns']),minlength=self.Np)
+        return (degree == 0).tolist()
 
     def domain_pore_volume(self):
         r'''
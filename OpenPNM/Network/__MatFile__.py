@@ -96,10 +96,10 @@ class MatFile(GenericNetwork):
         filepath = os.path.join(self._path,filename)
         self._xtra_pore_data=xtra_pore_data
         self._xtra_throat_data=xtra_throat_data
-        self._dictionary=spio.loadmat(filepath)
+        self._dictionary=self._read_variables(filepath)
 
-        self._Np=sp.size(self._dictionary['pnumbering'])
-        self._Nt=sp.size(self._dictionary['tnumbering'])
+        self._Np=sp.size(self._dictionary['pcoords'])//3
+        self._Nt=sp.size(self._dictionary['tconnections'])//2
 
         #Run through generation steps
         self._add_pores()
@@ -109,6 +109,22 @@ class MatFile(GenericNetwork):
         self._add_xtra_throat_data()
         self._add_geometry()
 
+    def _read_variables(self,filepath):
+        r'''
+        Reads only the variables used by the import, rather than the whole file
+        '''
+        names = ['pcoords','pvolume','pdiameter','tconnections','tdiameter',
+                 'ptype','ttype','pname_transform']
+        for xtra,prefix in [(self._xtra_pore_data,'p'),(self._xtra_throat_data,'t')]:
+            if xtra is None:
+                continue
+            if type(xtra) is not type([]):
+                xtra = [xtra]
+            names.extend([prefix+item for item in xtra])
+        available = [item[0] for item in spio.whosmat(filepath)]
+        names = [item for item in names if item in available]
+        return spio.loadmat(filepath,variable_names=names)
+
     def _add_pores(self):
         Pind = sp.arange(0,self._Np)
         self['pore.all'] = sp.ones_like(Pind,dtype=bool)
@@ -135,39 +151,23 @@ class MatFile(GenericNetwork):
             cluster_sizes = [sp.shape(x)[0] for x in health['disconnected_clusters']]
             acceptable_size = min([min([50,Np/2]),max(cluster_sizes)]) # 50 or less, if it's a really small network.
             #step through each cluster of pores. If its a small cluster, add it to the list
-            for cluster in health['disconnected_clusters']:
-                if sp.shape(cluster)[0] < acceptable_size:
-                    bad_pores = sp.append(bad_pores,sp.ravel(cluster))
+            bad_clusters = [sp.ravel(cluster) for cluster in health['disconnected_clusters'] if sp.shape(cluster)[0] < acceptable_size]
+            if bad_clusters != []:
+                bad_pores = sp.concatenate(bad_clusters)
             bad_throats = sp.unique(self.find_neighbor_throats(bad_pores))
-            #Create map for pores
-            if sp.shape(bad_pores)[0] > 0:
-                i = 0
-                self._pore_map = sp.zeros((Np-sp.shape(bad_pores)[0],),dtype=int)
-                for pore in self.pores():
-                    if pore not in bad_pores:
-                        self._pore_map[i] = pore
-                        i += 1
-            #Create map for throats
-            if sp.shape(bad_throats)[0] > 0:
-                i = 0
-                self._throat_map = sp.zeros((Nt-sp.shape(bad_throats)[0],),dtype=int)
-                for throat in self.throats():
-                    if throat not in bad_throats:
-                        self._throat_map[i] = throat
-                        i += 1
+            #Create maps from the new to the original pore and throat numbers
+            Pkeep = sp.ones((Np,),dtype=bool)
+            Pkeep[bad_pores] = False
+            self._pore_map = sp.where(Pkeep)[0]
+            Tkeep = sp.ones((Nt,),dtype=bool)
+            Tkeep[bad_throats] = False
+            self._throat_map = sp.where(Tkeep)[0]
             #Fix the pore transformer
-            try:
-                if sp.shape(bad_pores)[0] > 0:
-                    i = 0
-                    old_transform = self._dictionary['pname_transform']
-                    self._dictionary['pname_transform'] = sp.zeros((Np-sp.shape(bad_pores)[0],),dtype=int)
-                    for pore in self.pores():
-                        if pore not in bad_pores:
-                            self._dictionary['pname_transform'][i] = old_transform[pore]
-                            i += 1
-            except:
+            if 'pname_transform' in self._dictionary.keys():
+                old_transform = sp.ravel(self._dictionary['pname_transform'])
+                self._dictionary['pname_transform'] = old_transform[self._pore_map]
+            else:
                 logger.info('Could not update pname_transform. Imported network may not have had it.')
-                pass
             self.trim(pores=bad_pores)
 
     def _add_geometry(self):
@@ -192,8 +192,8 @@ class MatFile(GenericNetwork):
             boundary_throats = sp.array([])
             logger.info('No boundary pores added.')
             add_boundaries = False
-        Ps = sp.where([pore not in boundary_pores for pore in self.pores()])[0]
-        Ts = sp.where([throat not in boundary_throats for throat in self.throats()])[0]
+        Ps = sp.where(~self.tomask(pores=sp.array(boundary_pores,dtype=int)))[0]
+        Ts = sp.where(~self.tomask(throats=sp.array(boundary_throats,dtype=int)))[0]
         geom = OpenPNM.Geometry.GenericGeometry(network=self,pores=Ps,throats=Ts)
         geom['pore.volume'] = sp.ravel(sp.array(self._dictionary['pvolume'][self._pore_map[Ps]],float))
         geom['pore.diameter'] = sp.ravel(sp.array(self._dictionary['pdiameter'][self._pore_map[Ps]],float))
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+===============================================================================
+SubNetwork: A view of part of a network that shares its data
+===============================================================================
+
+"""
+import scipy as sp
+from OpenPNM.Network import GenericNetwork
+from OpenPNM.Base import logging, Tools
+logger = logging.getLogger(__name__)
+
+class SubNetwork(Tools.SubsetMixin,GenericNetwork):
+    r"""
+    A view of the pores of a network within a box or mask, and of the throats
+    between them, that can be used by Algorithms like any other network.
+
+    Only the topology is copied: the view stores its own 'throat.conns' in
+    local numbering, plus the numbers of its pores and throats on the parent
+    network under 'pore.<parent name>' and 'throat.<parent name>' (as in a
+    cloned simulation).  All other arrays are read from the parent at the
+    view's locations on first access and stored on the view, so the parent is
+    never changed through the view.  They are read again if the parent's
+    array changes (see ``Tools.SubsetMixin``).
+
+    Parameters
+    ----------
+    network : OpenPNM Network Object
+        The parent network
+
+    pores : array_like
+        A boolean mask or a list of the parent pores to include
+
+    box : array_like
+        The [[xmin,ymin,zmin],[xmax,ymax,zmax]] corners of a box.  The parent
+        pores inside it (including its faces) are included.  Either ``pores``
+        or ``box`` must be given.
+
+    name : string
+        A unique name for the view
+
+    Notes
+    -----
+    Use ``SubPhase`` to view the Phases of the parent on the same locations,
+    so that Algorithms can be run on the view.  The parent cannot be trimmed
+    while the view exists, and the view itself cannot be trimmed or
+    extended.  A view that is no longer needed can be removed with
+    ``Controller.purge_object(view,mode='complete')``.
+
+    Examples
+    --------
+    >>> import OpenPNM
+    >>> pn = OpenPNM.Network.Cubic(shape=[10,10,10])
+    >>> pn['pore.seed'] = sp.arange(pn.Np)*0.5
+    >>> sub = OpenPNM.Network.SubNetwork(network=pn,box=[[0,0,0],[3,3,3]])
+    >>> sub.Np
+    27
+    >>> sub['pore.seed'][0:3]
+    array([ 0. ,  0.5,  1. ])
+    >>> sub['pore.seed'][0] = 10
+    >>> pn['pore.seed'][0]
+    0.0
+    """
+
+    def __init__(self,network,pores=None,box=None,**kwargs):
+        super(SubNetwork,self).__init__(**kwargs)
+        logger.name = self.name
+        if box is not None:
+            box = sp.array(box,dtype=float)
+            coords = network['pore.coords']
+            Pmask = sp.all((coords >= box[0])*(coords <= box[1]),axis=1)
+        elif pores is not None:
+            Pmask = network.tomask(pores=network._parse_pores(pores))
+        else:
+            raise Exception('Either pores or a box must be given')
+        conns = network['throat.conns']
+        Tmask = Pmask[conns[:,0]]*Pmask[conns[:,1]]
+        Pmap = sp.where(Pmask)[0]
+        Tmap = sp.where(Tmask)[0]
+        Pinv = -sp.ones((network.Np,),dtype=self._get_dtype('index',N=sp.size(Pmap)))
+        Pinv[Pmap] = sp.arange(0,sp.size(Pmap))
+        self.update({'pore.all' : sp.ones((sp.size(Pmap),),dtype=bool)})
+        self.update({'throat.all' : sp.ones((sp.size(Tmap),),dtype=bool)})
+        self['throat.conns'] = Pinv[conns[Tmap]]
+        self['pore.'+network.name] = Pmap
+        self['throat.'+network.name] = Tmap
+        self._parent = network
+        self._set_source(network,Pmap,Tmap)
+
+    def trim(self,pores=[],throats=[],check_health=True):
+        raise Exception('A SubNetwork cannot be trimmed, create a new view instead')
+
+    def extend(self,pore_coords=[],throat_conns=[],labels=[]):
+        raise Exception('A SubNetwork cannot be extended, create a new view instead')
+
+    def reorder(self,method='rcm'):
+        raise Exception('A SubNetwork cannot be reordered')
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
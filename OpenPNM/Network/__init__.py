@@ -29,6 +29,9 @@ Classes
 .. autoclass:: MatFile
    :members:
 
+.. autoclass:: SubNetwork
+   :members:
+
 """
 
 from .__GenericNetwork__ import GenericNetwork
@@ -37,4 +40,5 @@ from .__Delaunay__ import Delaunay
 from .__DelaunayCubic__ import DelaunayCubic
 from .__MatFile__ import MatFile
 from .__TestNet__ import TestNet
+from .__SubNetwork__ import SubNetwork
 from . import models
\ No newline at end of file
@@ -73,7 +73,7 @@ class GenericPhase(Core):
         if key.split('.')[-1] == self.name:
             element = key.split('.')[0]
             return self[element+'.all']
-        if key not in self.keys():
+        if (key not in self.keys()) and (key not in self.models):
             logger.debug(key+' not on Phase, constructing data from Physics')
             return self._interleave_data(key,sources=self._physics)
         else:
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+===============================================================================
+module __SubPhase__: A view of a Phase on the locations of a SubNetwork
+===============================================================================
+
+"""
+import scipy as sp
+from OpenPNM.Phases import GenericPhase
+from OpenPNM.Base import logging, Tools
+logger = logging.getLogger(__name__)
+
+class SubPhase(Tools.SubsetMixin,GenericPhase):
+    r'''
+    A view of a Phase on the pores and throats of a SubNetwork.
+
+    Properties of the Phase, including those it gathers from its Physics,
+    are read on first access at the locations of the SubNetwork.  Values
+    written to the view, such as the results of an Algorithm, are stored on
+    the view only.
+
+    Parameters
+    ----------
+    network : OpenPNM SubNetwork object
+        The view of the network on which the Phase is presented
+
+    phase : OpenPNM Phase object
+        The Phase of the parent network
+
+    name : str, optional
+        A unique name for the view
+
+    Notes
+    -----
+    The view has no models or Physics of its own, so models should be
+    regenerated on the parent Phase before the view reads them.
+
+    Examples
+    --------
+    >>> import OpenPNM
+    >>> pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    >>> water = OpenPNM.Phases.Water(network=pn)
+    >>> sub = OpenPNM.Network.SubNetwork(network=pn,pores=pn.pores('top'))
+    >>> water_sub = OpenPNM.Phases.SubPhase(network=sub,phase=water)
+    >>> water_sub.Np
+    25
+    >>> water_sub['pore.temperature'][0]
+    298.0
+    '''
+    def __init__(self,network,phase,**kwargs):
+        super(GenericPhase,self).__init__(**kwargs)
+        logger.name = self.name
+        if phase._net is not network._parent:
+            raise Exception('The Phase must belong to the parent of the SubNetwork')
+        self._net = network
+        self['pore.all'] = network['pore.all']
+        self['throat.all'] = network['throat.all']
+        # Register the view with the SubNetwork
+        network['pore.'+self.name] = True
+        network['throat.'+self.name] = True
+        network._phases.append(self)
+        self._parent = phase
+        self._set_source(phase,network._subset_map['pore'],network._subset_map['throat'])
@@ -29,10 +29,14 @@ Classes
 .. autoclass:: Mercury
    :members:
 
+.. autoclass:: SubPhase
+   :members:
+
 """
 from .__GenericPhase__ import GenericPhase
 from .__Air__ import Air
 from .__Water__ import Water
 from .__Mercury__ import Mercury
 from .__TestPhase__ import TestPhase
+from .__SubPhase__ import SubPhase
 from . import models
\ No newline at end of file
@@ -35,6 +35,8 @@ class GenericPhysics(OpenPNM.Base.Core):
         generated that include the class name and a random string.
 
     """
+    # Float properties follow the 'float' entry of the dtype policy
+    _float_policy = True
 
     def __init__(self,network=None,phase=None,pores=[],throats=[],**kwargs):
         super(GenericPhysics,self).__init__(**kwargs)
@@ -73,7 +73,7 @@ def bulk_diffusion(physics,
     gp2[~(gp2>0)] = _sp.inf  # Set 0 conductance pores (boundaries) to inf
     #Find g for full throat
     #remove any non-positive lengths
-    tlen[tlen<=0] = 1e-12
+    tlen = _sp.where(tlen<=0,1e-12,tlen)
     gt = ct*DABt*tarea/tlen
     value = (1/gt + 1/gp1 + 1/gp2)**(-1)
     value = value[phase.throats(physics.name)]
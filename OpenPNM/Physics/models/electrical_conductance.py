@@ -51,7 +51,7 @@ def series_resistors(physics,
     tarea = network[throat_area]
     tlen = network[throat_length]
     #remove any non-positive lengths
-    tlen[tlen<=0] = 0
+    tlen = _sp.where(tlen<=0,0,tlen)
     gt = sigmat*tarea/tlen
     value = (1/gt + 1/gp1 + 1/gp2)**(-1)
     value = value[phase.throats(physics.name)]
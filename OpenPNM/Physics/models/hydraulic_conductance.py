@@ -66,7 +66,7 @@ def hagen_poiseuille(physics,
     tdia = network[throat_diameter]
     tlen = network[throat_length]
     #remove any non-positive lengths
-    tlen[tlen<=0] = 1e-12
+    tlen = _sp.where(tlen<=0,1e-12,tlen)
     gt = _sp.pi*(tdia)**4/(128*tlen*mut)
     value = (1/gt + 1/gp1 + 1/gp2)**(-1)
     value = value[phase.throats(physics.name)]
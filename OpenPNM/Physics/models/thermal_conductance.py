@@ -57,7 +57,7 @@ def series_resistors(physics,
     tarea = network[throat_area]
     tlen = network[throat_length]
     #remove any non-positive lengths
-    tlen[tlen<=0] = 1e-12
+    tlen = _sp.where(tlen<=0,1e-12,tlen)
     gt = kt*tarea/tlen
     value = (1/gt + 1/gp1 + 1/gp2)**(-1)
     value = value[phase.throats(physics.name)]
@@ -1,5 +1,4 @@
 import scipy as _sp
-import matplotlib.pylab as _plt
 
 def profiles(network,
              fig=None,
@@ -24,6 +23,7 @@ def profiles(network,
     Either propname or values can be sent, but not both
 
     '''
+    import matplotlib.pylab as _plt
     if fig is None:
         fig = _plt.figure()
     ax1 = fig.add_subplot(131)
@@ -62,6 +62,7 @@ def porosity_profile(network,
     maximum pore coordinates in each direction
 
     '''
+    import matplotlib.pylab as _plt
     if fig is None:
         fig = _plt.figure()
     L_x = _sp.amax(network['pore.coords'][:,0]) + _sp.mean(((21/88.0)*network['pore.volume'])**(1/3.0))
@@ -116,6 +117,7 @@ def saturation_profile(network, phase, fig=None, axis=2):
     axis : integer type 0 for x-axis, 1 for y-axis, 2 for z-axis
 
     '''
+    import matplotlib.pylab as _plt
     if fig is None:
         fig = _plt.figure()
     if phase is None:
@@ -188,6 +190,7 @@ def distributions(net,
     The network for which the graphs are desired
 
     """
+    import matplotlib.pylab as _plt
     if fig is None:
         fig = _plt.figure()
         
@@ -243,6 +246,7 @@ def pore_size_distribution(network, fig=None,):
     network : OpenPNM Network object
     
     '''
+    import matplotlib.pylab as _plt
     if fig is None:
         fig = _plt.figure()
     dp = network['pore.diameter']
@@ -298,6 +302,7 @@ def drainage_curves(inv_alg,
          IP algorithm at 100% completion at  0.0  seconds
     >>> OpenPNM.Postprocessing.Plots.drainage_curves(IP,timing='inv_time')
     """
+    import matplotlib.pylab as _plt
     inv_throats = inv_alg.toindices(inv_alg['throat.'+seq]>0)
     sort_seq = _sp.argsort(inv_alg['throat.'+seq][inv_throats])
     inv_throats = inv_throats[sort_seq]
@@ -6,5 +6,9 @@ r"""
 
 """
 
-from . import Plots
-from . import Graphics
\ No newline at end of file
+import sys as _sys
+from OpenPNM import _LazyModule
+
+__all__ = ['Plots','Graphics']
+
+_sys.modules[__name__].__class__ = _LazyModule
\ No newline at end of file
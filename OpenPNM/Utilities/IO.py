@@ -1,9 +1,18 @@
+import OpenPNM
 from OpenPNM.Utilities import misc
 import scipy as _sp
 import numpy as _np
 import os as _os
 import pickle as _pickle
+import base64 as _base64
+import zlib as _zlib
+import json as _json
+import struct as _struct
+import zipfile as _zipfile
+import importlib as _importlib
 from xml.etree import ElementTree as _ET
+from OpenPNM.Base import logging
+logger = logging.getLogger(__name__)
 
 
 
@@ -38,8 +47,10 @@ class VTK():
         """
         super().__init__(**kwargs)
 
+    _BLOCK_SIZE = 32768
+
     @staticmethod
-    def save(network,filename='',phases=[]):
+    def save(network,filename='',phases=[],encoding='ascii',compress=False):
         r'''
         Save network and phase data to a single vtp file for visualizing in
         Paraview
@@ -56,6 +67,26 @@ class VTK():
         phases : list, optional
             A list contain OpenPNM Phase object(s) containing data to be written
 
+        encoding : string, optional
+            How the arrays are stored in the file.  Options are:
+
+            * 'ascii' : (default) Values are written as text
+
+            * 'binary' : Values are written inline as base64 encoded binary
+
+            * 'appended' : Values are written as raw binary in a single block
+            at the end of the file.  This is the fastest and most compact.
+
+        compress : boolean, optional
+            If True the binary data is compressed with zlib.  This is ignored
+            when ``encoding`` is 'ascii'.
+
+        Notes
+        -----
+        The binary encodings write each array straight from memory to the file
+        so no text conversion is needed.  With ``encoding='appended'`` and no
+        compression the arrays are streamed to the file one at a time.
+
         Examples
         --------
         >>> import OpenPNM
@@ -66,10 +97,16 @@ class VTK():
 
         >>> import OpenPNM.Utilities.IO as io
         >>> io.VTK.save(pn,'test_pn.vtp',[air])
+        >>> io.VTK.save(pn,'test_pn_bin.vtp',[air],encoding='appended',compress=True)
+        >>> net = io.VTK.load('test_pn_bin.vtp')
+        >>> import scipy as sp
+        >>> sp.all(net['throat.conns'] == pn['throat.conns'])
+        True
 
-        >>> # Delete the new file
+        >>> # Delete the new files
         >>> import os
         >>> os.remove('test_pn.vtp')
+        >>> os.remove('test_pn_bin.vtp')
         '''
 
         if filename == '':
@@ -91,6 +128,27 @@ class VTK():
         num_points = len(points)
         num_throats = len(pairs)
 
+        if encoding in ['binary','appended']:
+            point_data = []
+            cell_data = []
+            for key in key_list:
+                array = am[key]
+                if array.dtype == _np.bool: array = array.astype(_np.uint8)
+                if array.size == num_points:
+                    point_data.append((key,array))
+                elif array.size == num_throats:
+                    cell_data.append((key,array))
+            VTK._write_binary(filename=filename,
+                              points=points,
+                              pairs=pairs,
+                              point_data=point_data,
+                              cell_data=cell_data,
+                              encoding=encoding,
+                              compress=compress)
+            return
+        elif encoding != 'ascii':
+            raise Exception('Unrecognized encoding: '+encoding)
+
         piece_node = root.find('PolyData').find('Piece')
         piece_node.set("NumberOfPoints", str(num_points))
         piece_node.set("NumberOfLines", str(num_throats))
@@ -135,62 +193,215 @@ class VTK():
     @staticmethod
     def load(filename):
         r'''
-        Read in pore and throat data from a saved VTK file.
+        Read in pore and throat data from a saved VTK file.  Files written with
+        any of the encodings supported by ``save`` can be read.
 
         Notes
         -----
         This will NOT reproduce original simulation, since all models and object
-        relationships are lost.  Use IO.Save and IO.Load for that.'''
-        network = OpenPNM.Network.GenericNetwork()
-        tree = _ET.parse(filename)
-        piece_node = tree.find('PolyData').find('Piece')
+        relationships are lost.  Use IO.Save and IO.Load for that.
 
-        # extract connectivity
-        conn_element = piece_node.find('Lines').find('DataArray')
-        array = VTK._element_to_array(conn_element, 2)
-        network['throat.conns'] = array.T
+        Arrays are stored on the returned Network under the names used in the
+        file, so they include the name of the object they came from.  Labels
+        are returned as integers.'''
+        with open(filename,'rb') as f:
+            data = f.read()
+        #Separate raw appended data from the XML, which it would invalidate
+        appended = None
+        i = data.find(b'<AppendedData')
+        if i >= 0:
+            start = data.index(b'_',i) + 1
+            appended = memoryview(data)[start:]
+            data = data[:i] + b'</VTKFile>'
+        root = _ET.fromstring(data)
+        header_type = root.get('header_type','UInt32')
+        compressed = root.get('compressor') is not None
+        piece_node = root.find('PolyData').find('Piece')
+
+        def read(element,n=1):
+            return VTK._element_to_array(element,n=n,
+                                         header_type=header_type,
+                                         compressed=compressed,
+                                         appended=appended)
+
+        network = OpenPNM.Network.GenericNetwork()
+        # extract coordinates and connectivity
+        coords = read(piece_node.find('Points').find('DataArray'),3)
+        network['pore.coords'] = coords
+        network['pore.all'] = _np.ones((_np.shape(coords)[0],),dtype=bool)
+        for element in piece_node.find('Lines').iter('DataArray'):
+            if element.get('Name') == 'connectivity':
+                array = read(element,2)
+        network['throat.conns'] = array
+        network['throat.all'] = _np.ones((_np.shape(array)[0],),dtype=bool)
 
-        for element in piece_node.find('PointData').iter('DataArray'):
-            key = element.get('Name')
-            array = VTK._element_to_array(element)
-            netname = key.split('.')[0]
-            propname = key.strip(netname+'.')
-            network[propname] = array
+        for node in ['PointData','CellData']:
+            for element in piece_node.find(node).iter('DataArray'):
+                key = element.get('Name')
+                if key in network.keys():
+                    continue
+                network[key] = read(element)
 
         return network
 
+    @staticmethod
+    def _write_binary(filename,points,pairs,point_data,cell_data,encoding,compress):
+        r'''
+        Writes the vtp file with binary arrays, either inline in base64 or raw
+        in an appended data block.
+        '''
+        arrays = [('coords',points,3)]
+        conns = _np.ascontiguousarray(pairs)
+        offsets = 2*_np.arange(1,len(pairs)+1,dtype=conns.dtype)
+        arrays += [('connectivity',conns,1),('offsets',offsets,1)]
+        arrays += [(key,array,1) for key,array in point_data+cell_data]
+        #Compressed sizes must be known before the header can be written
+        if compress:
+            blocks = [VTK._compress(VTK._to_bytes(array)) for name,array,n in arrays]
+
+        head = '<?xml version="1.0" ?>\n'
+        head += '<VTKFile byte_order="LittleEndian" header_type="UInt64" type="PolyData" version="1.0"'
+        if compress:
+            head += ' compressor="vtkZLibDataCompressor"'
+        head += '>\n<PolyData>\n'
+        head += '<Piece NumberOfLines="'+str(len(pairs))+'" NumberOfPoints="'+str(len(points))+'">\n'
+        offset = 0
+        sections = [('Points',0,1),('Lines',1,3),('PointData',3,3+len(point_data)),('CellData',3+len(point_data),len(arrays))]
+        for section,a,b in sections:
+            head += '<'+section+'>\n'
+            for i in range(a,b):
+                name,array,n = arrays[i]
+                element = _ET.Element('DataArray')
+                element.set('Name',name)
+                element.set('NumberOfComponents',str(n))
+                element.set('type',VTK._dtype_map[str(array.dtype)])
+                if encoding == 'appended':
+                    element.set('format','appended')
+                    element.set('offset',str(offset))
+                    if compress:
+                        header,pieces = blocks[i]
+                        offset += len(header) + sum([len(item) for item in pieces])
+                    else:
+                        offset += 8 + array.size*array.dtype.itemsize
+                else:
+                    element.set('format','binary')
+                    if compress:
+                        header,pieces = blocks[i]
+                        element.text = (_base64.b64encode(header)+_base64.b64encode(b''.join(pieces))).decode()
+                    else:
+                        data = VTK._to_bytes(array)
+                        header = _np.array([data.size],dtype='<u8').tobytes()
+                        element.text = _base64.b64encode(header+data.tobytes()).decode()
+                head += _ET.tostring(element).decode()+'\n'
+            head += '</'+section+'>\n'
+        head += '</Piece>\n</PolyData>\n'
+
+        with open(filename,'wb') as f:
+            f.write(head.encode())
+            if encoding == 'appended':
+                f.write(b'<AppendedData encoding="raw">\n_')
+                for i in range(len(arrays)):
+                    if compress:
+                        header,pieces = blocks[i]
+                        f.write(header)
+                        for item in pieces:
+                            f.write(item)
+                    else:
+                        data = VTK._to_bytes(arrays[i][1])
+                        f.write(_np.array([data.size],dtype='<u8').tobytes())
+                        f.write(data)
+                f.write(b'\n</AppendedData>\n')
+            f.write(b'</VTKFile>\n')
+
+    @staticmethod
+    def _compress(block):
+        r'''
+        Splits a block of bytes into pieces and compresses each, returning the
+        VTK compression header and the list of compressed pieces.
+        '''
+        size = VTK._BLOCK_SIZE
+        pieces = [_zlib.compress(block[i:i+size].tobytes()) for i in range(0,block.size,size)]
+        header = [len(pieces),size,block.size % size] + [len(item) for item in pieces]
+        return (_np.array(header,dtype='<u8').tobytes(),pieces)
+
+    @staticmethod
+    def _to_bytes(array):
+        r'''
+        Returns a flat uint8 view of the array in little endian order, which
+        only copies the data if it is not already contiguous.
+        '''
+        array = _np.ascontiguousarray(array,dtype=array.dtype.newbyteorder('<'))
+        return array.reshape(-1).view(_np.uint8)
+
+    _dtype_map = {
+        'int8'   : 'Int8',
+        'int16'  : 'Int16',
+        'int32'  : 'Int32',
+        'int64'  : 'Int64',
+        'uint8'  : 'UInt8',
+        'uint16' : 'UInt16',
+        'uint32' : 'UInt32',
+        'uint64' : 'UInt64',
+        'float32': 'Float32',
+        'float64': 'Float64',
+        'str'    : 'String',
+    }
+
     @staticmethod
     def _array_to_element(name, array, n=1):
-        dtype_map = {
-            'int8'   : 'Int8',
-            'int16'  : 'Int16',
-            'int32'  : 'Int32',
-            'int64'  : 'Int64',
-            'uint8'  : 'UInt8',
-            'uint16' : 'UInt16',
-            'uint32' : 'UInt32',
-            'uint64' : 'UInt64',
-            'float32': 'Float32',
-            'float64': 'Float64',
-            'str'    : 'String',
-        }
         element = _ET.Element('DataArray')
         element.set("Name", name)
         element.set("NumberOfComponents", str(n))
-        element.set("type", dtype_map[str(array.dtype)])
+        element.set("type", VTK._dtype_map[str(array.dtype)])
         element.text = '\t'.join(map(str,array.ravel()))
         return element
 
     @staticmethod
-    def _element_to_array(element, n=1):
-        string = element.text
-        dtype = element.get("type")
-        array = _np.fromstring(string, sep='\t')
-        array = array.astype(dtype)
+    def _element_to_array(element, n=1, header_type='UInt32', compressed=False, appended=None):
+        dtype = _np.dtype(element.get("type").lower()).newbyteorder('<')
+        fmt = element.get('format','ascii')
+        if fmt == 'ascii':
+            string = element.text
+            array = _np.fromstring(string, sep='\t')
+            array = array.astype(dtype)
+        else:
+            htype = _np.dtype(header_type.lower()).newbyteorder('<')
+            if fmt == 'appended':
+                raw = appended[int(element.get('offset')):]
+            else:
+                raw = element.text.strip().encode()
+            array = VTK._decode(raw,dtype,htype,compressed,fmt == 'binary')
         if n is not 1:
             array = array.reshape(array.size//n, n)
         return array
 
+    @staticmethod
+    def _decode(raw,dtype,htype,compressed,b64):
+        r'''
+        Decodes a binary VTK data array, with or without base64 encoding and
+        zlib compression.
+        '''
+        hsize = htype.itemsize
+        if not compressed:
+            if b64:
+                raw = _base64.b64decode(raw)
+            nbytes = int(_np.frombuffer(raw[:hsize],dtype=htype)[0])
+            return _np.frombuffer(raw[hsize:hsize+nbytes],dtype=dtype).copy()
+        #The header of compressed data holds the number of blocks first
+        if b64:
+            nblocks = int(_np.frombuffer(_base64.b64decode(raw[:4*((hsize+2)//3)])[:hsize],dtype=htype)[0])
+            hlen = 4*((hsize*(3+nblocks)+2)//3)
+            header = _np.frombuffer(_base64.b64decode(raw[:hlen]),dtype=htype)
+            raw = _base64.b64decode(raw[hlen:])
+        else:
+            nblocks = int(_np.frombuffer(raw[:hsize],dtype=htype)[0])
+            header = _np.frombuffer(raw[:hsize*(3+nblocks)],dtype=htype)
+            raw = raw[hsize*(3+nblocks):]
+        sizes = header[3:].astype(int)
+        starts = _np.concatenate(([0],_np.cumsum(sizes)))
+        data = b''.join([_zlib.decompress(raw[starts[i]:starts[i+1]]) for i in range(nblocks)])
+        return _np.frombuffer(data,dtype=dtype).copy()
+
 class MAT():
     r'''
     Class for reading and writing OpenPNM data to a Matlab 'mat' file
@@ -264,11 +475,895 @@ class MAT():
         _sp.io.savemat(file_name=filename,mdict=pnMatlab)
 
     @staticmethod
-    def load():
+    def load(filename):
+        r'''
+        Read a Mat file written by ``save`` back into a Network and Phases
+
+        Parameters
+        ----------
+        filename : string
+            The name of the Mat file
+
+        Returns
+        -------
+        A GenericNetwork object with the saved network data.  A GenericPhase is
+        created on this network for each phase found in the file.
+
+        Notes
+        -----
+        Only the data is restored; models and the Geometry and Physics objects
+        are not saved in Mat files.  Phases keep their saved names unless an
+        object of that name already exists.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> air = OpenPNM.Phases.TestPhase(network=pn)
+        >>> import OpenPNM.Utilities.IO as io
+        >>> io.MAT.save(network=pn,filename='test_pn.mat',phases=air)
+        >>> net = io.MAT.load('test_pn.mat')
+        >>> net.num_pores() == pn.num_pores()
+        True
+        >>> phase = net.phases(net.phases())[0]
+        >>> import scipy as sp
+        >>> sp.all(net['throat.conns'] == pn['throat.conns'])
+        True
+        >>> sp.all(phase['pore.temperature'] == air['pore.temperature'])
+        True
+        >>> import os
+        >>> os.remove('test_pn.mat')
+        '''
+        info = {}
+        for name,shape,mclass in _sp.io.whosmat(filename):
+            info[name] = mclass
+        data = _sp.io.loadmat(filename)
+        network = OpenPNM.Network.GenericNetwork()
+        Np = _np.shape(data['pore_coords'])[0]
+        Nt = _np.shape(data['throat_conns'])[0]
+        network['pore.all'] = _np.ones((Np,),dtype=bool)
+        network['throat.all'] = _np.ones((Nt,),dtype=bool)
+        phases = {}
+        for name in sorted(info.keys()):
+            array = data[name]
+            for element,N in [('pore',Np),('throat',Nt)]:
+                if name.startswith(element+'_'):
+                    obj = None
+                    key = element+'.'+name[len(element)+1:]
+                    break
+                i = name.find('_'+element+'_')
+                if i > 0:
+                    obj = name[:i]
+                    key = element+'.'+name[i+len(element)+2:]
+                    break
+            else:
+                logger.warning('Could not determine where to store '+name)
+                continue
+            if key in ['pore.all','throat.all']:
+                continue
+            if (_np.ndim(array) == 2) and (_np.size(array) == N) and (1 in _np.shape(array)):
+                array = _np.ravel(array)
+            if info[name] == 'logical':
+                array = array.astype(bool)
+            if obj is None:
+                network[key] = array
+                continue
+            if obj not in phases.keys():
+                if obj in network._ctrl.keys():
+                    logger.warning('An object named '+obj+' already exists, so the phase will be renamed')
+                    phases[obj] = OpenPNM.Phases.GenericPhase(network=network)
+                else:
+                    phases[obj] = OpenPNM.Phases.GenericPhase(network=network,name=obj)
+            phases[obj][key] = array
+        return network
+
+class Text():
+    r'''
+    Class for importing networks from whitespace delimited node and link text
+    files, such as those produced by network extraction codes
+
+    The files are parsed in blocks with NumPy, so no Python objects are created
+    per line, and each column is written straight into the array that stores
+    it.  If the 'memmap' storage backend is active (see
+    ``Controller.storage``) these arrays are memory mapped files, so the data
+    never has to fit in memory at once.
+    '''
+
+    def __init__(self,**kwargs):
+        r"""
+        Initialize
+        """
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def load(node_file,link_file,node_columns=['x','y','z'],link_columns=['pore1','pore2'],
+             skiprows=0,index_base=0,chunk_size=2**24,storage=None):
+        r'''
+        Read a network from a node file and a link file
+
+        Parameters
+        ----------
+        node_file : string
+            Name of the file with one row per pore
+
+        link_file : string
+            Name of the file with one row per throat
+
+        node_columns : list of strings
+            The name of each column in the node file.  The columns named 'x',
+            'y' and 'z' are stored as 'pore.coords' and all others are stored
+            as pore properties, so 'radius' becomes 'pore.radius'.  Columns
+            named None or '' are skipped.
+
+        link_columns : list of strings
+            The name of each column in the link file.  The columns named
+            'pore1' and 'pore2' are stored as 'throat.conns' and all others as
+            throat properties.
+
+        skiprows : int or list of 2 ints, optional
+            The number of header lines to skip in each file (default is 0)
+
+        index_base : int, optional
+            The number of the first pore in the link file, for instance 1 for
+            files written by Matlab or Fortran codes (default is 0)
+
+        chunk_size : int, optional
+            The number of bytes parsed at once
+
+        storage : dict, optional
+            Storage settings for the new network, as accepted by the
+            ``storage`` attribute, for instance {'backend':'memmap'}
+
+        Returns
+        -------
+        A GenericNetwork object.  It has no Geometry, so geometries can be
+        added for any subset of the imported pores and throats.
+
+        Notes
+        -----
+        Links that refer to pores outside the node file, which some extraction
+        codes use to mark inlet and outlet boundaries, are skipped with a
+        warning.
+
+        Examples
+        --------
+        >>> import OpenPNM.Utilities.IO as io
+        >>> with open('test_nodes.txt','w') as f:
+        ...     n = f.write('0 0 0 1.5\n1 0 0 2.5\n2 0 0 1.0\n')
+        >>> with open('test_links.txt','w') as f:
+        ...     n = f.write('1 2 0.5\n2 3 0.25\n')
+        >>> pn = io.Text.load('test_nodes.txt','test_links.txt',
+        ...                   node_columns=['x','y','z','radius'],
+        ...                   link_columns=['pore1','pore2','radius'],
+        ...                   index_base=1)
+        >>> pn.num_pores(), pn.num_throats()
+        (3, 2)
+        >>> print(pn['throat.conns'])
+        [[0 1]
+         [1 2]]
+        >>> pn['pore.radius']
+        array([ 1.5,  2.5,  1. ])
+        >>> import os
+        >>> os.remove('test_nodes.txt')
+        >>> os.remove('test_links.txt')
+        '''
+        if _sp.size(skiprows) == 1:
+            skiprows = [skiprows,skiprows]
+        network = OpenPNM.Network.GenericNetwork()
+        if storage is not None:
+            network.storage = storage
+        # Read nodes
+        Np = Text._count_rows(node_file,skiprows[0],chunk_size)
+        coords = network._allocate('pore.coords',(Np,3),_np.float64)
+        props = {}
+        for name in node_columns:
+            if name not in ['x','y','z',None,'']:
+                props['pore.'+name] = network._allocate('pore.'+name,(Np,),_np.float64)
+        n = 0
+        for rows in Text._read_rows(node_file,len(node_columns),skiprows[0],chunk_size):
+            for i,name in enumerate(node_columns):
+                if name in ['x','y','z']:
+                    coords[n:n+len(rows),'xyz'.index(name)] = rows[:,i]
+                elif name not in [None,'']:
+                    props['pore.'+name][n:n+len(rows)] = rows[:,i]
+            n += len(rows)
+        if n < Np:
+            coords = coords[:n]
+            for key in props.keys():
+                props[key] = props[key][:n]
+            Np = n
+        # Read links
+        Nt = Text._count_rows(link_file,skiprows[1],chunk_size)
+        conns = network._allocate('throat.conns',(Nt,2),network._get_dtype('index',Np))
+        tprops = {}
+        for name in link_columns:
+            if name not in ['pore1','pore2',None,'']:
+                tprops['throat.'+name] = network._allocate('throat.'+name,(Nt,),_np.float64)
+        n = 0
+        dropped = 0
+        for rows in Text._read_rows(link_file,len(link_columns),skiprows[1],chunk_size):
+            P1 = rows[:,link_columns.index('pore1')] - index_base
+            P2 = rows[:,link_columns.index('pore2')] - index_base
+            keep = (P1 >= 0)*(P1 < Np)*(P2 >= 0)*(P2 < Np)
+            m = _np.sum(keep)
+            dropped += len(rows) - m
+            conns[n:n+m,0] = _np.minimum(P1[keep],P2[keep])
+            conns[n:n+m,1] = _np.maximum(P1[keep],P2[keep])
+            for i,name in enumerate(link_columns):
+                if 'throat.'+str(name) in tprops.keys():
+                    tprops['throat.'+name][n:n+m] = rows[keep,i]
+            n += m
+        if dropped > 0:
+            logger.warning(str(dropped)+' links to pores outside the node file were skipped')
+        if n < Nt:
+            conns = conns[:n]
+            for key in tprops.keys():
+                tprops[key] = tprops[key][:n]
+            Nt = n
+        network['pore.coords'] = coords
+        network['pore.all'] = _np.ones((Np,),dtype=bool)
+        network['throat.conns'] = conns
+        network['throat.all'] = _np.ones((Nt,),dtype=bool)
+        for key in sorted(props.keys()):
+            network[key] = props[key]
+        for key in sorted(tprops.keys()):
+            network[key] = tprops[key]
+        return network
+
+    @staticmethod
+    def _count_rows(filename,skiprows,chunk_size):
+        r'''
+        Counts the lines after the header, which is an upper bound on the rows
+        '''
+        count = 0
+        last = b'\n'
+        with open(filename,'rb') as f:
+            for i in range(skiprows):
+                f.readline()
+            block = f.read(chunk_size)
+            while block:
+                count += block.count(b'\n')
+                last = block[-1:]
+                block = f.read(chunk_size)
+        if last != b'\n':
+            count += 1
+        return count
+
+    @staticmethod
+    def _read_rows(filename,ncols,skiprows,chunk_size):
+        r'''
+        Yields the rows of a file as 2D arrays, parsing a block of complete
+        lines at a time
+        '''
+        tail = b''
+        with open(filename,'rb') as f:
+            for i in range(skiprows):
+                f.readline()
+            while True:
+                block = f.read(chunk_size)
+                if not block:
+                    break
+                block = tail + block
+                end = block.rfind(b'\n') + 1
+                tail = block[end:]
+                if end > 0:
+                    yield Text._parse(block[:end],ncols,filename)
+        if tail.strip():
+            yield Text._parse(tail,ncols,filename)
+
+    @staticmethod
+    def _parse(block,ncols,filename):
+        values = _np.fromstring(block,dtype=_np.float64,sep=' ')
+        if _np.size(values) % ncols != 0:
+            raise Exception('The rows of '+filename+' do not all have '+str(ncols)+' columns')
+        return values.reshape(-1,ncols)
+
+class Columnar():
+    r'''
+    Class for saving and loading a complete simulation in a columnar format,
+    where each pore and throat array of each object is stored as a separate
+    dataset alongside a small JSON document describing the objects, their
+    associations, labels and models.
+
+    Two file formats are supported:
+
+    * 'npz' : A zip archive of 'npy' files plus 'metadata.json'.  Uncompressed
+    archives can be memory mapped.
+
+    * 'hdf5' : An HDF5 file with one group per object.  Compression uses gzip
+    on chunked datasets.  This requires the h5py package.
+
+    Notes
+    -----
+    Models are stored as the import path of the model function and its
+    arguments, so custom models must be importable when the file is loaded.
+    Object attributes that cannot be represented in JSON or as arrays (such
+    as cached sparse matrices) are not saved.
+    '''
+
+    def __init__(self,**kwargs):
+        r"""
+        Initialize
+        """
+        super().__init__(**kwargs)
+
+    _SKIP = ['_ctrl','models','_versions','_interleave_cache','_name']
+
+    @staticmethod
+    def save(objs,filename,fileformat='npz',compress=False):
+        r'''
+        Write a list of OpenPNM objects to a columnar file
+
+        Parameters
+        ----------
+        objs : list of OpenPNM objects
+            The objects to save, usually all the objects in the Controller
+
+        filename : string
+            The file name.  The extension is set by the file format.
+
+        fileformat : string, optional
+            Either 'npz' (default) or 'hdf5'
+
+        compress : boolean, optional
+            If True the datasets are compressed, which prevents them from being
+            memory mapped when loaded.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> import OpenPNM.Utilities.IO as io
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> geo = OpenPNM.Geometry.TestGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+        >>> io.Columnar.save([pn,geo],'test_columnar')
+        >>> objs = io.Columnar.load('test_columnar.npz',props=['pore.seed'],lazy=True)
+        >>> sorted(objs[geo.name].props())
+        ['pore.seed']
+        >>> import os
+        >>> os.remove('test_columnar.npz')
+        '''
+        names = [obj.name for obj in objs]
+        meta = {'version' : OpenPNM.__version__, 'objects' : [], 'pickled' : []}
+        arrays = []
+        for obj in objs:
+            info = {'name'   : obj.name,
+                    'module' : obj.__class__.__module__,
+                    'class'  : obj.__class__.__name__,
+                    'labels' : [],
+                    'uniform' : [],
+                    'arrays' : [],
+                    'attrs'  : {},
+                    'array_attrs' : [],
+                    'models' : []}
+            for key in sorted(dict.keys(obj)):
+                value = dict.__getitem__(obj,key)
+                if value.dtype == bool:
+                    info['labels'].append(key)
+                if (type(value) is OpenPNM.Base.Tools.UniformArray) and value._is_uniform():
+                    info['uniform'].append(key)
+                    value = _np.array([value.value])
+                info['arrays'].append(key)
+                arrays.append((obj.name+'/'+key,value))
+            for attr in sorted(obj.__dict__.keys()):
+                if attr in Columnar._SKIP:
+                    continue
+                value = obj.__dict__[attr]
+                if isinstance(value,_np.ndarray):
+                    info['array_attrs'].append(attr)
+                    arrays.append((obj.name+'/_attrs/'+attr,value))
+                    continue
+                value = Columnar._encode_attr(value,names)
+                if value is not None:
+                    info['attrs'][attr] = value
+                else:
+                    logger.info('Attribute '+attr+' of '+obj.name+' could not be saved')
+            for propname in obj.models.keys():
+                model = dict(obj.models[propname])
+                f = model.pop('model')
+                kwargs = {}
+                for item in model.keys():
+                    try:
+                        _json.dumps(model[item])
+                        kwargs[item] = model[item]
+                    except TypeError:
+                        logger.warning('Argument '+item+' of model '+propname+' on '+obj.name+' could not be saved')
+                info['models'].append({'propname' : propname,
+                                       'module' : f.__module__,
+                                       'function' : f.__name__,
+                                       'kwargs' : kwargs})
+            meta['objects'].append(info)
+        #Object arrays have no columnar representation so they are pickled
+        for i,(path,array) in enumerate(arrays):
+            if array.dtype.hasobject:
+                meta['pickled'].append(path)
+                arrays[i] = (path,_np.frombuffer(_pickle.dumps(array),dtype=_np.uint8))
+        meta = _json.dumps(meta).encode()
+        filename = filename.rsplit('.',1)[0] if filename.endswith('.'+fileformat) else filename
+        filename = filename+'.'+fileformat
+        #Write to a temporary file first since arrays loaded lazily from an
+        #existing file would be invalidated if it were truncated in place
+        if fileformat == 'npz':
+            Columnar._write_npz(filename+'.tmp',meta,arrays,compress)
+        elif fileformat == 'hdf5':
+            Columnar._write_hdf5(filename+'.tmp',meta,arrays,compress)
+        else:
+            raise Exception('Unrecognized file format: '+fileformat)
+        _os.replace(filename+'.tmp',filename)
+
+    @staticmethod
+    def load(filename,props=None,lazy=False,controller=None):
+        r'''
+        Read OpenPNM objects from a columnar file
+
+        Parameters
+        ----------
+        filename : string
+            The file to read, with either an 'npz' or 'hdf5' extension.
+
+        props : list of strings, optional
+            The properties to read, such as 'pore.diameter'.  If not given all
+            properties are read.  Labels, 'coords' and 'conns' are always read.
+
+        lazy : boolean, optional
+            If True, uncompressed datasets are memory mapped instead of read,
+            so only the parts of the arrays that are actually used are read
+            from disk.  The mapped arrays can be written to, but changes are
+            not written back to the file.
+
+        controller : OpenPNM Controller, optional
+            The Controller with which to register the loaded objects.  If not
+            given the objects are not registered.
+
+        Returns
+        -------
+        A dictionary of the loaded objects keyed by name.
+        '''
+        ext = filename.rsplit('.',1)[-1]
+        if ext == 'npz':
+            reader = Columnar._read_npz(filename,lazy)
+        elif ext in ['hdf5','h5']:
+            reader = Columnar._read_hdf5(filename,lazy)
+        else:
+            raise Exception('Unrecognized file extension: '+ext)
+        meta = _json.loads(bytes(next(reader)).decode())
+        infos = meta['objects']
+        #Determine which datasets are needed
+        paths = []
+        for info in infos:
+            for key in info['arrays']:
+                if (props is None) or (key in info['labels']) or (key in props) \
+                        or (key.split('.')[-1] in ['all','coords','conns']):
+                    paths.append(info['name']+'/'+key)
+            for attr in info['array_attrs']:
+                paths.append(info['name']+'/_attrs/'+attr)
+        data = reader.send(paths)
+        reader.close()
+        for path in meta['pickled']:
+            if path in data.keys():
+                data[path] = _pickle.loads(_np.asarray(data[path]).tobytes())
+        #Create the objects without running their constructors
+        objs = {}
+        for info in infos:
+            cls = getattr(_importlib.import_module(info['module']),info['class'])
+            obj = cls.__new__(cls)
+            obj._name = info['name']
+            objs[info['name']] = obj
+        for info in infos:
+            obj = objs[info['name']]
+            for attr in info['attrs'].keys():
+                obj.__dict__[attr] = Columnar._decode_attr(info['attrs'][attr],objs)
+            for attr in info['array_attrs']:
+                obj.__dict__[attr] = data[info['name']+'/_attrs/'+attr]
+            for key in info['arrays']:
+                path = info['name']+'/'+key
+                if path not in data.keys():
+                    continue
+                value = data[path]
+                if key in info['uniform']:
+                    count = _np.shape(data[info['name']+'/'+key.split('.')[0]+'.all'])[0]
+                    value = OpenPNM.Base.Tools.UniformArray(value[0],(count,))
+                dict.__setitem__(obj,key,value)
+            for model in info['models']:
+                f = getattr(_importlib.import_module(model['module']),model['function'])
+                obj.models[model['propname']] = dict(model=f,**model['kwargs'])
+        if controller is not None:
+            for obj in objs.values():
+                obj._ctrl = controller
+                dict.__setitem__(controller,obj.name,obj)
+        return objs
+
+    @staticmethod
+    def _encode_attr(value,names):
+        if hasattr(value,'name') and (getattr(value,'name',None) in names) and isinstance(value,dict):
+            return {'__ref__' : value.name}
+        if type(value) in [list,tuple]:
+            temp = []
+            for item in value:
+                if isinstance(item,dict) and hasattr(item,'name') and (item.name not in names):
+                    continue  # Drop associations with objects that are not saved
+                item = Columnar._encode_attr(item,names)
+                if item is None:
+                    return None
+                temp.append(item)
+            return {'__list__' : temp}
+        try:
+            _json.dumps(value)
+            return {'__value__' : value}
+        except TypeError:
+            if type(value) is dict:
+                #Unserializable dicts hold cached objects that are rebuilt
+                return {'__value__' : {}}
+            return None
+
+    @staticmethod
+    def _decode_attr(value,objs):
+        if value is None:
+            return None
+        if '__ref__' in value.keys():
+            return objs.get(value['__ref__'])
+        if '__list__' in value.keys():
+            return [Columnar._decode_attr(item,objs) for item in value['__list__']]
+        return value['__value__']
+
+    @staticmethod
+    def _write_npz(filename,meta,arrays,compress):
+        if compress:
+            compression = _zipfile.ZIP_DEFLATED
+        else:
+            compression = _zipfile.ZIP_STORED
+        with _zipfile.ZipFile(filename,'w',compression=compression,allowZip64=True) as zf:
+            zf.writestr('metadata.json',meta)
+            for path,array in arrays:
+                with zf.open(path+'.npy','w',force_zip64=True) as fh:
+                    _np.lib.format.write_array(fh,_np.asanyarray(array).view(_np.ndarray),allow_pickle=False)
+
+    @staticmethod
+    def _read_npz(filename,lazy):
+        r'''
+        A generator that first yields the metadata, then receives the list of
+        dataset paths to read and yields a dictionary of arrays.
+        '''
+        with _zipfile.ZipFile(filename,'r') as zf:
+            paths = yield zf.read('metadata.json')
+            data = {}
+            for path in paths:
+                zinfo = zf.getinfo(path+'.npy')
+                array = None
+                if lazy and (zinfo.compress_type == _zipfile.ZIP_STORED):
+                    array = Columnar._map_npy(filename,zinfo.header_offset)
+                if array is None:
+                    with zf.open(zinfo) as fh:
+                        array = _np.lib.format.read_array(fh,allow_pickle=False)
+                data[path] = array
+            yield data
+
+    @staticmethod
+    def _map_npy(filename,header_offset):
+        r'''
+        Memory maps an uncompressed 'npy' member of a zip archive, given the
+        offset of its local file header.  Returns None if it cannot be mapped.
+        '''
+        with open(filename,'rb') as fh:
+            fh.seek(header_offset)
+            local = fh.read(30)
+            n,m = _struct.unpack('<HH',local[26:30])
+            fh.seek(header_offset+30+n+m)
+            version = _np.lib.format.read_magic(fh)
+            if version == (1,0):
+                shape,fortran,dtype = _np.lib.format.read_array_header_1_0(fh)
+            else:
+                shape,fortran,dtype = _np.lib.format.read_array_header_2_0(fh)
+            offset = fh.tell()
+        if dtype.hasobject or (_np.prod(shape) == 0):
+            return None
+        order = 'F' if fortran else 'C'
+        return _np.memmap(filename,dtype=dtype,mode='c',shape=shape,order=order,offset=offset)
+
+    @staticmethod
+    def _write_hdf5(filename,meta,arrays,compress):
+        try:
+            import h5py
+        except ImportError:
+            raise Exception('The hdf5 format requires the h5py package')
+        with h5py.File(filename,'w') as f:
+            f.create_dataset('metadata',data=_np.frombuffer(meta,dtype=_np.uint8))
+            for path,array in arrays:
+                array = _np.asanyarray(array).view(_np.ndarray)
+                if compress and (array.size > 0):
+                    f.create_dataset(path,data=array,chunks=True,compression='gzip')
+                else:
+                    f.create_dataset(path,data=array)
+
+    @staticmethod
+    def _read_hdf5(filename,lazy):
+        try:
+            import h5py
+        except ImportError:
+            raise Exception('The hdf5 format requires the h5py package')
+        with h5py.File(filename,'r') as f:
+            paths = yield f['metadata'][...].tobytes()
+            data = {}
+            for path in paths:
+                ds = f[path]
+                array = None
+                if lazy and (ds.chunks is None) and (ds.size > 0):
+                    offset = ds.id.get_offset()
+                    if offset is not None:
+                        array = _np.memmap(filename,dtype=ds.dtype,mode='c',shape=ds.shape,offset=offset)
+                if array is None:
+                    array = ds[...]
+                data[path] = array
+            yield data
+
+
+class XDMF():
+    r'''
+    Class for writing a time series of pore and throat data to an XDMF index
+    with the arrays stored in a separate data file, for animating in ParaView
+
+    The network topology and any static properties are written once and every
+    frame refers to them, so each frame only stores the arrays that change.
+
+    Parameters
+    ----------
+    network : OpenPNM Network Object
+        The Network whose topology is written
+
+    filename : string, optional
+        Name of the XDMF index file.  The data file has the same name with the
+        '.h5' or '.bin' extension.  If no name is given the files are named
+        after the network.
+
+    fileformat : string, optional
+        How the arrays are stored.  Options are:
+
+        * 'hdf5' : (default) One dataset per array in an HDF5 file.  This
+        requires the h5py package.
+
+        * 'binary' : Raw arrays appended to a single binary file.  This needs
+        no extra packages.
+
+    static : list of strings, optional
+        Network properties that are written once and shown in every frame,
+        such as ['pore.diameter']
+
+    Notes
+    -----
+    The index is rewritten after each frame so it is valid even if a long
+    run is interrupted.  Call ``close`` when all frames have been added.
+
+    Examples
+    --------
+    >>> import OpenPNM
+    >>> import OpenPNM.Utilities.IO as io
+    >>> pn = OpenPNM.Network.TestNet()
+    >>> xdmf = io.XDMF(pn,'test_series',fileformat='binary')
+    >>> for t in range(3):
+    ...     xdmf.add_frame(time=t,data={'pore.value' : pn['pore.coords'][:,0]*t})
+    >>> xdmf.close()
+    >>> import os
+    >>> os.remove('test_series.xmf')
+    >>> os.remove('test_series.bin')
+    '''
+
+    def __init__(self,network,filename='',fileformat='hdf5',static=[]):
+        r"""
+        Initialize
+        """
+        super().__init__()
+        if filename == '':
+            filename = network.name
+        self._name = filename.split('.')[0]
+        self._fileformat = fileformat
+        if fileformat == 'hdf5':
+            try:
+                import h5py
+            except ImportError:
+                raise Exception('The hdf5 format requires the h5py package')
+            self._datafile = self._name+'.h5'
+            self._file = h5py.File(self._datafile,'w')
+        elif fileformat == 'binary':
+            self._datafile = self._name+'.bin'
+            self._file = open(self._datafile,'wb')
+        else:
+            raise Exception('Unrecognized file format: '+fileformat)
+        self._Nt = network.num_throats()
+        self._geometry = self._write('/static/coords',network['pore.coords'])
+        self._topology = self._write('/static/conns',network['throat.conns'])
+        self._static = []
+        for key in static:
+            element = key.split('.')[0]
+            name = element+'.'+network.name+'_'+key.split('.')[1]
+            self._static.append(self._attribute('/static/'+name,name,network[key]))
+        self._frames = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def add_frame(self,time,objs=[],props=None,data={}):
+        r'''
+        Append one frame to the time series
+
+        Parameters
+        ----------
+        time : float
+            The time (or step) of the frame, used by ParaView's time controls
+
+        objs : list of OpenPNM objects, optional
+            Objects whose pore and throat properties are written
+
+        props : list of strings, optional
+            The properties to write from each object, such as
+            ['pore.occupancy','throat.occupancy'].  If not given all
+            properties of the objects are written.
+
+        data : dict, optional
+            Additional arrays to write, keyed by 'pore.name' or 'throat.name'.
+            These can be computed for the frame without being stored on any
+            object.
+        '''
+        if type(objs) != list:
+            objs = [objs]
+        frame = len(self._frames)
+        arrays = []
+        for obj in objs:
+            keys = props
+            if keys is None:
+                keys = obj.props()
+            for key in keys:
+                try:
+                    array = obj[key]
+                except KeyError:
+                    continue
+                element = key.split('.')[0]
+                arrays.append((element+'.'+obj.name+'_'+key.split('.')[1],array))
+        for key in sorted(data.keys()):
+            arrays.append((key,data[key]))
+        attrs = []
+        for name,array in arrays:
+            path = '/frame_'+str(frame)+'/'+name
+            attrs.append(self._attribute(path,name,array))
+        self._frames.append((time,attrs))
+        self._file.flush()
+        self._write_index()
+
+    def close(self):
+        r'''
+        Close the data file
+        '''
+        self._file.close()
+
+    @staticmethod
+    def save_invasion(network,algorithm,filename='',frames=10,fileformat='hdf5',static=[]):
+        r'''
+        Write the invasion sequence of a percolation algorithm as a time series
+
+        Parameters
+        ----------
+        network : OpenPNM Network Object
+            The Network on which the algorithm was run
+
+        algorithm : OpenPNM Algorithm Object
+            An algorithm with 'pore.inv_seq' and 'throat.inv_seq' arrays, such
+            as InvasionPercolation or OrdinaryPercolation
+
+        filename : string, optional
+            Name of the XDMF index file
+
+        frames : int or list of ints, optional
+            The number of equally spaced frames (default is 10), or a list of
+            the invasion sequence numbers to write
+
+        fileformat : string, optional
+            Either 'hdf5' (default) or 'binary'
+
+        static : list of strings, optional
+            Network properties written once, such as ['pore.diameter']
+
+        Notes
+        -----
+        The occupancy of each frame is computed from the invasion sequence as
+        the frame is written, so it is never stored on the algorithm or the
+        phases.  The time of each frame is its sequence number.
+
+        Examples
+        --------
+        >>> import OpenPNM
+        >>> import OpenPNM.Utilities.IO as io
+        >>> pn = OpenPNM.Network.TestNet()
+        >>> geo = OpenPNM.Geometry.TestGeometry(network=pn,pores=pn.pores(),throats=pn.throats())
+        >>> phase1 = OpenPNM.Phases.TestPhase(network=pn)
+        >>> phase2 = OpenPNM.Phases.TestPhase(network=pn)
+        >>> phys1 = OpenPNM.Physics.TestPhysics(network=pn, phase=phase1,pores=pn.pores(),throats=pn.throats())
+        >>> IP = OpenPNM.Algorithms.InvasionPercolation(network=pn)
+        >>> IP.run(invading_phase=phase1, defending_phase=phase2, inlets=pn.pores('top'), outlets=pn.pores('bottom'), report=0) # doctest: +ELLIPSIS
+             IP algorithm at 0 % completion at ... seconds
+             IP algorithm at 100% completion at  ...  seconds
+        >>> io.XDMF.save_invasion(pn,IP,'test_invasion',frames=5,fileformat='binary')
+        >>> import os
+        >>> os.remove('test_invasion.xmf')
+        >>> os.remove('test_invasion.bin')
+        '''
+        p_seq = algorithm['pore.inv_seq']
+        t_seq = algorithm['throat.inv_seq']
+        if _sp.size(frames) == 1:
+            last = max(_sp.amax(p_seq),_sp.amax(t_seq))
+            frames = _sp.unique(_sp.ceil(_sp.linspace(0,last,int(frames)+1)[1:]))
+        if filename == '':
+            filename = algorithm.name
+        p_name = 'pore.'+algorithm.name+'_occupancy'
+        t_name = 'throat.'+algorithm.name+'_occupancy'
+        with XDMF(network,filename,fileformat=fileformat,static=static) as xdmf:
+            for seq in frames:
+                data = {p_name : (p_seq > 0)*(p_seq <= seq),
+                        t_name : (t_seq > 0)*(t_seq <= seq)}
+                xdmf.add_frame(time=seq,data=data)
+
+    def _write(self,path,array):
+        r'''
+        Write an array to the data file and return the DataItem referring to it
+        '''
+        array = _np.ascontiguousarray(array)
+        if array.dtype == _np.bool:
+            array = array.astype(_np.uint8)
+        if array.dtype.kind not in 'fiu':
+            raise Exception('Arrays of type '+str(array.dtype)+' cannot be written')
+        array = array.astype(array.dtype.newbyteorder('<'),copy=False)
+        kind = {'f':'Float','i':'Int','u':'UInt'}[array.dtype.kind]
+        if array.dtype.itemsize == 1:
+            kind = {'i':'Char','u':'UChar'}[array.dtype.kind]
+        item = '<DataItem Dimensions="'+' '.join([str(i) for i in array.shape])+'" '
+        item += 'NumberType="'+kind+'" Precision="'+str(array.dtype.itemsize)+'" '
+        datafile = _os.path.basename(self._datafile)
+        if self._fileformat == 'hdf5':
+            self._file.create_dataset(path,data=array)
+            item += 'Format="HDF">'+datafile+':'+path+'</DataItem>'
+        else:
+            item += 'Format="Binary" Endian="Little" Seek="'+str(self._file.tell())+'">'
+            item += datafile+'</DataItem>'
+            self._file.write(array.tobytes())
+        return item
+
+    def _attribute(self,path,name,array):
+        r'''
+        Write an array and return the Attribute element describing it
+        '''
+        center = {'pore':'Node','throat':'Cell'}[name.split('.')[0]]
+        kind = 'Scalar'
+        if _sp.ndim(array) == 2 and _sp.shape(array)[1] == 3:
+            kind = 'Vector'
+        elif _sp.ndim(array) != 1:
+            raise Exception('Only scalar and vector properties can be written: '+name)
+        attr = '<Attribute Name="'+name+'" AttributeType="'+kind+'" Center="'+center+'">'
+        return attr+self._write(path,array)+'</Attribute>'
+
+    def _write_index(self):
         r'''
-        This method is not implemented yet.
+        Rewrite the XDMF index so it lists all frames written so far
         '''
-        raise NotImplemented()
+        lines = ['<?xml version="1.0" ?>',
+                 '<Xdmf Version="2.0">',
+                 '  <Domain>',
+                 '    <Grid Name="'+self._name+'" GridType="Collection" CollectionType="Temporal">']
+        for time,attrs in self._frames:
+            lines.append('      <Grid GridType="Uniform">')
+            lines.append('        <Time Value="'+str(time)+'"/>')
+            lines.append('        <Topology TopologyType="Polyline" NodesPerElement="2" NumberOfElements="'+str(self._Nt)+'">')
+            lines.append('          '+self._topology)
+            lines.append('        </Topology>')
+            lines.append('        <Geometry GeometryType="XYZ">')
+            lines.append('          '+self._geometry)
+            lines.append('        </Geometry>')
+            for attr in self._static+attrs:
+                lines.append('        '+attr)
+            lines.append('      </Grid>')
+        lines += ['    </Grid>','  </Domain>','</Xdmf>']
+        with open(self._name+'.xmf.tmp','w') as f:
+            f.write('\n'.join(lines)+'\n')
+        _os.replace(self._name+'.xmf.tmp',self._name+'.xmf')
 
 
 if __name__ == '__main__':
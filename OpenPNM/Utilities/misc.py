@@ -221,3 +221,100 @@ def conduit_lengths(network,throats=None,mode='pore'):
 
     return _sp.vstack((plen1,network['throat.length'],plen2)).T[throats]
 
+
+def _quantize(coords,bits):
+    r'''
+    Scales coordinates onto an integer grid with 2**bits cells along the
+    longest axis
+    '''
+    coords = _sp.array(coords,ndmin=2,dtype=float)
+    coords = coords - _sp.amin(coords,axis=0)
+    span = _sp.amax(coords)
+    if span > 0:
+        coords = coords*((2**bits - 1)/span)
+    return coords.astype(_sp.uint64)
+
+def _interleave_bits(X,bits):
+    key = _sp.zeros((_sp.shape(X)[0],),dtype=_sp.uint64)
+    one = _sp.uint64(1)
+    for b in range(bits-1,-1,-1):
+        for i in range(_sp.shape(X)[1]):
+            key = (key << one) | ((X[:,i] >> _sp.uint64(b)) & one)
+    return key
+
+def morton_keys(coords,bits=21):
+    r'''
+    Returns the position of each point along a Morton (Z-order) curve
+
+    Parameters
+    ----------
+    coords : array_like
+        An Np x ndims array of [x,y,z] coordinates
+
+    bits : int
+        The number of bits used per dimension, at most 64/ndims
+
+    Returns
+    -------
+    An Np long array of unsigned integer keys.  Sorting the points by their
+    keys places points that are close in space close together in the list.
+
+    Examples
+    --------
+    >>> import OpenPNM.Utilities.misc as misc
+    >>> misc.morton_keys([[0,0,0],[1,1,1],[1,0,0]],bits=1)
+    array([0, 7, 4], dtype=uint64)
+    '''
+    return _interleave_bits(_quantize(coords,bits),bits)
+
+def hilbert_keys(coords,bits=21):
+    r'''
+    Returns the position of each point along a Hilbert curve
+
+    Parameters
+    ----------
+    coords : array_like
+        An Np x ndims array of [x,y,z] coordinates
+
+    bits : int
+        The number of bits used per dimension, at most 64/ndims
+
+    Returns
+    -------
+    An Np long array of unsigned integer keys.  Unlike the Morton curve,
+    consecutive keys are always adjacent in space.
+
+    Notes
+    -----
+    This uses the algorithm of J. Skilling (AIP Conf. Proc. 707, 381 (2004)),
+    applied to all points at once one bit at a time.
+
+    Examples
+    --------
+    >>> import OpenPNM.Utilities.misc as misc
+    >>> misc.hilbert_keys([[0,0],[0,1],[1,1],[1,0]],bits=1)
+    array([0, 1, 2, 3], dtype=uint64)
+    '''
+    X = _quantize(coords,bits)
+    n = _sp.shape(X)[1]
+    zero = _sp.uint64(0)
+    # Inverse undo
+    Q = 2**(bits-1)
+    while Q > 1:
+        P = _sp.uint64(Q - 1)
+        for i in range(n):
+            flip = (X[:,i] & _sp.uint64(Q)) != 0
+            t = _sp.where(flip,zero,(X[:,0] ^ X[:,i]) & P)
+            X[:,0] ^= _sp.where(flip,P,zero) ^ t
+            X[:,i] ^= t
+        Q = Q >> 1
+    # Gray encode
+    for i in range(1,n):
+        X[:,i] ^= X[:,i-1]
+    t = _sp.zeros((_sp.shape(X)[0],),dtype=_sp.uint64)
+    Q = 2**(bits-1)
+    while Q > 1:
+        t ^= _sp.where((X[:,n-1] & _sp.uint64(Q)) != 0,_sp.uint64(Q-1),zero)
+        Q = Q >> 1
+    X ^= t[:,None]
+    return _interleave_bits(X,bits)
@@ -35,6 +35,9 @@ Import
 
 """
 
+import sys as _sys
+import types as _types
+import importlib as _importlib
 import scipy as sp
 
 if sp.__version__ < '0.14.0':
@@ -44,13 +47,24 @@ __version__ = '1.1-beta'
 
 __requires__ = ['scipy']
 
-from . import Base
-from . import Utilities
-from . import Network
-from . import Geometry
-from . import Phases
-from . import Physics
-from . import Algorithms
-from . import Postprocessing
+__all__ = ['Base','Utilities','Network','Geometry','Phases','Physics',
+           'Algorithms','Postprocessing']
+
+class _LazyModule(_types.ModuleType):
+    r'''
+    Module type for packages whose subpackages are only imported when they are
+    first accessed as attributes, so ``import OpenPNM`` does not load the
+    whole package and its optional dependencies.  The subpackages are listed
+    in the package's ``__all__``.
+    '''
+    def __getattr__(self,name):
+        if name in self.__dict__.get('__all__',[]):
+            return _importlib.import_module('.'+name,self.__name__)
+        raise AttributeError('module '+self.__name__+' has no attribute '+name)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self.__dict__.get('__all__',[])))
+
+_sys.modules[__name__].__class__ = _LazyModule
 
 
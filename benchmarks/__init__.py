@@ -0,0 +1,48 @@
+r"""
+###############################################################################
+:mod:`benchmarks` -- Timing and memory benchmarks for OpenPNM
+###############################################################################
+
+The benchmarks follow the layout used by airspeed velocity (asv): each class
+has a ``setup`` method and one or more ``time_`` methods, and is parametrized
+by the number of pores through its ``params`` attribute.  They can be run with
+``asv run``, or without any extra packages using the runner in this package:
+
+    python -m benchmarks.run [pattern] [--sizes 1000,10000] [--save out.json]
+
+The runner executes each benchmark in a fresh process and reports its best
+time and the peak memory used above the memory of the bare interpreter.
+
+"""
+import os as _os
+
+SIZES = [10**3,10**4,10**5,10**6]
+
+
+def sizes(largest=10**6):
+    r'''
+    Returns the network sizes to benchmark, up to ``largest`` pores.  The
+    sizes can be restricted with the OPENPNM_BENCH_SIZES environment variable,
+    a comma separated list of numbers of pores.
+    '''
+    temp = SIZES
+    if 'OPENPNM_BENCH_SIZES' in _os.environ:
+        temp = [int(float(N)) for N in _os.environ['OPENPNM_BENCH_SIZES'].split(',')]
+    return [N for N in temp if N <= largest]
+
+
+def cubic_shape(N):
+    r'''
+    Returns the shape of the cubic network with closest to ``N`` pores
+    '''
+    n = int(round(N**(1/3.0)))
+    return [n,n,n]
+
+
+def clear():
+    r'''
+    Removes all objects from the Controller so repeated setups do not
+    accumulate memory
+    '''
+    import OpenPNM
+    OpenPNM.Base.Controller().clear()
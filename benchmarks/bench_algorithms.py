@@ -0,0 +1,66 @@
+r"""
+===============================================================================
+bench_algorithms -- Linear transport and percolation algorithms
+===============================================================================
+
+"""
+import OpenPNM
+from benchmarks import sizes, cubic_shape, clear
+
+
+def _simulation(N):
+    pn = OpenPNM.Network.Cubic(shape=cubic_shape(N))
+    geo = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    air = OpenPNM.Phases.Air(network=pn)
+    water = OpenPNM.Phases.Water(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=water,pores=pn.Ps,throats=pn.Ts)
+    return pn,air,water
+
+
+class LinearTransport:
+    params = [sizes()]
+    param_names = ['pores']
+
+    def setup(self,N):
+        clear()
+        self.pn,self.air,self.water = _simulation(N)
+        self.alg = OpenPNM.Algorithms.StokesFlow(network=self.pn,phase=self.water)
+        self.alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=1,pores=self.pn.pores('top'))
+        self.alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=0,pores=self.pn.pores('bottom'))
+
+    def time_assemble(self,N):
+        self.alg.setup()
+
+    def time_assemble_and_solve(self,N):
+        self.alg.run()
+
+
+class OrdinaryPercolation:
+    params = [sizes()]
+    param_names = ['pores']
+
+    def setup(self,N):
+        clear()
+        self.pn,self.air,self.water = _simulation(N)
+        self.alg = OpenPNM.Algorithms.OrdinaryPercolation(network=self.pn,
+                                                          invading_phase=self.water,
+                                                          defending_phase=self.air)
+
+    def time_run(self,N):
+        self.alg.run(inlets=self.pn.pores('top'),npts=25)
+
+
+class InvasionPercolation:
+    params = [sizes(10**5)]
+    param_names = ['pores']
+    timeout = 600
+
+    def setup(self,N):
+        clear()
+        self.pn,self.air,self.water = _simulation(N)
+        self.alg = OpenPNM.Algorithms.InvasionPercolation(network=self.pn)
+
+    def time_run(self,N):
+        self.alg.run(invading_phase=self.water,defending_phase=self.air,
+                     inlets=self.pn.pores('top'),outlets=self.pn.pores('bottom'),
+                     report=0)
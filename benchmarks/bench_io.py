@@ -0,0 +1,39 @@
+r"""
+===============================================================================
+bench_io -- Export of networks and phases to VTK and Matlab files
+===============================================================================
+
+"""
+import os
+import shutil
+import tempfile
+import OpenPNM
+import OpenPNM.Utilities.IO as io
+from benchmarks import sizes, cubic_shape, clear
+
+
+class Export:
+    params = [sizes()]
+    param_names = ['pores']
+
+    def setup(self,N):
+        clear()
+        self.pn = OpenPNM.Network.Cubic(shape=cubic_shape(N))
+        self.geo = OpenPNM.Geometry.Stick_and_Ball(network=self.pn,
+                                                   pores=self.pn.Ps,
+                                                   throats=self.pn.Ts)
+        self.air = OpenPNM.Phases.Air(network=self.pn)
+        self.path = tempfile.mkdtemp()
+
+    def teardown(self,N):
+        shutil.rmtree(self.path)
+
+    def time_vtk_ascii(self,N):
+        io.VTK.save(self.pn,os.path.join(self.path,'net.vtp'),[self.air])
+
+    def time_vtk_appended(self,N):
+        io.VTK.save(self.pn,os.path.join(self.path,'net.vtp'),[self.air],
+                    encoding='appended')
+
+    def time_mat(self,N):
+        io.MAT.save(self.pn,os.path.join(self.path,'net.mat'),[self.air])
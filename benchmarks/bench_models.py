@@ -0,0 +1,43 @@
+r"""
+===============================================================================
+bench_models -- Construction and regeneration of Geometry and Physics models
+===============================================================================
+
+"""
+import OpenPNM
+from benchmarks import sizes, cubic_shape, clear
+
+
+class StickAndBall:
+    params = [sizes()]
+    param_names = ['pores']
+
+    def setup(self,N):
+        clear()
+        self.pn = OpenPNM.Network.Cubic(shape=cubic_shape(N))
+        self.geo = OpenPNM.Geometry.Stick_and_Ball(network=self.pn,
+                                                   pores=self.pn.Ps,
+                                                   throats=self.pn.Ts)
+
+    def time_regenerate(self,N):
+        self.geo.models.regenerate()
+
+
+class Standard:
+    params = [sizes()]
+    param_names = ['pores']
+
+    def setup(self,N):
+        clear()
+        self.pn = OpenPNM.Network.Cubic(shape=cubic_shape(N))
+        self.geo = OpenPNM.Geometry.Stick_and_Ball(network=self.pn,
+                                                   pores=self.pn.Ps,
+                                                   throats=self.pn.Ts)
+        self.water = OpenPNM.Phases.Water(network=self.pn)
+        self.phys = OpenPNM.Physics.Standard(network=self.pn,
+                                             phase=self.water,
+                                             pores=self.pn.Ps,
+                                             throats=self.pn.Ts)
+
+    def time_regenerate(self,N):
+        self.phys.models.regenerate()
@@ -0,0 +1,85 @@
+r"""
+===============================================================================
+bench_network -- Network generation, queries and topology changes
+===============================================================================
+
+"""
+import scipy as sp
+import OpenPNM
+from benchmarks import sizes, cubic_shape, clear
+
+
+class CubicGeneration:
+    params = [sizes()]
+    param_names = ['pores']
+
+    def setup(self,N):
+        clear()
+
+    def time_cubic(self,N):
+        OpenPNM.Network.Cubic(shape=cubic_shape(N))
+
+
+class DelaunayGeneration:
+    params = [sizes(10**5)]
+    param_names = ['pores']
+    timeout = 600
+
+    def setup(self,N):
+        clear()
+
+    def time_delaunay(self,N):
+        OpenPNM.Network.Delaunay(num_pores=N,domain_size=[1,1,1])
+
+
+class Queries:
+    params = [sizes()]
+    param_names = ['pores']
+
+    def setup(self,N):
+        clear()
+        self.pn = OpenPNM.Network.Cubic(shape=cubic_shape(N))
+        self.Ps = self.pn.pores('top')
+        self.half = sp.arange(0,self.pn.Np,2)
+
+    def time_pores_union(self,N):
+        self.pn.pores(['top','left','front'],mode='union')
+
+    def time_pores_intersection(self,N):
+        self.pn.pores(['top','left'],mode='intersection')
+
+    def time_labels(self,N):
+        self.pn.labels(pores=self.Ps)
+
+    def time_find_neighbor_pores(self,N):
+        self.pn.find_neighbor_pores(pores=self.half)
+
+    def time_find_neighbor_throats(self,N):
+        self.pn.find_neighbor_throats(pores=self.half)
+
+    def time_num_neighbors(self,N):
+        self.pn.num_neighbors(pores=self.half)
+
+    def time_find_connected_pores(self,N):
+        self.pn.find_connected_pores(throats=self.pn.Ts)
+
+
+class TrimExtend:
+    params = [sizes()]
+    param_names = ['pores']
+
+    def setup(self,N):
+        clear()
+        self.pn = OpenPNM.Network.Cubic(shape=cubic_shape(N))
+        sp.random.seed(0)
+        self.Ps = sp.where(sp.rand(self.pn.Np) < 0.1)[0]
+        Np = self.pn.Np
+        M = int(Np/10)
+        self.coords = sp.rand(M,3)
+        self.conns = sp.vstack((sp.arange(Np,Np+M),sp.random.randint(0,Np,M))).T
+
+    def time_trim(self,N):
+        self.pn.trim(pores=self.Ps)
+
+    def time_extend(self,N):
+        self.pn.extend(pore_coords=self.coords,throat_conns=self.conns)
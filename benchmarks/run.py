@@ -0,0 +1,184 @@
+r"""
+===============================================================================
+run -- Run the benchmarks without asv and report time and peak memory
+===============================================================================
+
+Usage::
+
+    python -m benchmarks.run [pattern] [--sizes 1000,10000] [--repeat 3]
+                             [--timeout 600] [--save out.json]
+                             [--compare old.json]
+
+Only benchmarks whose name contains ``pattern`` are run.  By default the two
+smallest sizes are used; pass ``--sizes all`` for every size up to 10^6 pores.
+Each benchmark runs in a new process, in which the OpenPNM subpackages are
+imported before timing starts.  The time reported is the best of ``repeat``
+runs, with ``setup`` called before each run and excluded from the time.  The
+peak memory is the largest increase of the process' resident memory during a
+run, measured after ``setup``.
+
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import importlib
+import multiprocessing
+
+MODULES = ['bench_network','bench_models','bench_algorithms','bench_io']
+
+
+def discover(pattern=''):
+    r'''
+    Returns a list of (module, class, method, size) tuples for all benchmarks
+    whose name contains ``pattern``
+    '''
+    found = []
+    for name in MODULES:
+        module = importlib.import_module('benchmarks.'+name)
+        for cls_name in sorted(vars(module)):
+            cls = getattr(module,cls_name)
+            if (not isinstance(cls,type)) or (cls.__module__ != module.__name__):
+                continue
+            for method in sorted(vars(cls)):
+                if not method.startswith('time_'):
+                    continue
+                label = name+'.'+cls_name+'.'+method
+                if pattern not in label:
+                    continue
+                for N in cls.params[0]:
+                    found.append((name,cls_name,method,N))
+    return found
+
+
+def _status(field):
+    # Reads a memory field of /proc/self/status in megabytes
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field+':'):
+                return int(line.split()[1])/1024.0
+    raise OSError(field+' not found')
+
+
+def _reset_peak():
+    r'''
+    Resets the peak memory counter of this process and returns the current
+    memory use in MB.  On Linux this resets VmHWM, the peak resident set size,
+    so whole process memory is measured.  Elsewhere tracemalloc is used, which
+    only sees the memory allocated through Python.
+    '''
+    try:
+        with open('/proc/self/clear_refs','w') as f:
+            f.write('5')
+        return _status('VmRSS')
+    except (OSError,IOError):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.clear_traces()
+        return 0.0
+
+
+def _peak():
+    # Peak memory in MB since the last call of _reset_peak
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1]/1024.0**2
+    return _status('VmHWM')
+
+
+def _run_one(name,cls_name,method,N,repeat,queue):
+    module = importlib.import_module('benchmarks.'+name)
+    # Import the subpackages now so the first repeat does not time the import
+    import OpenPNM
+    for item in OpenPNM.__all__:
+        importlib.import_module('OpenPNM.'+item)
+    obj = getattr(module,cls_name)()
+    times = []
+    peak = 0.0
+    for i in range(repeat):
+        obj.setup(N)
+        base = _reset_peak()
+        t = time.perf_counter()
+        getattr(obj,method)(N)
+        times.append(time.perf_counter()-t)
+        peak = max(peak,_peak()-base)
+        if hasattr(obj,'teardown'):
+            obj.teardown(N)
+    queue.put((min(times),peak))
+
+
+def run(benchmarks,repeat=3,timeout=600,report=None):
+    r'''
+    Runs each benchmark in a new process and returns a list of results.
+    ``report`` is called with each result as it is finished.
+    '''
+    if report is None:
+        report = lambda result: print(_format(result))
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for name,cls_name,method,N in benchmarks:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_one,args=(name,cls_name,method,N,repeat,queue))
+        proc.start()
+        proc.join(timeout)
+        timed_out = proc.is_alive()
+        if timed_out:
+            proc.terminate()
+            proc.join()
+        result = {'name' : name+'.'+cls_name+'.'+method, 'pores' : N,
+                  'time' : None, 'peak_mb' : None}
+        if not queue.empty():
+            result['time'],result['peak_mb'] = queue.get()
+        elif timed_out:
+            result['error'] = 'timeout'
+        else:
+            result['error'] = 'failed'
+        results.append(result)
+        report(result)
+    return results
+
+
+def _format(result,old=None):
+    line = '{:<60} {:>9}'.format(result['name'],result['pores'])
+    if result['time'] is None:
+        return line+'  '+result.get('error','failed')
+    line += ' {:>10.4f} s {:>9.1f} MB'.format(result['time'],result['peak_mb'])
+    if (old is not None) and (old.get('time') is not None):
+        ratio = result['time']/old['time']
+        line += ' {:>6.2f}x'.format(ratio)
+        if ratio > 1.2:
+            line += ' slower'
+        elif ratio < 1/1.2:
+            line += ' faster'
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the OpenPNM benchmarks')
+    parser.add_argument('pattern',nargs='?',default='')
+    parser.add_argument('--sizes',default='1000,10000')
+    parser.add_argument('--repeat',type=int,default=3)
+    parser.add_argument('--timeout',type=float,default=600)
+    parser.add_argument('--save',default=None)
+    parser.add_argument('--compare',default=None)
+    args = parser.parse_args(argv)
+    benchmarks = discover(args.pattern)
+    if args.sizes != 'all':
+        keep = [int(float(N)) for N in args.sizes.split(',')]
+        benchmarks = [item for item in benchmarks if item[3] in keep]
+    old = {}
+    if args.compare is not None:
+        with open(args.compare) as f:
+            for item in json.load(f):
+                old[(item['name'],item['pores'])] = item
+    print('{:<60} {:>9} {:>12} {:>12}'.format('benchmark','pores','time','peak memory'))
+    results = run(benchmarks,repeat=args.repeat,timeout=args.timeout,
+                  report=lambda result: print(_format(result,old.get((result['name'],result['pores'])))))
+    if args.save is not None:
+        with open(args.save,'w') as f:
+            json.dump(results,f,indent=1)
+    return results
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -3,7 +3,7 @@ import scipy as sp
 import OpenPNM
 import pytest
 
-def test_controller():
+def test_controller(tmpdir):
     # The following tests check if the Controller's ghost, save, load and clear methods work
     ctrl = OpenPNM.Base.Controller()
     ctrl.clear()  # Clear controller to make sure it has not lingering objects
@@ -17,12 +17,13 @@ def test_controller():
     loc3 = geom2.__repr__()
     assert geom.__repr__() == loc1  # Ensure geom is still same object
     assert loc3 != loc1  # Ensure identities are not getting swapped
-    ctrl.save('test_net')  # Save current state
+    filename = str(tmpdir.join('test_net'))
+    ctrl.save(filename)  # Save current state
     ctrl.clear()  # Clear Controller
     assert ctrl.keys() == {}.keys()  # Empty dict
     assert pn.controller == {}  # Controller is now an empty dict
     assert geom.controller == pn.controller  # Both have empty dict's
-    ctrl.load('test_net')  # Load saved state
+    ctrl.load(filename)  # Load saved state
     assert pn.name in ctrl.keys()  # Ensure loaded objects match originals
     assert geom.name in ctrl.keys()
     pn2 = ctrl[pn.name]  # Retrieve loaded Network from the Controller dict
@@ -304,5 +305,924 @@ def test_mapping():
     b = pn.map_throats(throats=a,target=geom3)
     assert(sp.all(b == geom3.Ts))
 
+def test_on_access_models():
+    pn = OpenPNM.Network.Cubic(shape=[3,3,3])
+    geom = OpenPNM.Geometry.GenericGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+    geom['pore.diameter'] = 1.0
+    calls = []
+    def area(geometry,pore_diameter='pore.diameter',**kwargs):
+        calls.append(pore_diameter)
+        return geometry[pore_diameter]**2
+    geom.models.add(propname='pore.area',model=area,regen_mode='on_access')
+    assert 'pore.area' not in geom.keys()  # Not computed until read
+    assert geom['pore.area'][0] == 1
+    geom['pore.area']
+    assert len(calls) == 1  # Second read is served from the memoized result
+    geom['pore.diameter'] = 2.0
+    assert pn['pore.area'][0] == 4  # Stale inputs trigger a recalculation
+    assert len(calls) == 2
+    geom.models.regenerate()  # Bulk regeneration skips 'on_access' models
+    assert len(calls) == 2
+
+def test_on_access_models_in_place_writes():
+    pn = OpenPNM.Network.Cubic(shape=[3,3,3])
+    geom = OpenPNM.Geometry.GenericGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+    geom['pore.diameter'] = sp.ones(geom.Np)
+    geom.models.add(propname='pore.volume',
+                    model=OpenPNM.Geometry.models.pore_volume.sphere,
+                    regen_mode='on_access')
+    assert sp.allclose(geom['pore.volume'],sp.pi/6)
+    geom['pore.diameter'][:] = 2.0  # The input is read-only until written
+    assert sp.allclose(geom['pore.volume'],sp.pi/6*8)
+    diameter = geom['pore.diameter']
+    diameter[0] = 1.0
+    assert sp.allclose(geom['pore.volume'][0],sp.pi/6)
+    assert sp.allclose(geom['pore.volume'][1:],sp.pi/6*8)
+    diameter[1] = 1.0  # Later writes through a held array are seen as well
+    assert sp.allclose(geom['pore.volume'][1],sp.pi/6)
+    # A cached read only compares versions, it does not touch the inputs
+    model = geom.models['pore.volume']
+    assert all([len(item) == 3 for item in model._memo_key])
+    stored = dict.__getitem__(geom,'pore.diameter')
+    dict.__setitem__(geom,'pore.diameter',None)
+    assert sp.allclose(geom['pore.volume'][1],sp.pi/6)
+    dict.__setitem__(geom,'pore.diameter',stored)
+
+def test_model_profiling(tmpdir):
+    ctrl = OpenPNM.Base.Controller()
+    ctrl.profiling = True
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    geom = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    geom.models.regenerate()
+    ctrl.profiling = False
+    table = geom.models.profile()
+    assert table['pore.diameter']['calls'] == 2
+    assert table['pore.diameter']['nbytes'] == pn.Np*8
+    assert table['pore.diameter']['total_time'] >= table['pore.diameter']['last_time']
+    geom.models.regenerate()  # No statistics are collected when disabled
+    assert geom.models.profile()['pore.diameter']['calls'] == 2
+    filename = str(tmpdir.join('test_profile.json'))
+    report = ctrl.profile_report(filename=filename)
+    assert geom.name+':pore.diameter' in report.keys()
+    import json
+    with open(filename) as f:
+        assert json.load(f)[geom.name+':pore.diameter']['calls'] == 2
+
+def test_interleave_data():
+    pn = OpenPNM.Network.Cubic(shape=[3,3,3])
+    Ps = pn.pores('top',mode='not')
+    Ts = pn.find_neighbor_throats(pores=Ps,mode='intersection')
+    geo1 = OpenPNM.Geometry.GenericGeometry(network=pn,pores=Ps,throats=Ts)
+    Ps = pn.pores('top')
+    Ts = pn.find_neighbor_throats(pores=Ps)
+    geo2 = OpenPNM.Geometry.GenericGeometry(network=pn,pores=Ps,throats=Ts)
+    geo1['pore.diameter'] = 1.0
+    geo2['pore.diameter'] = 3.0
+    assert pn['pore.diameter'].sum() == 18*1.0 + 9*3.0
+    assert pn['pore.diameter'] is pn['pore.diameter']  # The array is cached
+    geo1['pore.diameter'][:] = 5.0  # In-place writes to a source are seen
+    assert pn['pore.diameter'].sum() == 18*5.0 + 9*3.0
+    diameter = geo2['pore.diameter']
+    diameter[0] = 4.0
+    assert pn['pore.diameter'].sum() == 18*5.0 + 8*3.0 + 4.0
+    diameter[1] = 4.0  # Including later writes through a held array
+    assert pn['pore.diameter'].sum() == 18*5.0 + 7*3.0 + 2*4.0
+    a = pn['pore.diameter']
+    a[0] = 0.0  # The assembled array is a writable copy
+    assert geo1['pore.diameter'][0] == 5.0
+    assert pn['pore.diameter'] is not a
+    assert pn['pore.diameter'][0] == 5.0
+    air = OpenPNM.Phases.Air(network=pn)
+    phys = OpenPNM.Physics.GenericPhysics(network=pn,phase=air,pores=pn.pores(),throats=pn.throats())
+    phys['throat.conductance'] = sp.rand(pn.Nt)
+    g = air['throat.conductance']
+    assert g is phys['throat.conductance']  # A single source is not copied
+    g[0] = 1.0
+    assert phys['throat.conductance'][0] == 1.0
+    phys['throat.conductance'] = 2.0
+    assert sp.all(air['throat.conductance'] == 2.0)
+
+def test_uniform_arrays():
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    pn['pore.uniform'] = 298.0
+    assert dict.__getitem__(pn,'pore.uniform').strides == (0,)
+    a = pn['pore.uniform']
+    assert sp.all(a == 298.0)
+    assert sp.shape(a) == (pn.Np,)
+    # Reading, by a model or otherwise, does not expand the array
+    water = OpenPNM.Phases.Water(network=pn)
+    assert sp.all(water['pore.density'] > 0)
+    assert dict.__getitem__(water,'pore.temperature')._is_uniform()
+    assert a.strides == (0,)
+    pn['pore.uniform'][pn.pores('top')] = 350.0
+    b = pn['pore.uniform']
+    assert sp.all(a == b)  # The array read earlier was expanded in place
+    assert b.flags.writeable
+    assert sp.sum(b == 350.0) == pn.num_pores('top')
+    # Arrays held across an in-place write stay current
+    pn['pore.held'] = 1.0
+    c = pn['pore.held']
+    c[0] = 2.0
+    assert c[0] == 2.0
+    assert pn['pore.held'][0] == 2.0
+    assert c.sum() == pn.Np + 1
+    pn['pore.fill'] = 1.0
+    pn['pore.fill'].fill(3.0)
+    assert sp.all(pn['pore.fill'] == 3.0)
+    pn['pore.out'] = 1.0
+    d = pn['pore.out']
+    with pytest.raises(ValueError):
+        sp.add(d,1.0,out=d)  # Numpy checks out= before the array can expand
+    d[0] = 1.0
+    sp.add(d,1.0,out=d)
+    assert sp.all(pn['pore.out'] == 2.0)
+    # Slices held across the first write see the expanded values
+    pn['pore.slice'] = 1.0
+    e = pn['pore.slice']
+    f = e[1:4]
+    e[2] = 5.0
+    assert sp.all(f == [1.0,5.0,1.0])
+    f[0] = 3.0
+    assert e[1] == 3.0
+    # Extending the network does not expand uniform arrays either
+    pn['pore.label'] = False
+    pn.extend(pore_coords=[[10,10,10]])
+    assert dict.__getitem__(pn,'pore.label')._is_uniform()
+    assert sp.all(water['pore.temperature'][:-1] == 298.0)
+    assert sp.isnan(water['pore.temperature'][-1])
+    vals = sp.rand(pn.Np)
+    pn['pore.vector'] = vals
+    assert pn['pore.vector'] is vals
+    pn['pore.copy'] = pn['pore.vector'][pn.pores()]
+    assert pn['pore.copy'] is not vals
+
+def test_setitem_does_not_alias_stored_arrays():
+    pn = OpenPNM.Network.Cubic(shape=[3,3,3])
+    assert not np.shares_memory(pn['pore.internal'],pn['pore.all'])
+    pn['pore.internal'][0] = False
+    assert pn['pore.all'][0]
+    water = OpenPNM.Phases.Water(network=pn)
+    assert not np.shares_memory(water['pore.all'],pn['pore.all'])
+    vals = sp.rand(pn.Np)
+    pn['pore.a'] = vals
+    assert pn['pore.a'] is vals  # New arrays are still stored without copying
+    pn['pore.b'] = pn['pore.a']
+    water['pore.c'] = pn['pore.a'][::-1]
+    original = vals.copy()
+    pn['pore.a'][:] = 0
+    assert sp.all(pn['pore.b'] == original)
+    assert sp.all(water['pore.c'] == original[::-1])
+    a = pn['pore.a']
+    pn['pore.a'] = a  # Storing an array again under its own key does not copy it
+    assert pn['pore.a'] is a
+
+def test_dtype_policy():
+    ctrl = OpenPNM.Base.Controller()
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    assert pn['throat.conns'].dtype == sp.int32
+    pn['pore.float32'] = sp.rand(pn.Np).astype(sp.float32)
+    pn.extend(pore_coords=[[10,10,10]])
+    assert pn['pore.float32'].dtype == sp.float32
+    assert sp.isnan(pn['pore.float32'][-1])
+    pn['pore.cluster'] = sp.arange(pn.Np,dtype=sp.int64)
+    pn['pore.big'] = sp.ones(pn.Np,dtype=sp.int64)*2**40
+    assert pn['pore.cluster'].dtype == sp.int32
+    assert pn['pore.big'].dtype == sp.int64
+    pn.extend(pore_coords=[[11,11,11]])
+    assert pn['pore.cluster'].dtype == sp.int32
+    assert pn['pore.cluster'][-1] == -1
+    assert pn['pore.big'][-1] == -1
+    pn.dtype_policy = {'index':'int32'}
+    with pytest.raises(Exception):
+        pn['pore.big'] = pn['pore.big']*2
+    pn.dtype_policy = {'index':'auto'}
+    geo = OpenPNM.Geometry.GenericGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+    geo.dtype_policy = {'float':'float32'}
+    geo['pore.diameter'] = sp.rand(geo.Np)
+    assert geo['pore.diameter'].dtype == sp.float32
+    assert pn['pore.diameter'].dtype == sp.float32
+    report = ctrl.memory_report()
+    assert report[geo.name]['saved'] > 0
+    assert ctrl.dtype_policy['float'] == 'float64'
+
+def test_vtk_binary(tmpdir):
+    import OpenPNM.Utilities.IO as io
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    geo = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    for encoding in ['ascii','binary','appended']:
+        filename = str(tmpdir.join('test_vtk.vtp'))
+        io.VTK.save(pn,filename,encoding=encoding)
+        net = io.VTK.load(filename)
+        assert sp.allclose(net['pore.coords'],pn['pore.coords'])
+        assert sp.all(net['throat.conns'] == pn['throat.conns'])
+        key = 'throat.'+pn.name+'_diameter'
+        assert sp.allclose(net[key],pn['throat.diameter'])
+
+def test_columnar_save_load(tmpdir):
+    ctrl = OpenPNM.Base.Controller()
+    ctrl.clear()
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    geo = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    air = OpenPNM.Phases.Air(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=air,pores=pn.Ps,throats=pn.Ts)
+    g = air['throat.hydraulic_conductance'].copy()
+    filename = str(tmpdir.join('test_columnar'))
+    ctrl.save(filename,fileformat='npz')
+    ctrl.clear()
+    ctrl.load(filename+'.npz',lazy=True)
+    air2 = ctrl[air.name]
+    assert sp.allclose(air2['throat.hydraulic_conductance'],g)
+    assert ctrl[phys.name]._phases[0] is air2
+    assert list(ctrl[geo.name].models.keys()) == list(geo.models.keys())
+    ctrl[phys.name].models.regenerate()
+    assert sp.allclose(air2['throat.hydraulic_conductance'],g)
+    ctrl.clear()
+    ctrl.load(filename+'.npz',props=['pore.diameter'])
+    assert ctrl[geo.name].props() == ['pore.diameter']
+    ctrl.clear()
+
+def test_memmap_storage():
+    ctrl = OpenPNM.Base.Controller()
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    geo = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    ref = geo['throat.length'].copy()
+    geo.storage = {'backend':'memmap','min_bytes':0}
+    geo['pore.test'] = sp.rand(geo.Np)
+    assert isinstance(dict.__getitem__(geo,'pore.test'),sp.memmap)
+    geo['pore.test'][0] = 2.0
+    assert geo['pore.test'][0] == 2.0
+    assert not isinstance(dict.__getitem__(pn,'pore.coords'),sp.memmap)
+    geo.models['throat.length']['chunk_size'] = 50
+    geo.models.regenerate(props=['throat.length'])
+    assert isinstance(dict.__getitem__(geo,'throat.length'),sp.memmap)
+    assert sp.allclose(geo['throat.length'],ref)
+
+def test_memmap_storage_keeps_scratch_views():
+    import os
+    ctrl = OpenPNM.Base.Controller()
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    pn.storage = {'backend':'memmap','min_bytes':0}
+    temp = pn._allocate('pore.test',(pn.Np+10,),float)
+    temp[:] = 1.0
+    scratch = os.path.dirname(temp.filename)
+    files = len(os.listdir(scratch))
+    pn['pore.test'] = temp[:pn.Np]
+    assert sp.may_share_memory(dict.__getitem__(pn,'pore.test'),temp)
+    assert len(os.listdir(scratch)) == files
+    pn['pore.test'] = sp.zeros((pn.Np,))
+    assert not os.path.isfile(temp.filename)
+    ctrl.clear()
+
+def test_chunked_models_must_be_chunkable():
+    ctrl = OpenPNM.Base.Controller()
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    geo = OpenPNM.Geometry.GenericGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+    f = OpenPNM.Geometry.models.pore_misc.random
+    geo.add_model(propname='pore.seed',model=f,seed=0)
+    ref = geo['pore.seed'].copy()
+    with pytest.raises(Exception):
+        geo.add_model(propname='pore.seed',model=f,seed=0,chunk_size=10)
+    # A chunk_size set directly on an unmarked model is ignored
+    geo.models['pore.seed']['chunk_size'] = 10
+    geo.models.regenerate(props=['pore.seed'])
+    assert sp.all(geo['pore.seed'] == ref)
+    geo['pore.diameter'] = geo['pore.seed']
+    f = OpenPNM.Geometry.models.pore_volume.sphere
+    geo.add_model(propname='pore.volume',model=f)
+    ref = geo['pore.volume'].copy()
+    geo.add_model(propname='pore.volume',model=f,chunk_size=10)
+    assert sp.allclose(geo['pore.volume'],ref)
+    ctrl.clear()
+
+def test_ip_checkpoint_resume(tmpdir):
+    import os
+    filename = str(tmpdir.join('test_IP.chk'))
+    pn = OpenPNM.Network.Cubic(shape=[8,8,8])
+    geo = OpenPNM.Geometry.Toray090(network=pn,pores=pn.pores(),throats=pn.throats())
+    air = OpenPNM.Phases.Air(network=pn)
+    water = OpenPNM.Phases.Water(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=water,pores=pn.pores(),throats=pn.throats())
+    IP1 = OpenPNM.Algorithms.InvasionPercolation(network=pn)
+    IP1.run(invading_phase=water,defending_phase=air,inlets=pn.pores('top'),
+            outlets=pn.pores('bottom'),report=0,checkpoint=filename,
+            checkpoint_every=70)
+    steps = IP1._counter
+    assert os.path.isfile(filename)
+    IP2 = OpenPNM.Algorithms.InvasionPercolation(network=pn)
+    IP2.resume(filename)
+    assert IP2._counter == steps
+    for key in ['pore.inv_seq','throat.inv_seq','pore.inv_time',
+                'throat.inv_time','pore.cluster_final','pore.inv_sat']:
+        assert sp.all(IP1[key] == IP2[key])
+
+def test_xdmf_time_series(tmpdir):
+    from xml.etree import ElementTree as ET
+    import OpenPNM.Utilities.IO as io
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    geo = OpenPNM.Geometry.Toray090(network=pn,pores=pn.pores(),throats=pn.throats())
+    air = OpenPNM.Phases.Air(network=pn)
+    water = OpenPNM.Phases.Water(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=water,pores=pn.pores(),throats=pn.throats())
+    IP = OpenPNM.Algorithms.InvasionPercolation(network=pn)
+    IP.run(invading_phase=water,defending_phase=air,inlets=pn.pores('top'),
+           outlets=pn.pores('bottom'),report=0)
+    filename = str(tmpdir.join('test_xdmf'))
+    io.XDMF.save_invasion(pn,IP,filename,frames=[5,10],fileformat='binary',
+                          static=['pore.diameter'])
+    grids = ET.parse(filename+'.xmf').getroot().find('Domain').find('Grid')
+    grids = grids.findall('Grid')
+    assert [g.find('Time').get('Value') for g in grids] == ['5','10']
+    offsets = set()
+    for seq,grid in zip([5,10],grids):
+        item = grid.find('Geometry').find('DataItem')
+        offsets.add(item.get('Seek'))
+        for attr in grid.findall('Attribute'):
+            item = attr.find('DataItem')
+            name = attr.get('Name')
+            dtype = {'Float':'<f8','UChar':'u1'}[item.get('NumberType')]
+            count = int(item.get('Dimensions'))
+            with open(filename+'.bin','rb') as f:
+                f.seek(int(item.get('Seek')))
+                array = np.fromfile(f,dtype=dtype,count=count)
+            if name == 'pore.'+IP.name+'_occupancy':
+                inv = (IP['pore.inv_seq'] > 0)*(IP['pore.inv_seq'] <= seq)
+                assert sp.all(array == inv)
+            if name == 'pore.'+pn.name+'_diameter':
+                assert sp.allclose(array,pn['pore.diameter'])
+    assert len(offsets) == 1
+
+def test_matfile_removes_small_clusters(tmpdir):
+    import scipy.io as spio
+    pn = OpenPNM.Network.Cubic(shape=[10,10,10])
+    Np = pn.num_pores()
+    Nt = pn.num_throats()
+    # Append two isolated pores connected only to each other
+    coords = sp.vstack((pn['pore.coords'],[[100,100,100],[101,100,100]]))
+    conns = sp.vstack((pn['throat.conns'],[[Np,Np+1]]))
+    mat = {'pcoords' : coords,
+           'pvolume' : sp.vstack(sp.arange(Np+2)*1.0),
+           'pdiameter' : sp.ones((Np+2,1)),
+           'pnumbering' : sp.vstack(sp.arange(Np+2)),
+           'pname_transform' : sp.vstack(sp.arange(Np+2)+10),
+           'tconnections' : conns,
+           'tdiameter' : sp.vstack(sp.arange(Nt+1)*1.0),
+           'tnumbering' : sp.vstack(sp.arange(Nt+1))}
+    filename = str(tmpdir.join('test_clusters.mat'))
+    spio.savemat(filename,mat)
+    net = OpenPNM.Network.MatFile(filename=filename)
+    assert net.num_pores() == Np
+    assert net.num_throats() == Nt
+    assert sp.all(net._pore_map == sp.arange(Np))
+    assert sp.all(net._dictionary['pname_transform'] == sp.arange(Np)+10)
+    assert sp.all(net['pore.volume'] == sp.arange(Np))
+    assert sp.all(net['throat.diameter'] == sp.arange(Nt))
+
+def test_text_import(tmpdir):
+    import OpenPNM.Utilities.IO as io
+    pn = OpenPNM.Network.Cubic(shape=[6,7,8])
+    Np = pn.num_pores()
+    nodes = sp.hstack((pn['pore.coords'],sp.vstack(sp.rand(Np))))
+    nodes_file = str(tmpdir.join('test_nodes.txt'))
+    links_file = str(tmpdir.join('test_links.txt'))
+    np.savetxt(nodes_file,nodes,header=str(Np))
+    conns = pn['throat.conns'][:,::-1] + 1
+    conns = sp.vstack((conns,[[0,1],[Np+1,2]]))
+    links = sp.hstack((conns,sp.vstack(sp.rand(len(conns)))))
+    np.savetxt(links_file,links,header='pore1 pore2 radius')
+    net = io.Text.load(nodes_file,links_file,
+                       node_columns=['x','y','z','radius'],
+                       link_columns=['pore1','pore2','radius'],
+                       skiprows=1,index_base=1,chunk_size=1000,
+                       storage={'backend':'memmap','min_bytes':0})
+    assert net.num_pores() == Np
+    assert net.num_throats() == pn.num_throats()
+    assert sp.allclose(net['pore.coords'],pn['pore.coords'])
+    assert sp.all(net['throat.conns'] == pn['throat.conns'])
+    assert sp.allclose(net['pore.radius'],nodes[:,3])
+    assert sp.allclose(net['throat.radius'],links[:-2,2])
+    assert isinstance(dict.__getitem__(net,'pore.radius'),sp.memmap)
+
+def test_import_time():
+    import sys
+    import subprocess
+    # Importing OpenPNM must not load its subpackages or heavy dependencies
+    code = ('import sys; import OpenPNM; '
+            'print(sorted(k for k in sys.modules if k.startswith("OpenPNM.") '
+            'or k.split(".")[0] in ["matplotlib","vtk","h5py","scipy"]))')
+    out = subprocess.check_output([sys.executable,'-c',code]).decode()
+    loaded = eval(out)
+    for item in ['Network','Geometry','Phases','Physics','Algorithms',
+                 'Postprocessing','Utilities','Base']:
+        assert 'OpenPNM.'+item not in loaded
+    assert 'matplotlib' not in loaded
+    assert 'scipy.sparse' not in loaded
+
+def test_benchmark_runner():
+    from benchmarks import run
+    found = run.discover('CubicGeneration')
+    assert ('bench_network','CubicGeneration','time_cubic',1000) in found
+    results = run.run([('bench_network','CubicGeneration','time_cubic',1000)],
+                      repeat=1,report=lambda result: None)
+    assert results[0]['time'] > 0
+    assert results[0]['peak_mb'] > 0
+
+def test_tracing_spans_and_chrome_export(tmpdir):
+    import json
+    from OpenPNM.Base import Tools
+    ctrl = OpenPNM.Base.Controller()
+    ctrl.clear()
+    Tools.Tracer.clear()
+    ctrl.tracing = True
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    geo = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    water = OpenPNM.Phases.Water(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=water,pores=pn.Ps,throats=pn.Ts)
+    alg = OpenPNM.Algorithms.StokesFlow(network=pn,phase=water)
+    alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=1,pores=pn.pores('top'))
+    alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=0,pores=pn.pores('bottom'))
+    alg.run()
+    pn.trim(pores=[0])
+    ctrl.tracing = False
+    n_events = len(Tools.Tracer.events)
+    pn.find_neighbor_pores(pores=[1])
+    assert len(Tools.Tracer.events) == n_events
+    trim = OpenPNM.Network.GenericNetwork.trim
+    assert trim.__wrapped__.__name__ == 'trim'
+    assert trim.__globals__ is Tools.__dict__
+    report = ctrl.trace_report()
+    assert report['GenericNetwork.trim']['calls'] == 1
+    assert report['GenericLinearTransport.solve']['calls'] == 1
+    assert report[geo.name+':pore.diameter']['calls'] >= 1
+    assert report['sparse.coefficient']['value'] >= 1
+    assert report['sparse.adjacency']['value'] >= 1
+    assert report['array.store_bytes']['value'] > 0
+    filename = ctrl.export_trace(str(tmpdir.join('test_trace')))
+    with open(filename) as f:
+        trace = json.load(f)
+    names = set(event['name'] for event in trace['traceEvents'])
+    assert 'StokesFlow.run' in names or 'GenericLinearTransport.run' in names
+    spans = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    assert all(event['dur'] >= 0 for event in spans)
+    # A span nested in another one must lie within it
+    run = [e for e in spans if e['name'] == 'GenericLinearTransport.run'][0]
+    solve = [e for e in spans if e['name'] == 'GenericLinearTransport.solve'][0]
+    assert run['ts'] <= solve['ts'] <= solve['ts']+solve['dur'] <= run['ts']+run['dur']+1e-3
+    Tools.Tracer.clear()
+    ctrl.clear()
+
+def test_cubic_vectorized_generation():
+    ctrl = OpenPNM.Base.Controller()
+    ctrl.storage = {'backend':'memmap','min_bytes':0}
+    try:
+        pn = OpenPNM.Network.Cubic(shape=[4,5,6],spacing=[1,2,3],connectivity=26)
+    finally:
+        ctrl.storage = {'backend':'memory','min_bytes':2**20}
+    assert isinstance(dict.__getitem__(pn,'throat.conns'),sp.memmap)
+    assert pn['throat.conns'].dtype == np.int32
+    offsets = [d for d in np.ndindex(3,3,3) if d > (1,1,1)]
+    assert pn.Nt == sum([np.prod(np.array([4,5,6]) - np.absolute(np.array(d)-1)) for d in offsets])
+    ind = np.indices([4,5,6]).reshape(3,-1).T
+    assert sp.allclose(pn['pore.coords'],(ind+0.5)*[1,2,3])
+    d = ind[pn['throat.conns'][:,1]] - ind[pn['throat.conns'][:,0]]
+    assert sp.all(sp.absolute(d).max(axis=1) == 1)
+    conns = sp.sort(pn['throat.conns'],axis=1)
+    assert sp.unique(conns[:,0]*pn.Np+conns[:,1]).size == pn.Nt
+    assert sp.all(pn.num_neighbors(pn.Ps)[pn.pores('internal')] <= 26)
+
+def test_add_boundaries_with_attached_objects():
+    ctrl = OpenPNM.Base.Controller()
+    ctrl.clear()
+    pn = OpenPNM.Network.Cubic(shape=[4,5,6])
+    geo = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    water = OpenPNM.Phases.Water(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=water,pores=pn.Ps,throats=pn.Ts)
+    Np,Nt = pn.Np,pn.Nt
+    diameter = geo['pore.diameter'].copy()
+    pn.add_boundaries()
+    Nb = 2*(4*5+5*6+4*6)
+    assert pn.Np == Np + Nb
+    assert pn.Nt == Nt + Nb
+    assert pn.num_pores('boundary') == Nb
+    assert pn.num_pores('top_boundary') == 4*5
+    # Geometry and Physics keep their locations, the Phase covers the clones
+    assert geo.Np == Np
+    assert sp.all(geo['pore.diameter'] == diameter)
+    assert phys.Np == Np
+    assert water.Np == pn.Np
+    assert water.Nt == pn.Nt
+    assert sp.all(pn['pore.'+water.name])
+    assert sp.all(sp.isnan(water['pore.temperature'][Np:]))
+    assert sp.all(water['pore.temperature'][:Np] == 298.0)
+    assert pn.num_pores(geo.name) == Np
+    # Boundary pores lie on the faces of the domain
+    assert sp.all(pn['pore.coords'][pn.pores('top_boundary'),2] == 6.0)
+    assert sp.all(pn['pore.coords'][pn.pores('front_boundary'),0] == 0)
+    # New Geometries can be assigned to the boundary pores
+    bnd = OpenPNM.Geometry.Boundary(network=pn,pores=pn.pores('boundary'),
+                                    throats=pn.throats('boundary'))
+    health = pn.check_geometry_health()
+    assert all([health[item] == [] for item in health])
+
+def test_incremental_topology_cache():
+    pn = OpenPNM.Network.Cubic(shape=[6,6,6],connectivity=26)
+    sp.random.seed(0)
+    pn.find_neighbor_pores(pores=[0])
+    pn.find_neighbor_throats(pores=[0])
+    for i in range(5):
+        pn.trim(throats=sp.random.randint(0,pn.Nt,20))
+        pn.trim(pores=sp.random.randint(0,pn.Np,2))
+        Np = pn.Np
+        conns = sp.vstack((sp.arange(Np,Np+3),sp.random.randint(0,Np,3))).T
+        pn.extend(pore_coords=sp.rand(3,3),throat_conns=conns)
+    stats = pn.topology_stats
+    assert stats['adjacency_builds'] == 1
+    assert stats['incidence_builds'] == 1
+    assert stats['incremental_updates'] > 0
+    am = pn.create_adjacency_matrix(sprsfmt='csr')
+    im = pn.create_incidence_matrix(sprsfmt='csr')
+    assert (pn._get_topology('adjacency') != am).nnz == 0
+    assert (pn._get_topology('incidence') != im).nnz == 0
+    Ps = pn.Ps
+    neighbors = pn.find_neighbor_pores(pores=Ps,flatten=False)
+    assert all([sp.all(neighbors[i] == am.indices[am.indptr[i]:am.indptr[i+1]]) for i in Ps])
+    assert sp.all(pn.num_neighbors(pores=Ps) == sp.diff(am.indptr))
+    # Editing the connections directly makes the cache rebuild itself
+    pn['throat.conns'] = pn['throat.conns'][:,::-1]
+    pn.find_neighbor_pores(pores=[0])
+    assert pn.topology_stats['adjacency_builds'] == 2
+
+def test_trim_associated_objects():
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    Ps = pn.pores('top')
+    Ts = pn.find_neighbor_throats(pores=Ps)
+    geom = OpenPNM.Geometry.GenericGeometry(network=pn,pores=Ps,throats=Ts)
+    geom['pore.index'] = Ps
+    water = OpenPNM.Phases.Water(network=pn)
+    water['pore.index'] = pn.Ps
+    water['pore.constant'] = 298.0
+    phys = OpenPNM.Physics.GenericPhysics(network=pn,phase=water,pores=Ps,throats=Ts)
+    phys['throat.index'] = Ts
+    trimmed = Ps[[0,3,7]]
+    pn.trim(pores=trimmed,check_health=False)
+    kept = sp.setdiff1d(sp.arange(125),trimmed)
+    assert pn.Np == 122
+    assert water.Np == 122
+    assert sp.all(water['pore.index'] == kept)
+    assert geom.Np == 22
+    assert sp.all(geom['pore.index'] == sp.setdiff1d(Ps,trimmed))
+    assert phys.Nt == sp.sum(pn['throat.'+phys.name])
+    assert sp.all(sp.in1d(phys['throat.index'],Ts))
+    assert sp.all(pn.map_pores(target=geom,pores=pn.pores(geom.name)) == geom.Ps)
+    # Uniform arrays are kept uniform without being expanded
+    temp = dict.__getitem__(water,'pore.constant')
+    assert type(temp) is OpenPNM.Base.Tools.UniformArray
+    assert temp.shape == (122,)
+    pn.trim(throats=phys.map_throats(target=pn,throats=[0,1]))
+    assert phys.Nt == sp.sum(pn['throat.'+phys.name])
+    assert geom.Nt == sp.sum(pn['throat.'+geom.name])
+
+def test_check_network_health():
+    pn = OpenPNM.Network.Cubic(shape=[4,4,4])
+    pn.extend(pore_coords=[pn['pore.coords'][5],[10,10,10]],
+              throat_conns=[[2,3],[3,2],[2,3]])
+    health = pn.check_network_health()
+    assert sp.all(health['isolated_pores'] == [64,65])
+    assert health['duplicate_throats'] == [[2,pn.Nt-3,pn.Nt-1]]
+    assert sp.all(health['bidirectional_throats'] == [pn.Nt-2])
+    assert sp.all(health['duplicate_pores'] == [64])
+    assert len(health['disconnected_clusters']) == 3
+    assert sp.shape(health['disconnected_clusters'][0])[0] == 64
+    assert sorted(health['trim_pores']) == [64,65]
+    assert pn.isolated_pores()[64:] == [True,True]
+
+def test_stitch_networks():
+    pn = OpenPNM.Network.Cubic(shape=[4,4,4])
+    water = OpenPNM.Phases.Water(network=pn)
+    pn2 = OpenPNM.Network.Cubic(shape=[4,4,4])
+    pn2['pore.coords'] += [0,0,4]
+    pn2['pore.seed'] = sp.arange(pn2.Np)
+    geom = OpenPNM.Geometry.GenericGeometry(network=pn2,pores=pn2.Ps,throats=pn2.Ts)
+    Nt = pn.Nt
+    pn.stitch(pn2,pores_1=pn.pores('top'),pores_2=pn2.pores('bottom'),len_max=1.5)
+    assert pn.Np == 128
+    assert pn.Nt == 2*Nt + pn.num_throats('stitched')
+    assert 'pore.'+geom.name not in pn.keys()
+    assert pn['pore.seed'].dtype == sp.int32
+    assert sp.all(pn['pore.seed'][:64] == -1)
+    assert sp.all(pn['pore.seed'][64:] == sp.arange(64))
+    assert sp.sum(pn['pore.top']) == 32
+    assert water.Np == 128
+    # Every stitch joins a top pore to a bottom pore of the donor
+    conns = pn['throat.conns'][pn.throats('stitched')]
+    assert sp.all(sp.in1d(conns[:,0],pn.pores('top')[:16]))
+    assert sp.all(sp.in1d(conns[:,1],pn.pores('bottom')[16:]))
+    C = pn['pore.coords']
+    L = sp.sqrt(sp.sum((C[conns[:,0]]-C[conns[:,1]])**2,axis=1))
+    assert sp.all(L <= 1.5)
+    # The nearest neighbors are always joined by the tessellation
+    assert sp.sum(L == 1) == 16
+    # Radius stitching connects every pair within len_max
+    pn3 = OpenPNM.Network.Cubic(shape=[4,4,4])
+    pn4 = OpenPNM.Network.Cubic(shape=[4,4,4])
+    pn4['pore.coords'] += [0,0,4]
+    pn3.stitch(pn4,pores_1=pn3.pores('top'),pores_2=pn4.pores('bottom'),
+               method='radius',len_max=1.5)
+    assert pn3.num_throats('stitched') == 16 + 2*2*3*4
+    # Boolean masks select the same pores as indices
+    pn5 = OpenPNM.Network.Cubic(shape=[4,4,4])
+    pn6 = OpenPNM.Network.Cubic(shape=[4,4,4])
+    pn6['pore.coords'] += [0,0,4]
+    pn5.stitch(pn6,pores_1=pn5['pore.top'],pores_2=pn6['pore.bottom'],
+               method='radius',len_max=1.5)
+    assert sp.all(pn5['throat.conns'] == pn3['throat.conns'])
+
+def test_linear_source_term_rerun():
+    ctrl = OpenPNM.Base.Controller()
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5],spacing=0.0001)
+    geom = OpenPNM.Geometry.Toray090(network=pn,pores=pn.Ps,throats=pn.Ts)
+    air = OpenPNM.Phases.Air(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=air,pores=pn.Ps,throats=pn.Ts)
+    phys.add_model(model=OpenPNM.Physics.models.generic_source_term.linear,
+                   propname='pore.sink',A1=-1e-13,A2=1e-14)
+    alg = OpenPNM.Algorithms.FickianDiffusion(network=pn,phase=air)
+    alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=0.6,pores=pn.pores('top'))
+    alg.set_source_term(source_name='pore.sink',pores=pn.pores('bottom'),maxiter=0)
+    alg.run()
+    X = alg['pore.'+air.name+'_mole_fraction'].copy()
+    # Running again must not add the source term to the RHS a second time
+    alg.run()
+    assert sp.allclose(alg['pore.'+air.name+'_mole_fraction'],X)
+    ctrl.clear()
+
+def test_reorder_all_objects():
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    Ps = pn.pores('top')
+    Ts = pn.find_neighbor_throats(pores=Ps)
+    geo1 = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=Ps,throats=Ts)
+    geo2 = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.pores('top',mode='not'),
+                                           throats=pn.throats('all')[~sp.in1d(pn.Ts,Ts)])
+    water = OpenPNM.Phases.Water(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=water,pores=pn.Ps,throats=pn.Ts)
+    alg = OpenPNM.Algorithms.StokesFlow(network=pn,phase=water)
+    alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=1,pores=pn.pores('left'))
+    alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=0,pores=pn.pores('right'))
+    alg.run()
+    old = {'diameter' : pn['pore.diameter'],
+           'length' : pn['throat.length'],
+           'g' : water['throat.hydraulic_conductance'],
+           'pressure' : alg['pore.'+water.name+'_pressure'],
+           'conns' : pn['throat.conns'],
+           'top' : pn['pore.top']}
+    for method in ['rcm','morton','hilbert']:
+        perm = pn.reorder(method=method)
+        Pperm,Tperm = perm['pore'],perm['throat']
+        for key in old:
+            if key != 'conns':
+                element = 'throat' if key in ['length','g'] else 'pore'
+                old[key] = old[key][{'pore' : Pperm,'throat' : Tperm}[element]]
+        Pmap = sp.empty_like(Pperm)
+        Pmap[Pperm] = sp.arange(pn.Np)
+        old['conns'] = Pmap[old['conns'][Tperm]]
+        assert sp.all(pn['pore.diameter'] == old['diameter'])
+        assert sp.all(pn['throat.length'] == old['length'])
+        assert sp.all(water['throat.hydraulic_conductance'] == old['g'])
+        assert sp.all(alg['pore.'+water.name+'_pressure'] == old['pressure'])
+        assert sp.all(pn['throat.conns'] == old['conns'])
+        assert sp.all(pn['pore.top'] == old['top'])
+        assert sp.all(pn.pores(geo1.name) == sp.where(pn['pore.top'])[0])
+    alg.run()
+    assert sp.allclose(alg['pore.'+water.name+'_pressure'],old['pressure'])
+
+def test_reorder_reduces_bandwidth():
+    sp.random.seed(0)
+    pn = OpenPNM.Network.Delaunay(num_pores=500,domain_size=[1,1,1])
+    def bandwidth():
+        conns = pn['throat.conns']
+        return sp.amax(sp.absolute(conns[:,0]-conns[:,1]))
+    before = bandwidth()
+    pn.reorder(method='rcm')
+    assert bandwidth() < before/2
+    assert sp.all(pn.check_network_health()['isolated_pores'] == [])
+
+def test_partition_domains():
+    pn = OpenPNM.Network.Cubic(shape=[9,7,5],connectivity=26)
+    parts = pn.partition(n_parts=3)
+    assert sorted(sp.bincount(parts).tolist()) == [105,105,105]
+    domains = pn.partition_domains()
+    assert len(domains) == 3
+    assert sp.all(sp.sort(sp.concatenate([d['pores'] for d in domains])) == pn.Ps)
+    Ts = sp.concatenate([d['throats'] for d in domains])
+    assert sp.shape(Ts)[0] == pn.Nt + pn.num_throats('partition_interface')
+    conns = pn['throat.conns']
+    for i,d in enumerate(domains):
+        Pall = sp.concatenate((d['pores'],d['ghost_pores']))
+        assert sp.all(Pall[d['conns']] == conns[d['throats']])
+        assert sp.all(d['ghost_owners'] == parts[d['ghost_pores']])
+        assert sp.all(d['ghost_owners'] != i)
+        # Ghost pores are exactly the outside neighbors of the owned pores
+        neighbors = pn.find_neighbor_pores(pores=d['pores'])
+        assert sp.all(d['ghost_pores'] == neighbors[parts[neighbors] != i])
+    Ts = pn.find_interface_throats(labels=['partition_0','partition_1'])
+    assert sp.all(sp.in1d(Ts,domains[0]['interface_throats']))
+    assert sp.all(sp.in1d(Ts,domains[1]['interface_throats']))
+    # Partitioning again replaces the old labels, but not other keys
+    pn['pore.partition_size'] = sp.ones((pn.Np,))
+    pn['pore.partition_edge'] = pn['pore.all'].copy()
+    pn.partition(n_parts=2)
+    assert 'pore.partition_2' not in pn.keys()
+    assert 'pore.partition_size' in pn.keys()
+    assert len(pn.partition_domains()) == 2
+    # Views of each sub-domain include the ghost pores
+    domains = pn.partition_domains(views=True)
+    for d in domains:
+        view = d['network']
+        assert view.Np == sp.size(d['pores']) + sp.size(d['ghost_pores'])
+        Pmap = view['pore.'+pn.name]
+        assert sp.all(Pmap[view.pores('ghost')] == d['ghost_pores'])
+        assert sp.all(view['pore.coords'] == pn['pore.coords'][Pmap])
+
+def test_subnetwork_views():
+    def simulation():
+        pn = OpenPNM.Network.Cubic(shape=[8,8,8])
+        geom = OpenPNM.Geometry.GenericGeometry(network=pn,pores=pn.Ps,throats=pn.Ts)
+        C = pn['pore.coords']
+        geom['pore.volume'] = 1 + C[:,0]
+        geom['throat.volume'] = 0.0
+        water = OpenPNM.Phases.Water(network=pn)
+        air = OpenPNM.Phases.Air(network=pn)
+        phys = OpenPNM.Physics.GenericPhysics(network=pn,phase=water,pores=pn.Ps,throats=pn.Ts)
+        conns = pn['throat.conns']
+        phys['throat.hydraulic_conductance'] = 1 + sp.sin(conns[:,0]+conns[:,1])**2
+        phys['throat.capillary_pressure'] = 1000*(1 + sp.cos(conns[:,0]*conns[:,1])**2)
+        return pn,water,air
+    def run(pn,water,air):
+        inlet = pn.pores()[pn['pore.coords'][:,0] < 1]
+        outlet = pn.pores()[pn['pore.coords'][:,0] > 4]
+        alg = OpenPNM.Algorithms.StokesFlow(network=pn,phase=water)
+        alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=1,pores=inlet)
+        alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=0,pores=outlet)
+        alg.run()
+        alg.return_results()
+        OP = OpenPNM.Algorithms.OrdinaryPercolation(network=pn,invading_phase=water,
+                                                    defending_phase=air)
+        OP.run(inlets=inlet,npts=10)
+        return alg['pore.'+water.name+'_pressure'],OP['pore.inv_Pc']
+    pn,water,air = simulation()
+    sub = OpenPNM.Network.SubNetwork(network=pn,box=[[0,0,0],[5,5,5]])
+    water_sub = OpenPNM.Phases.SubPhase(network=sub,phase=water)
+    air_sub = OpenPNM.Phases.SubPhase(network=sub,phase=air)
+    P_sub,Pc_sub = run(sub,water_sub,air_sub)
+    # The same box cut out of an identical simulation with trim
+    ref,water_ref,air_ref = simulation()
+    ref.trim(pores=ref.pores()[sp.any(ref['pore.coords'] > 5,axis=1)])
+    P_ref,Pc_ref = run(ref,water_ref,air_ref)
+    assert sub.Np == ref.Np == 125
+    assert sub.Nt == ref.Nt
+    assert sp.all(sub['throat.conns'] == ref['throat.conns'])
+    assert sp.allclose(P_sub,P_ref)
+    assert sp.all(Pc_sub == Pc_ref)
+    # Results are written to the views only
+    assert sp.allclose(water_sub['pore.pressure'],P_ref)
+    assert sp.all(water['pore.pressure'] == 101325.0)
+    assert sp.all(sub['pore.'+pn.name] == sub._subset_map['pore'])
+    # Properties are copied onto the view when first read
+    pn['pore.test'] = 1.0 + sp.arange(pn.Np)
+    pn['throat.test'] = 0.0
+    assert 'pore.test' not in dict.keys(sub)
+    test = sub['pore.test']
+    assert sp.all(test == pn['pore.test'][sub['pore.'+pn.name]])
+    assert 'pore.test' in dict.keys(sub)
+    # Held arrays, fill and out= all write to the view only
+    test[0] = -1
+    assert sub['pore.test'][0] == -1
+    sub['throat.test'].fill(2.0)
+    assert sp.all(sub['throat.test'] == 2.0)
+    temp = sub['pore.test']
+    sp.add(temp,1.0,out=temp)
+    assert sub['pore.test'][0] == 0
+    assert test[0] == 0
+    assert isinstance(dict.__getitem__(pn,'throat.test'),OpenPNM.Base.Tools.UniformArray)
+    assert sp.all(pn['pore.test'] > 0)
+    assert sp.all(pn['throat.test'] == 0)
+    # Changes to the source after a read are fetched again
+    Ps = sub['pore.'+pn.name]
+    pn['pore.other'] = 1.0 + sp.arange(pn.Np)
+    assert sp.all(sub['pore.other'] == 1.0 + Ps)
+    pn['pore.other'][Ps[0]] = -5.0
+    assert sub['pore.other'][0] == -5.0
+    pn['pore.other'] = 0.0
+    assert sp.all(sub['pore.other'] == 0.0)
+    geom = pn._geometries[0]
+    assert sp.all(sub['pore.volume'] == geom['pore.volume'][Ps])
+    geom['pore.volume'][Ps[1]] = -1.0
+    assert sub['pore.volume'][1] == -1.0
+    # A copy written on the view cannot follow the source
+    pn['pore.test'][Ps[0]] = 7.0
+    with pytest.raises(Exception):
+        sub['pore.test']
+    # Arrays assigned to the view belong to it
+    sub['pore.test'] = 3.0
+    pn['pore.test'] = 4.0
+    assert sp.all(sub['pore.test'] == 3.0)
+    # The parent is protected while the view exists
+    with pytest.raises(Exception):
+        pn.trim(pores=[0])
+    with pytest.raises(Exception):
+        sub.trim(pores=[0])
+
+def test_clone_simulation_copy_on_write():
+    ctrl = OpenPNM.Base.Controller()
+    pn = OpenPNM.Network.Cubic(shape=[6,6,6])
+    geo = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    water = OpenPNM.Phases.Water(network=pn)
+    phys = OpenPNM.Physics.Standard(network=pn,phase=water,pores=pn.Ps,throats=pn.Ts)
+    diameter = geo['pore.diameter'].copy()
+    net = ctrl.clone_simulation(pn,name='cow')
+    geo2 = ctrl[geo.name+'_cow']
+    water2 = ctrl[water.name+'_cow']
+    phys2 = ctrl[phys.name+'_cow']
+    assert net._geometries == [geo2]
+    assert water2._physics == [phys2]
+    assert phys2._phases == [water2]
+    assert all([item._parent is pn for item in [net,geo2,water2,phys2]])
+    # Models are copied shallowly
+    model = water.models['pore.density']
+    assert water2.models['pore.density'] is not model
+    assert water2.models['pore.density']['model'] is model['model']
+    # Writes to either side are not seen by the other
+    geo2['pore.diameter'][0] = -1
+    geo2['pore.diameter'] += 1
+    assert sp.all(geo['pore.diameter'] == diameter)
+    assert geo2['pore.diameter'][0] == 0
+    geo['pore.diameter'][1] = -1
+    assert geo2['pore.diameter'][1] == diameter[1] + 1
+    assert sp.all(net['pore.coords'][:,2] < 6)
+    pn['pore.coords'] += [0,0,5]
+    assert sp.all(net['pore.coords'][:,2] < 6)
+    # The clone can be trimmed and used without touching the original
+    net.trim(pores=net.pores('top'))
+    assert net.Np == geo2.Np == water2.Np == 180
+    assert pn.Np == geo.Np == water.Np == 216
+    assert sp.all(net['pore.'+pn.name] == pn.pores('top',mode='not'))
+    water2.models.regenerate()
+    phys2.models.regenerate()
+    alg = OpenPNM.Algorithms.StokesFlow(network=net,phase=water2)
+    alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=1,pores=net.pores('left'))
+    alg.set_boundary_conditions(bctype='Dirichlet',bcvalue=0,pores=net.pores('right'))
+    alg.run()
+    assert sp.all(sp.isfinite(alg['pore.'+water2.name+'_pressure']))
+    with pytest.raises(Exception):
+        pn.trim(pores=[0])
+    # Ghost objects share their arrays in the same way
+    ghost = ctrl.ghost_object(phys)
+    assert ghost._net is pn
+    conductance = phys['throat.hydraulic_conductance'].copy()
+    ghost['throat.hydraulic_conductance'][:] = 0
+    assert sp.all(phys['throat.hydraulic_conductance'] == conductance)
+    assert ctrl[phys.name] is phys
+
+def test_clone_simulation_isolates_original():
+    ctrl = OpenPNM.Base.Controller()
+    pn = OpenPNM.Network.Cubic(shape=[5,5,5])
+    geo = OpenPNM.Geometry.Stick_and_Ball(network=pn,pores=pn.Ps,throats=pn.Ts)
+    coords = pn['pore.coords']
+    old = {key : geo[key].copy() for key in geo.props()}
+    old['pore.coords'] = coords.copy()
+    net = ctrl.clone_simulation(pn,name='isolated')
+    geo2 = ctrl[geo.name+'_isolated']
+    # Reads are not copied, on either side
+    assert np.shares_memory(net['pore.coords'],pn['pore.coords'])
+    for key in geo.props():
+        assert np.shares_memory(geo2[key],geo[key])
+    # A write to the original after cloning is not seen by the clone
+    geo['pore.diameter'][0] = 99
+    assert geo['pore.diameter'][0] == 99
+    assert geo2['pore.diameter'][0] == old['pore.diameter'][0]
+    assert not np.shares_memory(geo2['pore.diameter'],geo['pore.diameter'])
+    # The shared memory is read-only, so arrays held from before the clone
+    # cannot write to it and must be fetched again
+    with pytest.raises(ValueError):
+        coords[0] = -1
+    # Other in-place idioms work on the original and are not seen either
+    pn['pore.coords'][:,2] += 1
+    geo['throat.length'].sort()
+    geo['pore.seed'].put([0,1],[2,3])
+    temp = geo['pore.area']
+    temp[2:5][0] = -1
+    assert geo['pore.area'][2] == -1
+    volume = geo['pore.volume']
+    volume.fill(1)
+    sp.add(volume,1,out=volume)
+    assert sp.all(geo['pore.volume'] == 2)
+    assert sp.all(pn['pore.coords'][:,2] == old['pore.coords'][:,2] + 1)
+    assert sp.all(geo['pore.seed'][0:2] == [2,3])
+    assert sp.all(net['pore.coords'] == old['pore.coords'])
+    for key in geo.props():
+        assert sp.all(geo2[key] == old[key])
+    # Writes to the clone are not seen by the original
+    geo2['throat.diameter'].fill(7.0)
+    assert sp.all(geo['throat.diameter'] == old['throat.diameter'])
+    ctrl.clear()
+
 if __name__ == '__main__':
   pytest.main()